@@ -1,27 +1,46 @@
 import os
-import sqlite3
-import pandas as pd
-import matplotlib.pyplot as plt
+import threading
+
 import streamlit as st
-from datetime import datetime
 
 # --- Local modules ---
-from modules.database_setup import init_database, upsert_user, log_login
-from modules.keystroke_analyzer import KeystrokeAnalyzer
-from modules.chatbot_logic import get_reply
-from modules.recovery_calendar import show_calendar
-from modules.therapist_booking import booking_form
-from modules.therapist_dashboard import show_dashboard
-from modules.awareness_icons import show_awareness
-from modules.entertainment_recommender import list_by_category, suggest
+# Page modules (and pandas/numpy/matplotlib behind them) are imported inside
+# the tab that uses them: Streamlit re-runs this script on every interaction
+# and the login page needs none of them. The risk snapshot job imports its own
+# on a background thread (benchmarks/bench_startup.py checks both).
+from modules.database_setup import init_database, upsert_user, log_login, get_conn, active_users
 
 # =========================
 # INIT
 # =========================
-os.makedirs("assets", exist_ok=True)
-init_database()
 st.set_page_config(page_title="Recovery Companion", page_icon="🌿", layout="wide")
 
+def _start_risk_job():
+    from modules.risk_snapshot import start_background  # pandas/numpy, loaded off the script thread
+    start_background()
+
+@st.cache_resource(show_spinner=False)
+def _bootstrap():
+    """Once per process, not once per script run."""
+    os.makedirs("assets", exist_ok=True)
+    init_database()
+    threading.Thread(target=_start_risk_job, name="risk-snapshot-start", daemon=True).start()
+    return True
+
+@st.cache_resource(show_spinner=False)
+def _chatbot_setup():
+    """Once per process, the first time the chatbot page opens (the only place replies are made)."""
+    from modules.chatbot_logic import add_crisis_handler, use_intent_model
+    from modules.crisis_alerts import raise_alert
+    from modules.intent_model import get_classifier
+    add_crisis_handler(raise_alert)
+    classifier = get_classifier()  # None until `python -m modules.intent_training` has been run
+    if classifier is not None:
+        use_intent_model(classifier)
+    return True
+
+_bootstrap()
+
 # =========================
 # THEME + STYLES
 # =========================
@@ -87,9 +106,11 @@ if "language" not in st.session_state:
 if "is_therapist" not in st.session_state:
     st.session_state.is_therapist = False
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
-if "keystroke" not in st.session_state:
-    st.session_state.keystroke = KeystrokeAnalyzer()
+    st.session_state.chat_history = None  # ChatHistory for this login, created when the chat tab first opens
+if "dialog" not in st.session_state:
+    st.session_state.dialog = None  # DialogState for this login, created with the chat history
+if "chat_show" not in st.session_state:
+    st.session_state.chat_show = 20
 if "sidebar_visible" not in st.session_state:
     st.session_state.sidebar_visible = True
 
@@ -148,6 +169,8 @@ if not st.session_state.logged_in:
             st.session_state.logged_in = True
             st.session_state.username = username.strip().capitalize()
             st.session_state.language = language
+            from modules.chat_history import new_session
+            st.session_state.login_session = new_session()
             upsert_user(st.session_state.username, language)
             log_login(st.session_state.username)
             st.success(f"Welcome, {st.session_state.username} 💚")
@@ -182,12 +205,14 @@ if st.session_state.is_therapist:
 else:
     tab = st.sidebar.radio(
         "Navigate",
-        ["💬 Chatbot", "📅 Recovery Tracker", "🎧 Entertainment", "⚠️ Awareness", "👩‍⚕️ Therapist Booking", "📊 Therapist Dashboard"],
+        ["💬 Chatbot", "📅 Recovery Tracker", "🎧 Entertainment", "⚠️ Awareness", "👩‍⚕️ Therapist Booking"],
         key="user_nav"
     )
 
 # Logout
 if st.sidebar.button("Logout", key="logout_btn"):
+    if st.session_state.chat_history is not None:
+        st.session_state.chat_history.flush()
     for k in list(st.session_state.keys()):
         del st.session_state[k]
     st.rerun()
@@ -199,6 +224,19 @@ if not st.session_state.is_therapist:
 
     # ---- CHATBOT ----
     if tab == "💬 Chatbot":
+        _chatbot_setup()
+        from modules.chatbot_logic import get_reply_ref
+        from modules.chat_history import ChatHistory
+        from modules.dialog_state import DialogState
+
+        if st.session_state.chat_history is None:
+            st.session_state.chat_history = ChatHistory(st.session_state.username,
+                                                        st.session_state.login_session).load()
+            st.session_state.dialog = DialogState(st.session_state.username,
+                                                  st.session_state.login_session).load()
+        history = st.session_state.chat_history
+        dialog = st.session_state.dialog
+
         st.header("💬 Recovery Chatbot")
         st.caption("Type anything you feel. I’ll respond with support, motivation, or helpful links.")
         st.markdown("---")
@@ -209,23 +247,31 @@ if not st.session_state.is_therapist:
             submitted = st.form_submit_button("Send 💬", use_container_width=True)
 
         if submitted and user_input.strip():
+            history.add_user(user_input.strip())
             try:
-                reply = get_reply(user_input.strip(), st.session_state.username, st.session_state.language.lower())
+                ref = get_reply_ref(user_input.strip(), st.session_state.username,
+                                    st.session_state.language.lower(), dialog)
+                history.add_bot(ref.template_id, ref.params)
+                dialog.save()
             except Exception as e:
-                reply = f"Sorry, something went wrong 💡 ({e})"
-
-            ts = datetime.now().strftime("%I:%M %p")
-            st.session_state.chat_history.append((f"You ({ts})", user_input.strip()))
-            st.session_state.chat_history.append((f"Bot ({ts})", reply))
+                history.add_bot_text(f"Sorry, something went wrong 💡 ({e})")
             st.rerun()
 
         # Clear Chat
         if st.button("🧹 Clear Chat", key="clear_chat_btn"):
-            st.session_state.chat_history = []
+            history.clear()
+            dialog.reset()
+            st.session_state.chat_show = 20
             st.rerun()
 
-        # Display chat (last 20)
-        for sender, text in st.session_state.chat_history[-20:]:
+        # Older messages come from the database on demand
+        if history.has_older(st.session_state.chat_show):
+            if st.button("⬆️ Load older messages", key="chat_older_btn"):
+                st.session_state.chat_show += 20
+                st.rerun()
+
+        # Display chat (last 20, more after "Load older")
+        for sender, text in history.last(st.session_state.chat_show):
             if sender.startswith("You"):
                 st.markdown(f"<div class='user-bubble'><b>{sender}:</b> {text}</div>", unsafe_allow_html=True)
             else:
@@ -233,11 +279,15 @@ if not st.session_state.is_therapist:
 
     # ---- RECOVERY TRACKER ----
     elif tab == "📅 Recovery Tracker":
+        from modules.recovery_calendar import show_calendar
+
         st.header("📅 Recovery Tracker")
         show_calendar(st.session_state.username)
 
     # ---- ENTERTAINMENT ----
     elif tab == "🎧 Entertainment":
+        from modules.entertainment_recommender import multi_picks, record_feedback, suggest_pick
+
         st.header("🎧 Entertainment Zone")
         st.caption("Explore soothing music, uplifting movies, fun games, and relaxation videos 🎶")
 
@@ -247,16 +297,25 @@ if not st.session_state.is_therapist:
         c1, c2 = st.columns(2)
         with c1:
             if st.button("✨ Smart Suggestion", key="smart_suggest_btn"):
-                st.info(suggest(lang, mood, st.session_state.username))
+                msg, item = suggest_pick(lang, mood, st.session_state.username)
+                st.session_state.last_suggestion = (msg, lang, mood, item.id)
+            if st.session_state.get("last_suggestion"):
+                msg, s_lang, s_mood, item_id = st.session_state.last_suggestion
+                st.info(msg)
+                f1, f2 = st.columns(2)
+                if f1.button("👍 Helped", key="suggest_helped_btn"):
+                    record_feedback(s_lang, s_mood, item_id, helped=True)
+                    st.session_state.last_suggestion = None
+                    st.success("Thanks! We'll suggest more like this 💚")
+                if f2.button("👎 Not for me", key="suggest_nope_btn"):
+                    record_feedback(s_lang, s_mood, item_id, helped=False)
+                    st.session_state.last_suggestion = None
+                    st.caption("Got it — we'll try something different next time.")
 
         with c2:
             if st.button("🎁 Show Multiple Picks", key="multi_picks_btn"):
                 st.subheader("Here are some picks for you 🌈")
-                results = []
-                results += list_by_category(lang, "music")[:3]
-                results += list_by_category(lang, "movies")[:3]
-                results += list_by_category(lang, "relax")[:3]
-                results += list_by_category(lang, "games")[:3]
+                results = multi_picks(lang, st.session_state.username)
                 if results:
                     for title, link in results:
                         st.markdown(f"- [{title}]({link})")
@@ -265,18 +324,18 @@ if not st.session_state.is_therapist:
 
     # ---- AWARENESS ----
     elif tab == "⚠️ Awareness":
+        from modules.awareness_icons import show_awareness
+
         st.header("⚠️ Addiction Awareness")
         show_awareness(st.session_state.username)
 
     # ---- BOOKING ----
     elif tab == "👩‍⚕️ Therapist Booking":
+        from modules.therapist_booking import booking_form
+
         st.header("👩‍⚕️ Book a Therapy Session")
         booking_form(st.session_state.username)
 
-    # ---- USER VIEW OF DASHBOARD (if any quick metrics) ----
-    elif tab == "📊 Therapist Dashboard":
-        show_dashboard()
-
 # =========================
 # THERAPIST MODE
 # =========================
@@ -284,64 +343,50 @@ if st.session_state.is_therapist:
 
     # ---- THERAPIST DASHBOARD ----
     if tab == "📊 Therapist Dashboard":
+        import pandas as pd
+        from modules.charts import bar_chart
+
         st.header("📊 Therapist Overview")
         st.caption("Monitor overall patient engagement and progress trends.")
+        from modules.therapist_dashboard import alert_panel
+        alert_panel()
 
         try:
-            conn = sqlite3.connect("database/chatbot.db")
-            df = pd.read_sql("SELECT username, date FROM logins", conn)
-            if df.empty:
+            # pre-aggregated by the login_activity trigger: O(users), not O(logins)
+            counts = pd.read_sql(
+                'SELECT username AS "Username", count AS "Login Count", last_seen AS "Last Seen" '
+                'FROM login_totals ORDER BY count DESC, username',
+                get_conn()
+            )
+            if counts.empty:
                 st.info("No login data available yet.")
             else:
-                counts = df['username'].value_counts().reset_index()
-                counts.columns = ["Username", "Login Count"]
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Active today", active_users(1))
+                m2.metric("Active this week", active_users(7))
+                m3.metric("Total users", len(counts))
                 st.subheader("🧍 User Activity Count")
                 st.dataframe(counts, use_container_width=True)
 
-                plt.figure(figsize=(6, 4))
-                plt.bar(counts["Username"], counts["Login Count"])
-                plt.xlabel("User")
-                plt.ylabel("Logins")
-                plt.title("User Login Frequency")
-                st.pyplot(plt)
+                st.image(bar_chart(counts["Username"], counts["Login Count"],
+                                   title="User Login Frequency", xlabel="User", ylabel="Logins"))
         except Exception as e:
             st.error(f"Error loading dashboard data: {e}")
-        finally:
-            try:
-                conn.close()
-            except:
-                pass
+
+        st.markdown("---")
+        from modules.therapist_dashboard import show_dashboard
+        show_dashboard()
 
     # ---- PATIENT RECORDS ----
     elif tab == "🗂️ Patient Records":
+        from modules.patient_records import show_records
+
         st.header("🗂️ Patient Recovery Records")
         st.caption("View patient recovery check-ins and recent activity.")
         try:
-            conn = sqlite3.connect("database/chatbot.db")
-            cur = conn.cursor()
-            users = cur.execute("SELECT username, language FROM users").fetchall()
-            if not users:
-                st.info("No user data found.")
-            else:
-                for u, l in users:
-                    st.markdown(f"### 🧍 {u} ({l})")
-                    rows = cur.execute(
-                        "SELECT date, completed FROM recovery_tracker WHERE username=? ORDER BY date DESC LIMIT 7",
-                        (u,)
-                    ).fetchall()
-                    if rows:
-                        for d, comp in rows:
-                            st.markdown(f"- {d}: {'✅ Completed' if comp else '❌ Missed'}")
-                    else:
-                        st.write("No recovery tracker data yet.")
-                    st.markdown("---")
+            show_records()
         except Exception as e:
             st.error(f"Error fetching records: {e}")
-        finally:
-            try:
-                conn.close()
-            except:
-                pass
 
 # =========================
 # FOOTER
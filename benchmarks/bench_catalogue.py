@@ -0,0 +1,63 @@
+"""
+Catalogue engine benchmark on a synthetic catalogue.
+
+Builds N items over 2 languages × 4 categories with random weights and mood
+tags, then compares one weighted pick per call (filter the item list +
+random.choices, the naive approach) with a one-user top_k from the bucket
+index, and times top_k for many users at once.
+
+    python benchmarks/bench_catalogue.py [items] [users]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.catalogue import Catalogue
+
+LANGS = ["english", "tamil"]
+CATEGORIES = ["music", "movies", "games", "relax"]
+MOODS = ["stressed", "anxious", "bored", "tired", "happy", "better", "lonely"]
+
+def make_items(n, seed=11):
+    rng = random.Random(seed)
+    return [{"title": f"item {i}", "link": f"https://example.org/{i}", "language": rng.choice(LANGS),
+             "category": rng.choice(CATEGORIES), "tags": rng.sample(MOODS, 2), "weight": rng.uniform(0.1, 5)}
+            for i in range(n)]
+
+def naive_pick(items, lang, category):
+    pool = [it for it in items if it["language"] == lang and it["category"] == category]
+    return random.choices(pool, weights=[it["weight"] for it in pool])[0]
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    items = make_items(n)
+    t0 = time.perf_counter()
+    cat = Catalogue(items)
+    print(f"build        : {(time.perf_counter() - t0) * 1000:>9.1f} ms for {n} items")
+
+    calls = 200
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        naive_pick(items, "english", "music")
+    print(f"naive pick   : {(time.perf_counter() - t0) / calls * 1e6:>9.1f} µs/pick")
+
+    calls = 20_000
+    t0 = time.perf_counter()
+    for i in range(calls):
+        cat.top_k([f"user{i % 1000}"], "english", 1, category="music", mood="happy")
+    print(f"indexed pick : {(time.perf_counter() - t0) / calls * 1e6:>9.1f} µs/pick (with exclusion)")
+
+    names = [f"batch{i}" for i in range(users)]
+    t0 = time.perf_counter()
+    picks = cat.top_k(names, "tamil", 12, category="games")
+    elapsed = time.perf_counter() - t0
+    print(f"top_k        : {elapsed * 1000:>9.1f} ms for {users} users × 12 ({elapsed / users * 1e6:.1f} µs/user)")
+    again = cat.top_k(names[:100], "tamil", 12, category="games")
+    overlap = sum(len({it.id for it in a} & {it.id for it in b}) for a, b in zip(picks, again))
+    print(f"repeats      : {overlap} items repeated across two batches for 100 users")
+    if overlap:
+        sys.exit(1)
@@ -0,0 +1,124 @@
+"""
+Crisis alert latency: message submit -> alert visible on the dashboard query.
+
+A poller thread (its own connection, like a dashboard session) runs
+open_alerts() in a loop and notes when each alert first appears; they are
+acknowledged in bulk after each run. Alerts are raised one at a time through
+the chatbot's crisis hook:
+
+  idle         nothing else writing
+  busy         while the write-behind logger is draining a large backlog
+  via-logger   the same, but routing the alert through write_behind.submit
+               (what a plain "log it" approach would do), for comparison
+
+Also times the open-alert query itself against a large acknowledged history.
+
+    python benchmarks/bench_crisis_alerts.py [alerts] [backlog rows] [history rows]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import crisis_alerts, database_setup, write_behind
+from modules.chatbot_logic import add_crisis_handler, get_reply_ref
+from modules.crisis_alerts import INSERT_SQL, acknowledge, open_alerts
+from modules.database_setup import close_conn, get_conn, init_database
+
+POLL_SLEEP = 0.0005
+
+def measure(raise_one, n, gap=0.01):
+    """raise_one(tag) n times; returns submit -> visible latencies in ms."""
+    waiting, seen = {}, []
+    lock, done = threading.Lock(), threading.Event()
+
+    def poll():
+        while not done.is_set():
+            for _, _, message, _, _ in open_alerts(limit=n):
+                with lock:
+                    t0 = waiting.pop(message.rsplit(" ", 1)[-1], None)
+                if t0 is not None:
+                    seen.append((time.perf_counter() - t0) * 1000)
+            if len(seen) == n:
+                done.set()
+            time.sleep(POLL_SLEEP)
+        close_conn()
+
+    poller = threading.Thread(target=poll, daemon=True)
+    poller.start()
+    for i in range(n):
+        tag = f"#{i}"
+        with lock:
+            waiting[tag] = time.perf_counter()
+        raise_one(tag)
+        time.sleep(gap)
+    done.wait(30)
+    done.set()
+    poller.join()
+    for alert_id, *_ in open_alerts(limit=n):
+        acknowledge(alert_id, "bench", is_therapist=True)
+    return seen
+
+def report(label, ms, n):
+    if len(ms) < n:
+        print(f"{label:<12}: only {len(ms)}/{n} alerts became visible")
+        return
+    ms = sorted(ms)
+    print(f"{label:<12}: p50 {statistics.median(ms):7.2f} ms   p95 {ms[int(0.95 * (len(ms) - 1))]:7.2f} ms"
+          f"   max {ms[-1]:7.2f} ms")
+
+def flood(rows):
+    """Queue `rows` ordinary log writes on the write-behind logger."""
+    for i in range(rows):
+        write_behind.submit("INSERT INTO login_activity (username, login_time) VALUES (?, ?)",
+                            (f"user{i % 500}", "2025-01-01 10:00:00"))
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    backlog = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    history = int(sys.argv[3]) if len(sys.argv) > 3 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        database_setup.DB_PATH = os.path.join(tmp, "bench.db")
+        init_database()
+        add_crisis_handler(crisis_alerts.raise_alert)
+
+        def via_chat(tag):
+            get_reply_ref(f"i want to end my life {tag}", "sam")
+
+        report("idle", measure(via_chat, n), n)
+
+        feeder = threading.Thread(target=flood, args=(backlog,))
+        feeder.start()
+        report("busy", measure(via_chat, n), n)
+        feeder.join()
+        print(f"{'':<12}  logger after run: {write_behind.metrics()['depth']:,} rows still queued")
+        write_behind.flush(60)
+
+        def via_logger(tag):
+            write_behind.submit(INSERT_SQL, ("sam", f"i want to end my life {tag}", 2, "2025-01-01 10:00:00"))
+
+        feeder = threading.Thread(target=flood, args=(backlog,))
+        feeder.start()
+        report("via-logger", measure(via_logger, n), n)
+        feeder.join()
+        write_behind.flush(60)
+
+        conn = get_conn()
+        with conn:
+            conn.executemany(INSERT_SQL.replace("created_at)", "created_at, acked_at)").replace("?)", "?, ?)"),
+                             (("sam", "old", 1 + i % 2, "2025-01-01 10:00:00", "2025-01-01 11:00:00")
+                              for i in range(history)))
+            conn.executemany(INSERT_SQL, (("sam", "open", 2, "2025-01-02 10:00:00") for _ in range(20)))
+        reps = 2000
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            open_alerts()
+        print(f"open_alerts() with {history:,} acknowledged + 20 open: "
+              f"{(time.perf_counter() - t0) / reps * 1e6:.1f} µs/query")
+        crisis_alerts.get_queue().close()
+        write_behind.get_writer().close()
+        close_conn()
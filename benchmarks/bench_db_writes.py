@@ -0,0 +1,86 @@
+"""
+Login + booking write throughput under N concurrent threads.
+
+Compares a connect-per-call baseline (how the helpers used to work) with the
+pooled per-thread connections from database_setup.get_conn.
+
+    python benchmarks/bench_db_writes.py [threads] [writes_per_thread]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import database_setup
+from modules.database_setup import close_conn, init_database, log_login, upsert_user
+from modules.therapist_booking import create_booking
+from modules import write_behind
+
+# ---------- baseline: open/commit/close per write ----------
+def _baseline_login(username):
+    conn = sqlite3.connect(database_setup.DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT id FROM users WHERE username=?", (username,))
+    if c.fetchone() is None:
+        c.execute("INSERT INTO users (username,language,joined_on) VALUES (?,?,?)",
+                  (username, "english", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    conn.commit(); conn.close()
+    conn = sqlite3.connect(database_setup.DB_PATH)
+    conn.execute("INSERT INTO login_activity (username, login_time) VALUES (?,?)",
+                 (username, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    conn.commit(); conn.close()
+
+def _baseline_booking(username):
+    conn = sqlite3.connect(database_setup.DB_PATH)
+    conn.execute("INSERT INTO therapist_booking (username,date,time,mode,note) VALUES (?,?,?,?,?)",
+                 (username, "2025-01-01", "10:00:00", "Online", ""))
+    conn.commit(); conn.close()
+
+def _pooled_login(username):
+    upsert_user(username, "english")
+    log_login(username)
+
+def _pooled_booking(username):
+    create_booking(username, "2025-01-01", "10:00:00", "Online", "")
+
+def run(login, booking, threads, per_thread, pooled):
+    errors = []
+
+    def worker(t):
+        try:
+            for i in range(per_thread):
+                name = f"user{t}_{i % 50}"
+                login(name)
+                booking(name)
+        except sqlite3.Error as e:
+            errors.append(e)
+        finally:
+            if pooled:
+                close_conn()
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for th in pool: th.start()
+    for th in pool: th.join()
+    elapsed = time.perf_counter() - t0
+    return threads * per_thread * 2 / elapsed, errors
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for label, login, booking, pooled in [("connect-per-call", _baseline_login, _baseline_booking, False),
+                                          ("pooled", _pooled_login, _pooled_booking, True)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            database_setup.DB_PATH = os.path.join(tmp, "bench.db")
+            init_database()
+            close_conn()
+            if not pooled:  # WAL is persistent; give the baseline the default rollback journal
+                sqlite3.connect(database_setup.DB_PATH).execute("PRAGMA journal_mode=DELETE").close()
+            rate, errors = run(login, booking, threads, per_thread, pooled)
+            write_behind.flush()  # logins are queued; land them before the temp dir goes away
+            print(f"{label:<17}: {rate:>10,.0f} writes/s  ({threads} threads, {len(errors)} errors)")
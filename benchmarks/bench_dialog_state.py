@@ -0,0 +1,85 @@
+"""
+Dialog state: memory for many concurrent sessions, follow-up cost, SQLite round trip.
+
+  memory       tracemalloc bytes for N live DialogStates (each a few turns in),
+               next to the same fields kept as a plain dict per session
+  follow-up    get_reply_ref for a bare "yes" with an open offer, against an
+               ordinary message, and follow_up() alone
+  persistence  N saves through the write-behind logger, then N loads
+
+    python benchmarks/bench_dialog_state.py [sessions]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import database_setup, write_behind
+from modules.chatbot_logic import follow_up, get_reply_ref
+from modules.database_setup import close_conn, init_database
+from modules.dialog_state import DialogState
+
+OPENERS = ["i want to drink", "some exercise", "music please", "help me relax", "i feel sad"]
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objs = build()
+    size = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    tracemalloc.stop()
+    return objs, size
+
+def per_call_us(fn, reps):
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - t0) / reps * 1e6
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    names = [f"user{i}" for i in range(n)]
+    with tempfile.TemporaryDirectory() as tmp:
+        database_setup.DB_PATH = os.path.join(tmp, "bench.db")
+        init_database()
+
+        def live_states():
+            states = [DialogState(name, f"login-{name}") for name in names]
+            for i, state in enumerate(states):
+                for turn in range(i % 7 + 1):
+                    get_reply_ref(OPENERS[(i + turn) % len(OPENERS)], state.username, state=state)
+            return states
+
+        # the per-session dicts reuse the same interned strings, like the states do
+        states, size = measure(live_states)
+        dicts, dict_size = measure(lambda: [{"last_intent": s.last_intent, "offer": s.offer, "turns": s.turns,
+                                             "updated": s.updated} for s in states])
+        print(f"memory      : {n:,} states {size / 1e6:.2f} MB ({size / n:.0f} B each)"
+              f"   as dicts {dict_size / 1e6:.2f} MB ({dict_size / n:.0f} B each)")
+
+        state = DialogState("sam", "login-sam")
+        reps = 100_000
+
+        def answer_yes():
+            state.advance("music", "mood_playlist")
+            get_reply_ref("yes", "sam", state=state)
+
+        print(f"follow-up   : 'yes' to an offer {per_call_us(answer_yes, reps):.2f} µs"
+              f"   ordinary message {per_call_us(lambda: get_reply_ref('i feel sad', 'sam', state=state), reps):.2f} µs"
+              f"   follow_up() {per_call_us(lambda: follow_up(state, 'yes'), reps):.2f} µs")
+
+        t0 = time.perf_counter()
+        for s in states:
+            s.save()
+        write_behind.flush(60)
+        saved = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        loaded = [DialogState(name, f"login-{name}").load() for name in names]
+        load = time.perf_counter() - t0
+        same = all(a.to_row() == b.to_row() for a, b in zip(states, loaded))
+        print(f"persistence : save {n:,} {saved * 1000:.0f} ms (write-behind)   load {load / n * 1e6:.1f} µs each"
+              f"   round trip {'OK' if same else 'MISMATCH'}")
+        write_behind.get_writer().close()
+        close_conn()
@@ -0,0 +1,90 @@
+"""
+Event ingestion: cost of recording a click in the user-facing run.
+
+Times log_awareness_click / log_entertainment (integer-coded, queued through
+the write-behind logger) against a committed INSERT per click with text
+labels, checks every queued event landed, then times the dashboard's
+per-day rollups over the result.
+
+    python benchmarks/bench_event_ingest.py [events]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import database_setup, write_behind
+from modules.database_setup import EVENT_CODES, close_conn, get_conn, init_database
+from modules.event_log import awareness_by_day, entertainment_by_day, log_awareness_click, log_entertainment
+
+def _sync_click(username, category):
+    conn = get_conn()
+    with conn:
+        conn.execute("INSERT INTO awareness_clicks (username, category, click_time) VALUES (?,?,?)",
+                     (username, category, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(5)
+    categories = EVENT_CODES["awareness_category"][1:]
+    moods = EVENT_CODES["emotion"][1:]
+    types = EVENT_CODES["content_type"][1:]
+    with tempfile.TemporaryDirectory() as tmp:
+        database_setup.DB_PATH = os.path.join(tmp, "bench.db")
+        init_database()
+
+        sync_n = min(n, 5_000)
+        t0 = time.perf_counter()
+        for i in range(sync_n):
+            _sync_click(f"user{i % 100}", rng.choice(categories))
+        print(f"sync insert      : {(time.perf_counter() - t0) / sync_n * 1e6:>8.1f} µs/click")
+        get_conn().execute("DELETE FROM awareness_clicks")
+        get_conn().commit()
+
+        # one click at a time with the writer idle in between (what a user's click costs)
+        single = []
+        for i in range(200):
+            t0 = time.perf_counter()
+            log_awareness_click(f"user{i % 100}", rng.choice(categories))
+            single.append(time.perf_counter() - t0)
+            time.sleep(0.001)
+        write_behind.flush(timeout=None)
+        single.sort()
+        print(f"single click     : {single[100] * 1e6:>8.1f} µs median, {single[189] * 1e6:.1f} µs p95 (queued)")
+        get_conn().execute("DELETE FROM awareness_clicks")
+        get_conn().commit()
+
+        # sustained bursts: the caller shares the GIL with the writer draining the queue
+        t0 = time.perf_counter()
+        for i in range(n):
+            log_awareness_click(f"user{i % 100}", rng.choice(categories))
+        print(f"awareness burst  : {(time.perf_counter() - t0) / n * 1e6:>8.1f} µs/click (queued)")
+        t0 = time.perf_counter()
+        for i in range(n):
+            log_entertainment(f"user{i % 100}", rng.choice(moods), rng.choice(types), "https://example.org")
+        print(f"entertainment    : {(time.perf_counter() - t0) / n * 1e6:>8.1f} µs/pick (queued)")
+
+        write_behind.flush(timeout=None)
+        conn = get_conn()
+        clicks = conn.execute("SELECT COUNT(*) FROM awareness_clicks").fetchone()[0]
+        picks = conn.execute("SELECT COUNT(*) FROM entertainment_log").fetchone()[0]
+        m = write_behind.metrics()
+        print(f"landed           : {clicks} clicks, {picks} picks in {m['batches']} batches, {m['errors']} errors")
+
+        # spread the events over 30 days so the rollups have something to group
+        base = datetime.now() - timedelta(days=29)
+        with conn:
+            conn.execute("UPDATE awareness_clicks SET click_time = strftime('%Y-%m-%d %H:%M:%S', ?, '+' || (id % 30) || ' days')",
+                         (base.strftime("%Y-%m-%d %H:%M:%S"),))
+        t0 = time.perf_counter()
+        top = awareness_by_day()
+        entertainment_by_day()
+        print(f"rollups (14 days): {(time.perf_counter() - t0) * 1000:>8.1f} ms, {len(top)} (day, category) rows")
+        write_behind.get_writer().close()
+        close_conn()
+        if clicks != n or picks != n:
+            sys.exit(1)
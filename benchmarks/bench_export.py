@@ -0,0 +1,60 @@
+"""
+Peak Python memory of dashboard exports as the table grows.
+
+Compares the old pandas path (read whole table, to_csv().encode()) with the
+streaming data_export.export_file for CSV, gzip CSV and Parquet. "served"
+adds the read() st.download_button does: that copy is the file's size, which
+MAX_EXPORT_ROWS caps (bigger exports are split into parts).
+
+    python benchmarks/bench_export.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from modules import database_setup
+from modules.data_export import MAX_EXPORT_ROWS, export_file, export_parts
+from modules.database_setup import close_conn, get_conn, init_database
+
+def _peak(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20, elapsed
+
+def _pandas_csv():
+    df = pd.read_sql_query("SELECT * FROM therapist_booking", get_conn())
+    return df.to_csv(index=False).encode("utf-8")
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        database_setup.DB_PATH = os.path.join(tmp, "export.db")
+        init_database()
+        conn = get_conn()
+        total = 0
+        for rows in (10_000, 100_000, 500_000):
+            with conn:
+                conn.executemany(
+                    "INSERT INTO therapist_booking (username,date,time,mode,note) VALUES (?,?,?,?,?)",
+                    ((f"user{i % 997}", f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "10:00:00", "Online",
+                      "feeling a bit better this week") for i in range(rows - total)))
+            total = rows
+            print(f"--- {rows:,} rows")
+            for label, fn in [("pandas to_csv", _pandas_csv),
+                              ("stream CSV", lambda: export_file("therapist_booking", "CSV").close()),
+                              ("stream CSV gzip", lambda: export_file("therapist_booking", "CSV (gzip)").close()),
+                              ("stream Parquet", lambda: export_file("therapist_booking", "Parquet").close()),
+                              ("served CSV", lambda: export_file("therapist_booking", "CSV").read())]:
+                peak, elapsed = _peak(fn)
+                print(f"{label:<16}: peak {peak:8.1f} MB  {elapsed:6.2f} s")
+            print(f"{'parts':<16}: {export_parts('therapist_booking')} of {MAX_EXPORT_ROWS:,} rows")
+        close_conn()
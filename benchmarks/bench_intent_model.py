@@ -0,0 +1,98 @@
+"""
+Intent model latency: p50/p99 per message, alone and with concurrent sessions.
+
+Uses the trained model in assets/intent_model (run `python -m
+modules.intent_training` first) on the augmented example messages. Reports:
+
+  load         first load_model() (memory-mapped) and a cached repeat
+  single       one caller: keyword rules, model.predict inline, and
+               detect_intent through the MicroBatcher
+  concurrent   T threads calling detect_intent at once, batched vs inline
+  batch        predict_many throughput
+
+    python benchmarks/bench_intent_model.py [messages] [threads]
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import chatbot_logic, intent_model
+from modules.intent_model import MicroBatcher, load_model
+from modules.intent_training import augment, load_examples
+
+def pct(ms):
+    ms = sorted(ms)
+    return (f"p50 {statistics.median(ms) * 1000:7.1f} µs   p99 {ms[int(0.99 * (len(ms) - 1))] * 1000:7.1f} µs"
+            f"   max {ms[-1] * 1000:8.1f} µs")
+
+def timed_calls(fn, msgs):
+    out = []
+    for m in msgs:
+        t0 = time.perf_counter()
+        fn(m)
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+def concurrent(fn, msgs, threads):
+    """Every thread sends its share of `msgs` back to back; returns (per-call ms, msgs/s)."""
+    shares = [msgs[i::threads] for i in range(threads)]
+    results = [None] * threads
+    start = threading.Barrier(threads + 1)
+
+    def worker(i):
+        start.wait()
+        results[i] = timed_calls(fn, shares[i])
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    return [x for r in results for x in r], len(msgs) / elapsed
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    if not os.path.exists(os.path.join(intent_model.MODEL_DIR, "weights.npy")):
+        sys.exit("no trained model: run `python -m modules.intent_training` first")
+    msgs = [t for t, _, _ in augment(load_examples())]
+    msgs = (msgs * (n // len(msgs) + 1))[:n]
+
+    t0 = time.perf_counter()
+    model = load_model()
+    t1 = time.perf_counter()
+    load_model()
+    t2 = time.perf_counter()
+    print(f"load         : first {(t1 - t0) * 1000:.2f} ms (mmap), cached {(t2 - t1) * 1e6:.1f} µs")
+
+    batcher = MicroBatcher(model)
+    sample = msgs[:5_000]
+    model.predict_many(sample[:100])  # warm the mapped pages
+    print(f"rules        : {pct(timed_calls(chatbot_logic.classify_intent, sample))}")
+    print(f"model inline : {pct(timed_calls(model.predict, sample))}")
+    chatbot_logic.use_intent_model(batcher)
+    print(f"hybrid       : {pct(timed_calls(chatbot_logic.detect_intent, sample))}  (via micro-batcher)")
+
+    for label, plugged in [("inline", model), ("batched", batcher)]:
+        chatbot_logic.use_intent_model(plugged)
+        before = batcher.metrics()
+        ms, rate = concurrent(chatbot_logic.detect_intent, msgs, threads)
+        after = batcher.metrics()
+        calls, batches = after["calls"] - before["calls"], after["batches"] - before["batches"]
+        extra = f", avg batch {calls / batches:.1f}" if batches else ""
+        print(f"{threads} threads {label:<8}: {pct(ms)}   {rate:>9,.0f} msg/s{extra}")
+
+    for size in (1, 16, 256, 4096):
+        chunk = msgs[:size]
+        reps = max(1, 20_000 // size)
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            model.predict_many(chunk)
+        print(f"predict_many({size:>4}) : {size * reps / (time.perf_counter() - t0):>10,.0f} msg/s")
@@ -0,0 +1,101 @@
+"""
+Intent matcher benchmark + equivalence check.
+
+Runs the original if/elif keyword chain and the compiled single-pass matcher
+over a generated corpus, fails if any message gets a different intent, then
+prints messages/sec for both paths and for the batch get_replies API.
+
+    python benchmarks/bench_intents.py [n_messages]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.chatbot_logic import INTENT_RULES, NEGATIONS, SUBSTANCE_WORDS, classify_intent, classify_intents, get_replies, get_reply
+
+# ---------- reference: the original if-chain ----------
+def _has_any(msg, words): return any(w in msg for w in words)
+
+def _is_negated(msg, keywords):
+    for neg in NEGATIONS:
+        for kw in keywords:
+            if f"{neg} {kw}" in msg or f"{neg} to {kw}" in msg:
+                return True
+    return False
+
+_RULES = dict(INTENT_RULES)
+
+# Intended divergences from this chain: none. Crisis is still a substring
+# match here and in the compiled matcher; only the therapist alert behind a
+# crisis reply wants whole words (chatbot_logic.ALERT_FORMS), and that is not
+# part of classification.
+
+def classify_chain(msg):
+    if re.search(r"\bnot\b.*\b(die|suicide|kill myself)\b", msg):
+        return "choosing_life"
+    if _has_any(msg, _RULES["crisis"]):
+        return "crisis"
+    if _has_any(msg, SUBSTANCE_WORDS):
+        return "no_craving" if _is_negated(msg, SUBSTANCE_WORDS) else "relapse"
+    for intent in ["exercise", "games", "music", "movies", "relax", "sad", "positive", "motivation", "greeting"]:
+        if _has_any(msg, _RULES[intent]):
+            return intent
+    return "default"
+
+# ---------- corpus ----------
+FILLER = ["i", "feel", "today", "really", "want", "to", "the", "some", "please", "so", "my",
+          "friend", "work", "was", "and", "it", "is", "a", "bit", "lot", "this", "they", "studied"]
+
+def make_corpus(n, seed=7):
+    rng = random.Random(seed)
+    keywords = [w for _, words in INTENT_RULES for w in words] + NEGATIONS
+    corpus = []
+    for _ in range(n):
+        parts = [rng.choice(FILLER) for _ in range(rng.randint(1, 10))]
+        for _ in range(rng.randint(0, 3)):
+            parts.insert(rng.randint(0, len(parts)), rng.choice(keywords))
+        sep = rng.choice([" ", " ", " ", ""])  # glued words exercise substring overlaps
+        corpus.append(sep.join(parts))
+    return corpus
+
+def _rate(fn, corpus):
+    t0 = time.perf_counter()
+    for m in corpus:
+        fn(m)
+    return len(corpus) / (time.perf_counter() - t0)
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    corpus = make_corpus(n)
+    bad = [(m, classify_chain(m), classify_intent(m)) for m in corpus if classify_chain(m) != classify_intent(m)]
+    if bad:
+        for m, want, got in bad[:10]:
+            print(f"MISMATCH {m!r}: chain={want} compiled={got}")
+        sys.exit(1)
+    if list(classify_intents(corpus)) != [classify_chain(m) for m in corpus]:
+        print("MISMATCH classify_intents vs if-chain")
+        sys.exit(1)
+    print(f"equivalence: {n} messages OK")
+    print(f"if-chain    : {_rate(classify_chain, corpus):>12,.0f} msg/s")
+    print(f"compiled    : {_rate(classify_intent, corpus):>12,.0f} msg/s")
+
+    t0 = time.perf_counter()
+    classify_intents(corpus)
+    print(f"batch       : {n / (time.perf_counter() - t0):>12,.0f} msg/s")
+
+    random.seed(1)
+    one_by_one = [get_reply(m, "sam") for m in corpus[:20_000]]
+    if get_replies(corpus[:20_000], "sam", seed=1) != one_by_one:
+        print("MISMATCH get_replies vs get_reply")
+        sys.exit(1)
+    t0 = time.perf_counter()
+    for m in corpus:
+        get_reply(m, "sam")
+    print(f"get_reply   : {n / (time.perf_counter() - t0):>12,.0f} msg/s")
+    t0 = time.perf_counter()
+    get_replies(corpus, "sam", seed=1)
+    print(f"get_replies : {n / (time.perf_counter() - t0):>12,.0f} msg/s")
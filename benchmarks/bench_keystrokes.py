@@ -0,0 +1,85 @@
+"""
+Keystroke dynamics benchmark.
+
+Generates synthetic sessions for one user (calm typing vs stressed typing:
+slower, more erratic, more corrections and pauses), then reports streaming
+events/sec, batch events/sec, the largest difference between streaming and
+batch features, stress detection on held-out sessions after calibration,
+and memory per analyzer (tracemalloc).
+
+    python benchmarks/bench_keystrokes.py [events_per_session] [sessions]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.keystroke_analyzer import Baseline, KeystrokeAnalyzer, analyze_sessions, batch_features
+
+def make_session(n, stressed, rng):
+    scale = 0.30 if stressed else 0.18
+    iki = rng.lognormal(np.log(scale), 0.6 if stressed else 0.35, n)
+    iki[rng.random(n) < (0.08 if stressed else 0.02)] += rng.uniform(0.8, 2.5)  # pauses
+    down = np.cumsum(iki)
+    up = down + rng.normal(0.11 if stressed else 0.09, 0.02, n).clip(0.02)
+    keys = rng.integers(65, 91, n)
+    keys[rng.random(n) < (0.14 if stressed else 0.04)] = 8  # backspace
+    return down, up, keys
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    rng = np.random.default_rng(9)
+    calm = [make_session(n, False, rng) for _ in range(sessions)]
+    tense = [make_session(n, True, rng) for _ in range(sessions)]
+
+    # streaming throughput + equivalence with the batch features
+    down, up, keys = calm[0]
+    ka = KeystrokeAnalyzer()
+    rows = np.empty((n, 6))
+    t0 = time.perf_counter()
+    for i, (d, u, k) in enumerate(zip(down.tolist(), up.tolist(), keys.tolist())):
+        ka.add(d, u, k)
+        rows[i] = ka.features()
+    stream_rate = n / (time.perf_counter() - t0)
+    ka2 = KeystrokeAnalyzer()
+    t0 = time.perf_counter()
+    for d, u, k in zip(down.tolist(), up.tolist(), keys.tolist()):
+        ka2.add(d, u, k)
+    add_rate = n / (time.perf_counter() - t0)
+    diff = np.abs(rows - batch_features(down, up, keys)).max()
+    print(f"streaming add        : {add_rate:>12,.0f} events/s")
+    print(f"add + features       : {stream_rate:>12,.0f} events/s")
+    print(f"batch vs streaming   : max |diff| {diff:.2e}")
+
+    t0 = time.perf_counter()
+    for d, u, k in calm + tense:
+        batch_features(d, u, k)
+    print(f"batch features       : {2 * sessions * n / (time.perf_counter() - t0):>12,.0f} events/s")
+
+    # per-user calibration on half the calm sessions, then score the rest
+    half = sessions // 2
+    base = Baseline()
+    for d, u, k in calm[:half]:
+        a = KeystrokeAnalyzer(baseline=base)
+        for x in zip(d.tolist(), u.tolist(), k.tolist()):
+            a.add(*x)
+    labels = analyze_sessions(calm[half:] + tense[half:], baseline=base)
+    calm_ok = sum(l == "normal" for l, _ in labels[:sessions - half])
+    tense_ok = sum(l == "stressed" for l, _ in labels[sessions - half:])
+    print(f"calibrated detection : {calm_ok}/{sessions - half} calm as normal, "
+          f"{tense_ok}/{sessions - half} stressed as stressed")
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    analyzers = [KeystrokeAnalyzer() for _ in range(1000)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    per = sum(s.size_diff for s in after.compare_to(before, "filename")) / len(analyzers)
+    print(f"memory per session   : {per:,.0f} bytes (window {analyzers[0].window})")
+    if diff > 1e-6 or tense_ok < (sessions - half) * 0.8:
+        sys.exit(1)
@@ -0,0 +1,74 @@
+"""
+Per-language intent matching: Tamil (script + Tanglish) vs English throughput.
+
+Generates an English corpus (the bench_intents generator) and a Tamil one of
+the same shape: Tanglish and Tamil-script filler with Tamil keywords mixed in
+(in every spelling variant the automaton knows, plus some English ones).
+Prints automaton sizes and messages/sec for classify_intent, classify_intents
+(batches of 1,000) and get_reply per corpus, plus characters/sec: Tamil-script
+messages are longer in code points, so msg/s alone undersells the scan rate.
+
+    python benchmarks/bench_lang_intents.py [n_messages]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_intents import make_corpus
+from modules import chatbot_logic as cl
+
+TAMIL_FILLER = ["enakku", "romba", "konjam", "inniki", "naan", "irukku", "pola", "ippo", "venum", "sollunga",
+                "eppavum", "paaru", "enna", "ennoda", "nanba", "எனக்கு", "ரொம்ப", "இன்னைக்கு", "கொஞ்சம்",
+                "இருக்கு", "நான்", "வேணும்", "இப்போ"]
+
+def make_tamil_corpus(n, seed=7):
+    rng = random.Random(seed)
+    english_words = {w for _, words in cl.INTENT_RULES for w in words}
+    keywords = [w for _, words in cl._merged_rules(cl.TAMIL_INTENT_RULES) for w in words if w not in english_words]
+    english = sorted(english_words)
+    corpus = []
+    for _ in range(n):
+        parts = [rng.choice(TAMIL_FILLER) for _ in range(rng.randint(1, 10))]
+        for _ in range(rng.randint(0, 3)):
+            parts.insert(rng.randint(0, len(parts)), rng.choice(keywords if rng.random() < 0.8 else english))
+        corpus.append(" ".join(parts))
+    return corpus
+
+def _rate(fn, corpus):
+    t0 = time.perf_counter()
+    for m in corpus:
+        fn(m)
+    return len(corpus) / (time.perf_counter() - t0)
+
+def _batch_rate(msgs, lang, size=1000):
+    t0 = time.perf_counter()
+    for i in range(0, len(msgs), size):
+        cl.classify_intents(msgs[i:i + size], lang)
+    return len(msgs) / (time.perf_counter() - t0)
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    tamil = [cl.normalize(m) for m in make_tamil_corpus(n)]
+    corpora = [("english", "english", make_corpus(n)), ("tamil", "tamil", tamil),
+               ("tanglish", "tamil", [m for m in tamil if m.isascii()]),
+               ("script", "tamil", [m for m in tamil if not m.isascii()])]
+    for lang in ("english", "tamil"):
+        rules = cl._lang(lang)
+        print(f"{lang:<8} automaton: {len(rules.matcher._masks):>4} keywords"
+              f" ({len(rules.ascii_matcher._masks)} in the ASCII-only one)")
+    print(f"{'corpus':<9} {'msgs':>8} {'chars':>6} {'classify_intent':>16} {'classify_intents':>17}"
+          f" {'get_reply':>10} {'Mchar/s':>8}")
+    rates = {}
+    for label, lang, corpus in corpora:
+        single = _rate(lambda m: cl.classify_intent(m, lang), corpus)
+        batch = _batch_rate(corpus, lang)
+        reply = _rate(lambda m: cl.get_reply(m, "sam", lang), corpus[:50_000])
+        chars = sum(map(len, corpus)) / len(corpus)
+        rates[label] = (single, batch, reply, single * chars)
+        print(f"{label:<9} {len(corpus):>8,} {chars:>6.1f} {single:>16,.0f} {batch:>17,.0f} {reply:>10,.0f}"
+              f" {single * chars / 1e6:>8.1f}")
+    ratios = "  ".join(f"{t / e:.2f}x" for t, e in zip(rates["tamil"], rates["english"]))
+    print(f"tamil / english (msg/s, batch, reply, chars/s): {ratios}")
@@ -0,0 +1,56 @@
+"""
+Patient Records: per-user N+1 queries vs one query per page.
+
+    python benchmarks/bench_patient_records.py [days_per_patient]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import database_setup
+from modules.database_setup import close_conn, get_conn, init_database
+from modules.patient_records import load_page, to_matrix
+
+def _n_plus_one(conn):
+    cur = conn.cursor()
+    out = []
+    for u, _ in cur.execute("SELECT username, language FROM users").fetchall():
+        out.append(cur.execute(
+            "SELECT date, completed FROM recovery_tracker WHERE username=? ORDER BY date DESC LIMIT 7", (u,)
+        ).fetchall())
+    return out
+
+def _timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 14
+    today = date.today()
+    dates = [str(today - timedelta(days=k)) for k in range(days)]
+    with tempfile.TemporaryDirectory() as tmp:
+        database_setup.DB_PATH = os.path.join(tmp, "records.db")
+        init_database()
+        conn = get_conn()
+        have = 0
+        for patients in (1_000, 10_000, 100_000):
+            with conn:
+                conn.executemany("INSERT INTO users (username,language,joined_on) VALUES (?,?,'')",
+                                 ((f"patient{i:06d}", "english") for i in range(have, patients)))
+                conn.executemany(
+                    "INSERT INTO recovery_tracker (username,date,completed,motivation) VALUES (?,?,?,'')",
+                    ((f"patient{i:06d}", d, (i + k) % 3 > 0) for i in range(have, patients) for k, d in enumerate(dates)))
+            have = patients
+            print(f"--- {patients:,} patients x {days} days")
+            print(f"N+1 (all users)         : {_timed(lambda: _n_plus_one(conn), 1):10.1f} ms")
+            print(f"one query, one page     : {_timed(lambda: to_matrix(load_page(''))):10.1f} ms")
+            print(f"one query, search page  : {_timed(lambda: to_matrix(load_page('0042'))):10.1f} ms")
+        close_conn()
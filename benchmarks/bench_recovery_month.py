@@ -0,0 +1,65 @@
+"""
+Month provisioning for the Recovery Tracker with many users.
+
+Old path: SELECT-then-INSERT per day on an unindexed table.
+New path: recovery_calendar._ensure_month (UNIQUE index + INSERT OR IGNORE),
+then a second "rerun" pass that should be served from the in-process memo.
+
+    python benchmarks/bench_recovery_month.py [users] [old_path_users]
+"""
+import calendar
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import database_setup, recovery_calendar
+from modules.database_setup import close_conn, init_database
+
+def _old_ensure_month(conn, username):
+    y, m = date.today().year, date.today().month
+    c = conn.cursor()
+    for day in range(1, calendar.monthrange(y, m)[1] + 1):
+        d = date(y, m, day).strftime("%Y-%m-%d")
+        c.execute("SELECT 1 FROM recovery_tracker WHERE username=? AND date=?", (username, d))
+        if not c.fetchone():
+            c.execute("INSERT INTO recovery_tracker (username,date,completed,motivation) VALUES (?,?,0,'')",
+                      (username, d))
+    conn.commit()
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    old_users = int(sys.argv[2]) if len(sys.argv) > 2 else 300  # the old path is O(rows) per lookup
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "old.db"))
+        conn.execute("CREATE TABLE recovery_tracker(id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT, "
+                     "date TEXT, completed INTEGER DEFAULT 0, motivation TEXT)")
+        t0 = time.perf_counter()
+        for u in range(old_users):
+            _old_ensure_month(conn, f"user{u}")
+        old = (time.perf_counter() - t0) / old_users
+        conn.close()
+        print(f"old select+insert : {old * 1e3:8.3f} ms/user  (first {old_users} users only)")
+
+        database_setup.DB_PATH = os.path.join(tmp, "new.db")
+        init_database()
+        recovery_calendar._PROVISIONED.clear()
+        t0 = time.perf_counter()
+        for u in range(users):
+            recovery_calendar._ensure_month(f"user{u}")
+        new = (time.perf_counter() - t0) / users
+        print(f"insert or ignore  : {new * 1e3:8.3f} ms/user  ({users} users)")
+
+        t0 = time.perf_counter()
+        for u in range(users):
+            recovery_calendar._ensure_month(f"user{u}")
+        memo = (time.perf_counter() - t0) / users
+        print(f"memoized rerun    : {memo * 1e6:8.3f} us/user")
+
+        rows = database_setup.get_conn().execute("SELECT COUNT(*) FROM recovery_tracker").fetchone()[0]
+        print(f"rows              : {rows:,}")
+        close_conn()
@@ -0,0 +1,61 @@
+"""
+Reply rendering allocation benchmark.
+
+Compares the pre-split template fragments (one str.join per reply) with
+formatting the full template text on every call, per intent. Reports
+allocations and bytes per reply from tracemalloc, then replies/sec.
+
+    python benchmarks/bench_reply_alloc.py [n_replies]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.chatbot_logic import REPLY_TEMPLATES, render_reply
+
+def render_format(template_id, params):
+    """Reference: str.format over the whole template text each time."""
+    return REPLY_TEMPLATES[template_id].format(**params)
+
+def measure(fn, template_id, n):
+    params = {"name": "Friend"}
+    fn(template_id, params)  # warm up
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = [fn(template_id, params) for _ in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    count = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+    del keep
+    return count / n, size / n
+
+def throughput(fn, n):
+    params = {"name": "Friend"}
+    ids = list(REPLY_TEMPLATES)
+    start = time.perf_counter()
+    for i in range(n):
+        fn(ids[i % len(ids)], params)
+    return n / (time.perf_counter() - start)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for tid in REPLY_TEMPLATES:
+        assert render_reply(tid, {"name": "Friend"}) == render_format(tid, {"name": "Friend"}), tid
+
+    print(f"{'template':<18}{'fragments':>22}{'format':>22}")
+    for tid in REPLY_TEMPLATES:
+        fc, fs = measure(render_reply, tid, n)
+        rc, rs = measure(render_format, tid, n)
+        print(f"{tid:<18}{fc:>8.2f} allocs {fs:>6.0f} B{rc:>8.2f} allocs {rs:>6.0f} B")
+
+    runs = n * 100
+    print(f"\nfragments: {throughput(render_reply, runs):,.0f} replies/s")
+    print(f"format:    {throughput(render_format, runs):,.0f} replies/s")
+
+if __name__ == "__main__":
+    main()
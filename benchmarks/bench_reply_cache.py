@@ -0,0 +1,67 @@
+"""
+Intent cache benchmark on a Zipf-distributed chat workload.
+
+Draws messages from a fixed vocabulary with Zipf-like popularity (a few
+greetings / "i feel sad" dominate, a long tail is rare), checks the cached
+path returns the same intents as the classifier, that crisis messages never
+land in the cache, and that random variants still vary. Prints msg/s
+uncached vs cached and the hit rate.
+
+    python benchmarks/bench_reply_cache.py [n_messages] [zipf_s]
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_intents import make_corpus
+from modules import chatbot_logic as cl
+
+COMMON = ["hi", "hello", "i feel sad", "music", "i am tired", "give me a quote", "play a game",
+          "i want to die", "i feel better", "watch a movie", "i will not drink today", "help me relax"]
+
+def zipf_workload(n, s=1.1, vocab=20_000, seed=3):
+    """n messages; the k-th most popular one has weight 1/k**s."""
+    unique = COMMON + make_corpus(vocab - len(COMMON), seed=seed)
+    weights = 1.0 / np.arange(1, len(unique) + 1) ** s
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(unique), size=n, p=weights / weights.sum())
+    return [unique[i] for i in picks]
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    s = float(sys.argv[2]) if len(sys.argv) > 2 else 1.1
+    msgs = [m.lower().strip() for m in zipf_workload(n, s)]
+
+    t0 = time.perf_counter()
+    want = [cl.classify_intent(m) for m in msgs]
+    uncached = n / (time.perf_counter() - t0)
+
+    cl.intent_cache_clear()
+    t0 = time.perf_counter()
+    got = [cl.cached_intent(m) for m in msgs]
+    cached = n / (time.perf_counter() - t0)
+    info = cl.intent_cache_info()
+
+    if got != want:
+        print("MISMATCH cached_intent vs classify_intent")
+        sys.exit(1)
+    if "i want to die" in cl._intent_cache:
+        print("crisis message was cached")
+        sys.exit(1)
+    random.seed(0)
+    if len({cl.get_reply("i feel sad", "sam") for _ in range(50)}) < 2:
+        print("sad replies stopped varying")
+        sys.exit(1)
+
+    print(f"workload   : {n} messages, zipf s={s}, {len(set(msgs))} distinct")
+    print(f"uncached   : {uncached:>12,.0f} msg/s")
+    print(f"cached     : {cached:>12,.0f} msg/s")
+    print(f"hit rate   : {info['hit_rate']:.1%} ({info['hits']} hits, {info['misses']} misses, {info['size']} entries)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Risk pipeline benchmark on 1M progress rows.
+
+Builds a temp database with U patients × R progress entries spread over the
+last 60 days (plus a month of recovery check-ins), then times:
+vectorized risk_labels vs the scalar risk_label loop, a full rescore after a
+threshold change, a full risk_snapshot build, an incremental refresh after a
+few patients log new entries, and the dashboard read.
+
+    python benchmarks/bench_risk.py [patients] [entries_per_patient]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import database_setup, progress_tracker
+from modules.database_setup import close_conn, get_conn, init_database
+from modules.progress_tracker import rescore_progress, risk_label, risk_labels
+from modules.risk_snapshot import load_snapshot, refresh
+
+def _timed(label, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    print(f"{label:<28}: {(time.perf_counter() - t0) * 1000:>9.1f} ms")
+    return out
+
+def populate(conn, users, per_user, today, rng):
+    n = users * per_user
+    names = np.repeat([f"patient{i:05d}" for i in range(users)], per_user)
+    ago = rng.integers(0, 60, n)
+    secs = rng.integers(0, 86400, n)
+    base = datetime.combine(today, datetime.min.time())
+    stamps = [(base - timedelta(days=int(a)) + timedelta(seconds=int(s))).strftime("%Y-%m-%d %H:%M:%S")
+              for a, s in zip(ago, secs)]
+    craving, usage = rng.integers(0, 11, n), rng.integers(0, 9, n)
+    labels = risk_labels(craving, usage)
+    with conn:
+        conn.executemany("INSERT INTO users (username, language, joined_on) VALUES (?, 'english', '')",
+                         ((f"patient{i:05d}",) for i in range(users)))
+        conn.executemany("INSERT INTO progress (username,mood,craving,usage,risk,date) VALUES (?,?,?,?,?,?)",
+                         zip(names.tolist(), ["ok"] * n, craving.tolist(), usage.tolist(), labels.tolist(), stamps))
+        days = [(today - timedelta(days=d)).isoformat() for d in range(30)]
+        conn.executemany("INSERT INTO recovery_tracker (username,date,completed,motivation) VALUES (?,?,?,'')",
+                         ((f"patient{i:05d}", d, int(rng.random() < 0.7)) for i in range(users) for d in days))
+    return craving, usage
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    today = date.today()
+    rng = np.random.default_rng(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_setup.DB_PATH = os.path.join(tmp, "bench.db")
+        init_database()
+        conn = get_conn()
+        craving, usage = _timed(f"populate {users * per_user:,} rows", lambda: populate(conn, users, per_user, today, rng))
+
+        scalar = _timed("risk_label loop (1M)", lambda: [risk_label(None, c, u) for c, u in zip(craving.tolist(), usage.tolist())])
+        vector = _timed("risk_labels vectorized (1M)", lambda: risk_labels(craving, usage))
+        if list(vector) != scalar:
+            print("MISMATCH risk_labels vs risk_label")
+            sys.exit(1)
+
+        progress_tracker.HIGH_CRAVING = 7  # a threshold change
+        changed = _timed("rescore_progress", rescore_progress)
+        print(f"{'':<28}  {changed:,} rows relabelled")
+
+        written = _timed("refresh (first, all dirty)", lambda: refresh(today))
+        print(f"{'':<28}  {written:,} patients")
+        _timed("refresh (nothing dirty)", lambda: refresh(today))
+        with conn:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            conn.executemany("INSERT INTO progress (username,mood,craving,usage,risk,date) VALUES (?,'ok',9,7,'High',?)",
+                             ((f"patient{i:05d}", now) for i in range(0, 50 * 20) if i % 20 == 0 for _ in range(20)))
+        written = _timed("refresh (50 patients dirty)", lambda: refresh(today))
+        print(f"{'':<28}  {written:,} patients")
+        _timed("refresh (next day, all)", lambda: refresh(today + timedelta(days=1)))
+        snap = _timed("dashboard read", load_snapshot)
+        print(f"{'':<28}  {len(snap):,} rows, {(snap['risk'] == 'High').sum():,} High")
+        close_conn()
@@ -0,0 +1,116 @@
+"""
+Cold-start and per-rerun cost of app.py.
+
+Cold start: `python -X importtime` in a fresh interpreter for what the login
+page needs versus each page's modules (and the old eager import set).
+Real login page: app.py itself (including _bootstrap) rendered once in a fresh
+interpreter, with the heavy modules it loaded and on which thread; the risk
+snapshot job is allowed to load pandas, but only on its own thread.
+Rerun: wall time of re-executing the script with Streamlit's AppTest.
+
+    python benchmarks/bench_startup.py [reruns]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+LOGIN = ["streamlit", "modules.database_setup"]
+HEAVY = ["numpy", "pandas", "matplotlib", "modules.chatbot_logic", "modules.risk_snapshot", "modules.intent_model"]
+PAGES = {
+    "login page (what app.py imports)": LOGIN,
+    "+ chatbot": LOGIN + ["modules.chatbot_logic"],
+    "+ recovery tracker": LOGIN + ["modules.recovery_calendar"],
+    "+ therapist dashboard": LOGIN + ["modules.therapist_dashboard"],
+    "+ therapist overview": LOGIN + ["pandas", "modules.charts"],
+    "old eager imports": LOGIN + ["modules.keystroke_analyzer", "pandas", "matplotlib.pyplot", "modules.chatbot_logic",
+                                  "modules.recovery_calendar", "modules.therapist_booking",
+                                  "modules.therapist_dashboard", "modules.awareness_icons",
+                                  "modules.entertainment_recommender"],
+}
+
+def import_time_ms(modules):
+    """Total self time of every import triggered by `modules`, from -X importtime."""
+    code = ";".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    total = 0
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_us = line.split(":", 1)[1].split("|")[0].strip()
+            if self_us.isdigit():
+                total += int(self_us)
+    return total / 1000
+
+# Run in a fresh interpreter: render the login page once and record which
+# heavy modules get imported, by thread.
+_FIRST_RUN = """
+import json, sys, threading, time
+seen = {}
+class Spy:
+    def find_spec(self, name, path=None, target=None):
+        if name in HEAVY and name not in seen:
+            seen[name] = threading.current_thread().name
+sys.meta_path.insert(0, Spy())
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file(APP, default_timeout=60).run()
+ms = (time.perf_counter() - t0) * 1000
+time.sleep(3)  # let the background job get going
+print(json.dumps({"ms": ms, "seen": seen, "errors": [str(e.value) for e in at.exception]}))
+"""
+
+def first_login_run():
+    """(ms, {heavy module: importing thread}) for app.py's first run in a fresh process."""
+    import json
+    code = f"HEAVY = {HEAVY!r}; APP = {os.path.join(ROOT, 'app.py')!r}" + _FIRST_RUN
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        proc = subprocess.run([sys.executable, "-c", code], cwd=tmp, env=env, capture_output=True, text=True,
+                              check=True)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if result["errors"]:
+        raise RuntimeError(result["errors"])
+    return result["ms"], result["seen"]
+
+def rerun_ms(reruns):
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)  # app.py creates database/ and assets/ relative to cwd
+        try:
+            at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+            t0 = time.perf_counter()
+            for _ in range(reruns):
+                at.run()
+            login = (time.perf_counter() - t0) / reruns * 1000
+            at.text_input(key="login_name").input("bench")
+            at.button(key="user_login_btn").click().run()
+            t0 = time.perf_counter()
+            for _ in range(reruns):
+                at.run()
+            chat = (time.perf_counter() - t0) / reruns * 1000
+        finally:
+            os.chdir(cwd)
+    return login, chat
+
+if __name__ == "__main__":
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print("cold import (median of 3 fresh interpreters)")
+    for label, modules in PAGES.items():
+        runs = sorted(import_time_ms(modules) for _ in range(3))
+        print(f"  {label:<34}: {runs[1]:8.1f} ms")
+    ms, seen = first_login_run()
+    script = sorted(m for m, thread in seen.items() if thread != "risk-snapshot-start")
+    background = sorted(m for m, thread in seen.items() if thread == "risk-snapshot-start")
+    print(f"real login page, first run          : {ms:8.1f} ms")
+    print(f"  heavy imports on the script thread: {', '.join(script) or 'none'}")
+    print(f"  heavy imports on the risk job     : {', '.join(background) or 'none'}")
+    login, chat = rerun_ms(reruns)
+    print(f"rerun, login page                   : {login:8.1f} ms")
+    print(f"rerun, chatbot page                 : {chat:8.1f} ms")
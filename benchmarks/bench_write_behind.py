@@ -0,0 +1,67 @@
+"""
+Write-behind logger vs synchronous commits.
+
+N threads (one per simulated session) each log progress rows. Reports the
+time the caller spends per write — the part a Streamlit run would wait on —
+for a commit per write and for the queued writer, checks every row landed,
+and prints the writer's queue/latency metrics.
+
+    python benchmarks/bench_write_behind.py [threads] [writes_per_thread]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import database_setup
+from modules.database_setup import close_conn, get_conn, init_database
+from modules.write_behind import WriteBehind
+
+SQL = "INSERT INTO progress (username,mood,craving,usage,risk,date) VALUES (?,?,?,?,?,?)"
+
+def run(write, threads, per_thread):
+    spent = [0.0] * threads
+
+    def worker(t):
+        for i in range(per_thread):
+            t0 = time.perf_counter()
+            write(SQL, (f"user{t}", "ok", i % 10, i % 7, "Low", "2025-01-01 10:00:00"))
+            spent[t] += time.perf_counter() - t0
+        close_conn()
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for th in pool: th.start()
+    for th in pool: th.join()
+    return time.perf_counter() - t0, sum(spent) / (threads * per_thread)
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    total = threads * per_thread
+    with tempfile.TemporaryDirectory() as tmp:
+        database_setup.DB_PATH = os.path.join(tmp, "bench.db")
+        init_database()
+        writer = WriteBehind()
+
+        elapsed, per_call = run(writer.write_sync, threads, per_thread)
+        print(f"sync commit  : {per_call * 1e6:>9.1f} µs/write in caller, {total / elapsed:>10,.0f} writes/s")
+
+        t0 = time.perf_counter()
+        elapsed, per_call = run(writer.submit, threads, per_thread)
+        writer.flush(timeout=None)
+        drained = time.perf_counter() - t0
+        print(f"write-behind : {per_call * 1e6:>9.1f} µs/write in caller, {total / drained:>10,.0f} writes/s (incl. drain)")
+
+        m = writer.metrics()
+        writer.close()
+        rows = get_conn().execute("SELECT COUNT(*) FROM progress").fetchone()[0]
+        print(f"rows         : {rows} (expected {2 * total})")
+        print(f"batches      : {m['batches']}, latency avg {m['latency_ms_avg']:.1f} ms / "
+              f"p95 {m['latency_ms_p95']:.1f} ms / max {m['latency_ms_max']:.1f} ms, errors {m['errors']}")
+        close_conn()
+        if rows != 2 * total:
+            sys.exit(1)
@@ -0,0 +1,151 @@
+"""
+EXPLAIN QUERY PLAN guard for the queries the app runs.
+
+Builds a fresh database through init_database (so every migration applies),
+then clicks through every patient and therapist page with Streamlit's AppTest
+while a trace callback records each statement any connection runs (the
+script thread, the write-behind logger, the risk job). Every recorded
+statement, plus the paths a page walk doesn't reach (APP_QUERIES: paging,
+background rescoring), is checked with EXPLAIN QUERY PLAN; the guard exits
+non-zero if one falls back to a full table scan or an ORDER BY that needs a
+temp sort. tests/test_query_plans.py runs the same checks under pytest.
+
+    python benchmarks/check_query_plans.py
+"""
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import database_setup
+from modules.database_setup import close_conn, get_conn, init_database
+
+# Queries a page walk doesn't run (later pages, the background jobs' bulk paths).
+APP_QUERIES = {
+    "upsert_user": """INSERT INTO users (username,language,joined_on) VALUES ('a','english','')
+                      ON CONFLICT(username) DO UPDATE SET language=excluded.language""",
+    "recovery _load_df": "SELECT date, completed, motivation FROM recovery_tracker WHERE username='a' ORDER BY date ASC",
+    "recovery _mark_done": "UPDATE recovery_tracker SET completed=1, motivation='' WHERE username='a' AND date='2025-01-01'",
+    "patient records last 7": "SELECT date, completed FROM recovery_tracker WHERE username='a' ORDER BY date DESC LIMIT 7",
+    "recent recovery": "SELECT * FROM recovery_tracker ORDER BY date DESC LIMIT 120",
+    "recent progress": "SELECT * FROM progress ORDER BY date DESC LIMIT 120",
+    "user progress": "SELECT * FROM progress WHERE username='a' ORDER BY date DESC LIMIT 120",
+    "user logins": "SELECT * FROM login_activity WHERE username='a' ORDER BY login_time DESC",
+    "user bookings": "SELECT * FROM therapist_booking WHERE username='a' ORDER BY id DESC LIMIT 100",
+    "login totals (overview)": "SELECT username, count, last_seen FROM login_totals ORDER BY count DESC, username",
+    "export parts (bookings in range)": "SELECT COUNT(*) FROM therapist_booking WHERE date >= '2025-01-01' "
+                                        "AND date < date('2025-02-01', '+1 day')",
+    "export parts (recovery in range)": "SELECT COUNT(*) FROM recovery_tracker WHERE date >= '2025-01-01' "
+                                        "AND date < date('2025-02-01', '+1 day')",
+    "active users": "SELECT COUNT(DISTINCT username) FROM login_stats WHERE day >= '2025-01-01'",
+    "dashboard usernames": "SELECT username FROM users ORDER BY username",
+    "dashboard recovery page": "SELECT * FROM recovery_tracker WHERE (date, id) < ('2025-01-01', 9) "
+                               "ORDER BY date DESC, id DESC LIMIT 121",
+    "dashboard user recovery page": "SELECT * FROM recovery_tracker WHERE username='a' AND (date, id) < ('2025-01-01', 9) "
+                                    "ORDER BY date DESC, id DESC LIMIT 121",
+    "dashboard progress page": "SELECT * FROM progress WHERE (date, id) < ('2025-01-01', 9) "
+                               "ORDER BY date DESC, id DESC LIMIT 121",
+    "dashboard user progress page": "SELECT * FROM progress WHERE username='a' AND (date, id) < ('2025-01-01', 9) "
+                                    "ORDER BY date DESC, id DESC LIMIT 121",
+    "dashboard user logins page": "SELECT * FROM login_activity WHERE username='a' AND id < 9 ORDER BY id DESC LIMIT 101",
+    "dashboard user bookings page": "SELECT * FROM therapist_booking WHERE username='a' AND id < 9 ORDER BY id DESC LIMIT 101",
+    "awareness clicks by day": "SELECT substr(click_time, 1, 10) AS day, category, COUNT(*) AS clicks "
+                               "FROM awareness_clicks WHERE click_time >= '2025-01-01' GROUP BY day, category",
+    "open crisis alerts": "SELECT id, username, message, severity, created_at FROM crisis_alerts WHERE acked_at IS NULL ORDER BY severity DESC, id LIMIT 50",
+    "open crisis alert count": "SELECT COUNT(*) FROM crisis_alerts WHERE acked_at IS NULL",
+    "dialog state": "SELECT last_intent, offer, turns, updated FROM dialog_state WHERE session='a'",
+    "risk snapshot (dashboard)": "SELECT * FROM risk_snapshot ORDER BY risk_level DESC, craving_mean_7d DESC",
+    "risk snapshot out of date": "SELECT username FROM risk_snapshot WHERE as_of < '2025-01-01'",
+    "rescore progress chunk": "SELECT id, craving, usage, risk FROM progress WHERE id > 0 ORDER BY id LIMIT 100000",
+    "entertainment picks by day": "SELECT substr(date, 1, 10) AS day, type, COUNT(*) AS picks "
+                                  "FROM entertainment_log WHERE date >= '2025-01-01' GROUP BY day, type",
+}
+
+FULL_SCAN = re.compile(r"^SCAN \w+$|^USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY")
+CHECKED = re.compile(r"^\s*(WITH|SELECT|UPDATE|DELETE|INSERT)\b", re.IGNORECASE)
+# A bare rowid walk that stops after LIMIT rows (the dashboard's first pages):
+# SQLite reports it as SCAN, but it reads exactly the page.
+ROWID_PAGE = re.compile(r"^\s*SELECT .* FROM (\w+) ORDER BY id (ASC|DESC) LIMIT \d+\s*$", re.IGNORECASE | re.DOTALL)
+# Read whole by design: a work queue drained on every pass, and one counter per table.
+WHOLE_TABLE = {"risk_dirty", "table_versions"}
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+# A page walk as each kind of user; (nav key, tabs).
+PATIENT_TABS = ["💬 Chatbot", "📅 Recovery Tracker", "🎧 Entertainment", "⚠️ Awareness", "👩‍⚕️ Therapist Booking"]
+THERAPIST_TABS = ["📊 Therapist Dashboard", "🗂️ Patient Records"]
+
+def _walk(therapist):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+    if therapist:
+        at.text_input(key="t_id").input("admin")
+        at.text_input(key="t_pw").input("therapy123")
+        at.button(key="therapist_login_btn").click().run()
+        nav, tabs = "therapist_nav", THERAPIST_TABS
+    else:
+        at.text_input(key="login_name").input("sam")
+        at.button(key="user_login_btn").click().run()
+        nav, tabs = "user_nav", PATIENT_TABS
+    for tab in tabs:
+        at.radio(key=nav).set_value(tab).run()
+        if tab == "💬 Chatbot":
+            at.text_input(key="chat_input").input("i feel like drinking today")
+            at.button[0].click().run()  # the chat form's submit
+        if at.exception:
+            raise RuntimeError(f"{tab}: {at.exception[0].value}")
+    at.button(key="logout_btn").click().run()
+
+def capture_app_sql():
+    """Every statement the app runs during a page walk, keyed by shape (literals stripped)."""
+    from modules import write_behind
+    seen = {}
+    real_connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        conn.set_trace_callback(lambda sql: CHECKED.match(sql) and "sqlite_master" not in sql
+                                and seen.setdefault(" ".join(LITERAL.sub("?", sql).split()), sql))
+        return conn
+
+    sqlite3.connect = traced_connect
+    try:
+        _walk(therapist=False)
+        _walk(therapist=True)
+        write_behind.flush()
+    finally:
+        sqlite3.connect = real_connect
+    return {f"traced: {' '.join(sql.split())[:70]}": sql for sql in seen.values()}
+
+def _allowed(sql, detail):
+    if not detail.startswith("SCAN "):
+        return False
+    table = detail.split()[1]
+    page = ROWID_PAGE.match(sql)
+    return table in WHOLE_TABLE or (page is not None and page.group(1) == table)
+
+def full_scans(conn, queries):
+    bad = []
+    for name, sql in queries.items():
+        for row in conn.execute("EXPLAIN QUERY PLAN " + sql):
+            detail = row[-1]
+            if FULL_SCAN.match(detail) and not _allowed(sql, detail):
+                bad.append((name, detail))
+    return bad
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        database_setup.DB_PATH = os.path.join(tmp, "plans.db")
+        init_database()
+        traced = capture_app_sql()
+        queries = {**APP_QUERIES, **traced}
+        bad = full_scans(get_conn(), queries)
+        close_conn()
+    for name, detail in bad:
+        print(f"BAD PLAN in {name}: {detail}")
+    if bad:
+        sys.exit(1)
+    print(f"{len(queries)} queries OK ({len(traced)} traced from the pages, no full scans or sorts)")
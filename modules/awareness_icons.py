@@ -1,6 +1,8 @@
 import streamlit as st
 import random
 
+from modules.event_log import log_awareness_click
+
 # ---- Motivation + Knowledge ----
 MOTIVATION_QUOTES = [
     "Small changes make a big difference 🌱",
@@ -130,6 +132,7 @@ def show_awareness(username: str = "User"):
         with cols[i]:
             if st.button(f"{c} {AWARENESS_DATA[c]['emoji']}", key=f"aw_btn_{c}"):
                 st.session_state[SEL_KEY] = c
+                log_awareness_click(username, c)
                 # reset cost result when switching category
                 st.session_state[RES_KEY] = None
                 st.session_state[AMT_KEY] = AWARENESS_DATA[c]["cost_hint"]
@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+
+from modules.catalogue import DEFAULT_LANGUAGE
+from modules.database_setup import EVENT_CODES, get_conn
+from modules.write_behind import submit
+
+# ---------------------------------------------
+# SUGGESTION RANKER — Thompson sampling per (mood, language)
+# ---------------------------------------------
+# Every (mood, language) context keeps shows / helpful-vote counts for every
+# catalogue item in two int32 arrays. A pick draws one Beta sample per
+# candidate and takes the best, so items that help people in that mood rise
+# while untried ones still get explored. Items tagged with the mood start
+# with a head start (the old fixed mood → category mapping). Counts are
+# updated in memory and upserted to bandit_stats through the write-behind queue.
+# Callers can narrow a pick to one category, so the ranker only reorders what
+# suits the mood instead of replacing the mood mapping.
+
+PRIOR_BONUS = 2.0   # extra prior "wins" for items tagged with the context's mood
+
+UPSERT_SQL = """INSERT INTO bandit_stats (emotion, language, link, shows, wins) VALUES (?,?,?,?,?)
+                ON CONFLICT(emotion, language, link) DO UPDATE
+                SET shows = shows + excluded.shows, wins = wins + excluded.wins"""
+
+class ThompsonRanker:
+    def __init__(self, catalogue, prior_bonus: float = PRIOR_BONUS, seed=None, persist: bool = True):
+        self.catalogue = catalogue
+        self.persist = persist
+        self.moods = {label.lower(): code for code, label in enumerate(EVENT_CODES["emotion"])}
+        self.languages = sorted(catalogue.languages)
+        self._lang_index = {lang: i for i, lang in enumerate(self.languages)}
+        self._links = {it.link: it.id for it in catalogue.items}
+
+        n_contexts, n_arms = len(self.moods) * len(self.languages), len(catalogue)
+        self.shows = np.zeros((n_contexts, n_arms), dtype=np.int32)
+        self.wins = np.zeros((n_contexts, n_arms), dtype=np.int32)
+        self.prior = np.ones((n_contexts, n_arms), dtype=np.float32)
+        for it in catalogue.items:
+            for tag in it.tags:
+                if tag in self.moods:
+                    self.prior[self._row(self.moods[tag], it.language), it.id] += prior_bonus
+        self._arms = {lang: catalogue.ids_for(lang) for lang in self.languages}
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def _row(self, mood_code: int, lang: str) -> int:
+        return mood_code * len(self.languages) + self._lang_index[lang]
+
+    def _context(self, mood: str, lang: str):
+        lang = lang.lower()
+        if lang not in self._lang_index:
+            lang = DEFAULT_LANGUAGE if DEFAULT_LANGUAGE in self._lang_index else self.languages[0]
+        code = self.moods.get(mood.lower(), 0)
+        return code, lang, self._row(code, lang)
+
+    # ---------- ranking ----------
+    def _candidates(self, lang: str, category=None):
+        """Arms to sample: the whole language, or one category of it (the whole language if that's empty)."""
+        if category is None:
+            return self._arms[lang]
+        ids = self._arms.get((lang, category))
+        if ids is None:
+            ids = self.catalogue.ids_for(lang, category)
+            self._arms[(lang, category)] = ids = ids if len(ids) else self._arms[lang]
+        return ids
+
+    def rank(self, mood: str, lang: str, k: int = 1, exclude=(), category=None):
+        """Item ids for this context, best sampled first; `exclude` ids go last. `category` narrows the arms."""
+        _, lang, row = self._context(mood, lang)
+        ids = self._candidates(lang, category)
+        with self._lock:
+            alpha = self.prior[row, ids] + self.wins[row, ids]
+            beta = 1.0 + self.shows[row, ids] - self.wins[row, ids]
+            theta = self._rng.beta(alpha, beta)
+        if exclude:
+            theta[np.isin(ids, list(exclude))] -= 1.0
+        k = min(k, len(ids))
+        if k == 1:
+            return ids[[theta.argmax()]]
+        best = np.argpartition(-theta, k - 1)[:k]
+        return ids[best[np.argsort(-theta[best])]]
+
+    def pick(self, username: str, mood: str, lang: str, category=None):
+        """One suggestion for `username`, skipping what they saw recently; counts as a show."""
+        exclude = self.catalogue.recently_shown(username)
+        item = self.catalogue.items[int(self.rank(mood, lang, exclude=exclude, category=category)[0])]
+        self.catalogue.mark_shown(username, [item.id])
+        self.update(mood, lang, item.id, shown=1)
+        return item
+
+    # ---------- feedback ----------
+    def update(self, mood: str, lang: str, item_id: int, shown: int = 0, won: int = 0):
+        code, lang, row = self._context(mood, lang)
+        with self._lock:
+            self.shows[row, item_id] += shown
+            self.wins[row, item_id] += won
+        if self.persist:
+            submit(UPSERT_SQL, (code, lang, self.catalogue.items[item_id].link, shown, won))
+
+    def load(self, conn=None):
+        """Restore counts from bandit_stats (items no longer in the catalogue are ignored)."""
+        rows = (conn or get_conn()).execute("SELECT emotion, language, link, shows, wins FROM bandit_stats")
+        with self._lock:
+            for code, lang, link, shows, wins in rows:
+                item_id = self._links.get(link)
+                if item_id is None or lang not in self._lang_index or code >= len(self.moods):
+                    continue
+                row = self._row(code, lang)
+                self.shows[row, item_id] = shows
+                self.wins[row, item_id] = wins
+        return self
+
+def replay(choose, events, learn=None):
+    """
+    Offline replay evaluation over a log collected by a uniformly random policy.
+    `events`: iterable of (mood, lang, shown item id, reward). `choose(mood, lang)`
+    returns an item id; only events where it matches the logged item count, and
+    `learn(mood, lang, item_id, shown=1, won=reward)` sees exactly those.
+    Returns (mean reward, matched events).
+    """
+    total = matched = 0
+    for mood, lang, item_id, reward in events:
+        if choose(mood, lang) != item_id:
+            continue
+        matched += 1
+        total += reward
+        if learn is not None:
+            learn(mood, lang, item_id, shown=1, won=int(reward))
+    return (total / matched if matched else 0.0), matched
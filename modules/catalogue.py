@@ -0,0 +1,154 @@
+import json
+import threading
+from collections import OrderedDict, deque, namedtuple
+
+import numpy as np
+
+# ---------------------------------------------
+# CONTENT CATALOGUE — indexed, weighted sampling
+# ---------------------------------------------
+# Items live in flat arrays (one row per item) and are bucketed by
+# (language, category) and (language, category, mood tag). top_k scores a
+# whole bucket for many users in one vectorized pass (weighted Gumbel top-k),
+# and the suggestion ranker (modules.bandit) reads the same buckets.
+# Recently shown items are skipped per user.
+
+Item = namedtuple("Item", ["id", "title", "link", "language", "category", "tags", "weight"])
+
+RECENT_SIZE = 20        # items remembered per user for "don't show again"
+MAX_USERS = 10_000      # users whose recent items are kept (LRU)
+BATCH_CELLS = 1 << 20   # top_k scores at most this many (user, item) cells at once
+DEFAULT_LANGUAGE = "english"
+
+class _Bucket:
+    __slots__ = ("ids", "id_list")
+
+    def __init__(self, ids):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.id_list = list(ids)
+
+class Catalogue:
+    def __init__(self, items):
+        """`items`: iterable of dicts/tuples with title, link, language, category[, tags, weight]."""
+        self.items = []
+        for i, rec in enumerate(items):
+            rec = rec if isinstance(rec, dict) else dict(zip(Item._fields[1:], rec))
+            tags = rec.get("tags") or ()
+            if isinstance(tags, str):
+                tags = [t for t in tags.split(",") if t]
+            self.items.append(Item(i, rec["title"], rec["link"], rec["language"].lower(), rec["category"],
+                                   tuple(t.lower() for t in tags), float(rec.get("weight") or 1.0)))
+        self.weights = np.array([it.weight for it in self.items], dtype=np.float64)
+        self._log_weights = np.log(np.maximum(self.weights, 1e-12))
+
+        groups = {}
+        for it in self.items:
+            groups.setdefault((it.language, None), []).append(it.id)
+            groups.setdefault((it.language, it.category), []).append(it.id)
+            for tag in it.tags:
+                groups.setdefault((it.language, it.category, tag), []).append(it.id)
+        self._buckets = {key: _Bucket(ids) for key, ids in groups.items()}
+        self.languages = {it.language for it in self.items}
+
+        self._recent = OrderedDict()  # username -> (deque of ids, set of ids)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    # ---------- lookup ----------
+    def _bucket(self, lang, category=None, mood=None):
+        lang = lang.lower()
+        if lang not in self.languages:
+            lang = DEFAULT_LANGUAGE
+        if mood is not None and category is not None:
+            bucket = self._buckets.get((lang, category, mood.lower()))
+            if bucket is not None:
+                return bucket
+        return self._buckets.get((lang, category))
+
+    def ids_for(self, lang, category=None, mood=None):
+        """Item ids in a bucket as an int64 array (empty if there is none)."""
+        bucket = self._bucket(lang, category, mood)
+        return bucket.ids if bucket else np.empty(0, dtype=np.int64)
+
+    def items_for(self, lang, category=None, mood=None):
+        """Every item in a bucket, catalogue order."""
+        bucket = self._bucket(lang, category, mood)
+        return [self.items[i] for i in bucket.id_list] if bucket else []
+
+    # ---------- per-user exclusion ----------
+    def recently_shown(self, username):
+        with self._lock:
+            entry = self._recent.get(username)
+            return entry[1] if entry else frozenset()
+
+    def mark_shown(self, username, item_ids):
+        with self._lock:
+            entry = self._recent.get(username)
+            if entry is None:
+                entry = self._recent[username] = (deque(), set())
+                while len(self._recent) > MAX_USERS:
+                    self._recent.popitem(last=False)
+            else:
+                self._recent.move_to_end(username)
+            order, seen = entry
+            for i in item_ids:
+                if i in seen:
+                    continue
+                order.append(i)
+                seen.add(i)
+                if len(order) > RECENT_SIZE:
+                    seen.discard(order.popleft())
+
+    def forget(self, username):
+        with self._lock:
+            self._recent.pop(username, None)
+
+    # ---------- sampling ----------
+    def top_k(self, usernames, lang, k, category=None, mood=None, explore=True, rng=None):
+        """
+        k picks per user for many users at once (list of lists of Items).
+        explore=True draws k distinct items by weight (Gumbel top-k); False ranks by weight.
+        Recently shown items go last and only fill in when the bucket runs out.
+        """
+        bucket = self._bucket(lang, category, mood)
+        if bucket is None or not usernames:
+            return [[] for _ in usernames]
+        ids = bucket.ids
+        k = min(k, len(ids))
+        rng = rng or np.random.default_rng()
+        position = {item: col for col, item in enumerate(bucket.id_list)}
+        out = []
+        # users × items score matrix, a block of rows at a time to bound memory
+        block = max(1, BATCH_CELLS // len(ids))
+        for start in range(0, len(usernames), block):
+            users = usernames[start:start + block]
+            scores = np.broadcast_to(self._log_weights[ids], (len(users), len(ids))).copy()
+            if explore:
+                scores += rng.gumbel(size=scores.shape)
+            for row, user in enumerate(users):
+                cols = [position[i] for i in self.recently_shown(user) if i in position]
+                if cols:
+                    scores[row, cols] -= 1e6
+            best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            order = np.take_along_axis(scores, best, axis=1).argsort(axis=1)[:, ::-1]
+            picks = ids[np.take_along_axis(best, order, axis=1)]
+            for user, row in zip(users, picks.tolist()):
+                self.mark_shown(user, row)
+                out.append([self.items[i] for i in row])
+        return out
+
+# ---------- loaders ----------
+
+def from_nested(db, tags_by_category=None):
+    """Catalogue from the {language: {category: [(title, link), ...]}} layout."""
+    tags_by_category = tags_by_category or {}
+    return Catalogue({"title": title, "link": link, "language": lang, "category": cat,
+                      "tags": tags_by_category.get(cat, ())}
+                     for lang, cats in db.items() for cat, entries in cats.items() for title, link in entries)
+
+def from_json(path):
+    """Catalogue from a JSON list of {title, link, language, category, tags?, weight?}."""
+    with open(path, encoding="utf-8") as f:
+        return Catalogue(json.load(f))
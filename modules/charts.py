@@ -0,0 +1,56 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+# ---------------------------------------------
+# CHART RENDERING — Agg, object-oriented, cached
+# ---------------------------------------------
+# Figures are built with matplotlib's object API on a private Agg canvas (no
+# pyplot global state, safe across concurrent sessions) and the encoded image
+# bytes are cached by a hash of the data, so an unchanged chart is never
+# redrawn. matplotlib is only imported the first time a chart is rendered.
+
+CACHE_SIZE = 64
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+def _key(*parts) -> str:
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+def _render_bar(labels, values, title, xlabel, ylabel, rotate_x, figsize, fmt):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.bar(range(len(values)), values, width=0.8)
+    ax.set_xticks(range(len(labels)), labels)
+    ax.set_title(title)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+    if rotate_x:
+        ax.tick_params(axis="x", rotation=rotate_x)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt)
+    return buf.getvalue()
+
+def bar_chart(labels, values, title="", xlabel="", ylabel="", rotate_x=0, figsize=(6, 4), fmt="png") -> bytes:
+    """PNG (or SVG) bytes for a bar chart; identical inputs come straight from the LRU cache."""
+    labels = [str(l) for l in labels]
+    values = [float(v) for v in values]
+    key = _key("bar", labels, values, title, xlabel, ylabel, rotate_x, tuple(figsize), fmt)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    data = _render_bar(labels, values, title, xlabel, ylabel, rotate_x, figsize, fmt)
+    with _lock:
+        _cache[key] = data
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return data
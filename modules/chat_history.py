@@ -0,0 +1,123 @@
+import json
+import secrets
+import sys
+from collections import deque
+from datetime import datetime
+
+from modules import write_behind
+from modules.database_setup import get_conn
+
+# ---------------------------------------------
+# CHAT HISTORY — bounded ring buffer + SQLite log
+# ---------------------------------------------
+# The session keeps only the newest `cap` messages in memory. Every message
+# is also queued on the write-behind logger as it is added (which batches the
+# inserts), so a closed tab or an expired session loses nothing, and older
+# pages can be fetched on demand. Bot replies are kept as an interned
+# template id + params and rendered only when displayed.
+#
+# Login is just a typed name, so a name is not an identity: everything is
+# keyed on the login's random session token, and a new login starts with an
+# empty chat instead of whatever an earlier "Sam" wrote.
+
+USER, BOT = 0, 1
+DEFAULT_CAP = 200
+MISSING_REPLY = "💬 <i>(this reply is no longer available)</i>"
+
+INSERT_SQL = "INSERT INTO chat_messages (username, session, ts, role, text, template_id, params) VALUES (?,?,?,?,?,?,?)"
+
+def new_session() -> str:
+    """A fresh token for one login; chat history and dialog state are keyed on it."""
+    return secrets.token_urlsafe(16)
+
+def _render(entry):
+    ts, role, text, template_id, params = entry
+    if template_id is None:
+        return text
+    from modules.chatbot_logic import render_reply
+    try:
+        return render_reply(template_id, params)
+    except (KeyError, TypeError):  # template renamed or removed since the reply was stored
+        return text or MISSING_REPLY
+
+class ChatHistory:
+    __slots__ = ("username", "session", "cap", "_recent", "_total")
+
+    def __init__(self, username: str, session: str, cap: int = DEFAULT_CAP):
+        self.username = username
+        self.session = session  # the login's token (see new_session)
+        self.cap = cap
+        # entries: (ts, role, text, template_id, params)
+        self._recent = deque(maxlen=cap)
+        self._total = 0  # messages in the conversation, on disk or pending
+
+    def __len__(self):
+        return len(self._recent)
+
+    # ---------- writes ----------
+    def _append(self, role, text=None, template_id=None, params=None):
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if template_id is not None:
+            template_id = sys.intern(template_id)
+        self._recent.append((ts, role, text, template_id, params))
+        self._total += 1
+        write_behind.submit(INSERT_SQL, (self.username, self.session, ts, role, text, template_id,
+                                         json.dumps(params) if params is not None else None))
+
+    def add_user(self, text: str):
+        self._append(USER, text=text)
+
+    def add_bot(self, template_id: str, params: dict):
+        self._append(BOT, template_id=template_id, params=params)
+
+    def add_bot_text(self, html: str):
+        """For replies that don't come from a template (e.g. error messages)."""
+        self._append(BOT, text=html)
+
+    def flush(self):
+        """Wait until every queued message is in chat_messages."""
+        write_behind.flush()
+
+    def clear(self):
+        """Forget the conversation, in memory and on disk."""
+        self.flush()  # queued inserts must not land after the delete
+        self._recent.clear()
+        self._total = 0
+        conn = get_conn()
+        with conn:
+            conn.execute("DELETE FROM chat_messages WHERE session=?", (self.session,))
+
+    # ---------- reads ----------
+    def _from_db(self, limit: int):
+        rows = get_conn().execute(
+            "SELECT ts, role, text, template_id, params FROM chat_messages "
+            "WHERE session=? ORDER BY id DESC LIMIT ?", (self.session, limit)
+        ).fetchall()
+        return [(ts, role, text, sys.intern(tid) if tid else None, json.loads(params) if params else None)
+                for ts, role, text, tid, params in reversed(rows)]
+
+    def load(self):
+        """Restore this login's newest `cap` messages from disk."""
+        self.flush()
+        self._recent.clear()
+        self._recent.extend(self._from_db(self.cap))
+        self._total = get_conn().execute("SELECT COUNT(*) FROM chat_messages WHERE session=?",
+                                         (self.session,)).fetchone()[0]
+        return self
+
+    def last(self, count: int):
+        """Newest `count` messages as (sender label, html), oldest first; pages from disk past the buffer."""
+        if count <= len(self._recent) or self._total <= len(self._recent):
+            entries = list(self._recent)[-count:]
+        else:
+            self.flush()
+            entries = self._from_db(count)
+        out = []
+        for entry in entries:
+            ts, role = entry[0], entry[1]
+            when = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").strftime("%I:%M %p")
+            out.append((f"{'You' if role == USER else 'Bot'} ({when})", _render(entry)))
+        return out
+
+    def has_older(self, count: int) -> bool:
+        return self._total > count
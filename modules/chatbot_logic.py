@@ -1,5 +1,15 @@
 import random
 import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, namedtuple
+from itertools import product
+
+import numpy as np
+
+from modules.intent_engine import IntentMatcher
 
 # --------------------------------------------
 # RECOVERY CHATBOT LOGIC — MULTI-CONTENT EDITION 🌿
@@ -19,145 +29,592 @@ LINK_EXERCISE      = _a("https://www.youtube.com/results?search_query=5+minute+h
 LINK_MINDFUL_VIDEO = _a("https://www.youtube.com/results?search_query=guided+meditation+for+anxiety+10+minutes", "Guided Meditation 🧘‍♀️")
 LINK_BREATHING     = _a("https://www.youtube.com/watch?v=inpok4MKVLM", "4-7-8 Breathing Technique 🌬️")
 LINK_THERAPY       = _a("#therapist-booking", "Book a Therapy Session 💚")
+LINK_CALM_SOUNDS   = _a("https://www.youtube.com/results?search_query=rain+sounds+for+relaxation", "Calming Rain Sounds 🌧️")
 
 # Keyword categories
 SUBSTANCE_WORDS = ["drink", "alcohol", "smoke", "cigarette", "weed", "drugs"]
 NEGATIONS = ["not", "no", "dont", "don't", "never", "without", "won't", "cannot", "can't"]
+NEGATED_SUBSTANCE = [f"{neg} {kw}" for neg in NEGATIONS for kw in SUBSTANCE_WORDS] + \
+                    [f"{neg} to {kw}" for neg in NEGATIONS for kw in SUBSTANCE_WORDS]
+
+# Intent rules in priority order (first match wins)
+INTENT_RULES = [
+    # inflections that don't contain the base word are listed too ("dying", "suicidal")
+    ("crisis",     ["die", "dying", "suicide", "suicidal", "end my life", "ending my life", "kill myself",
+                    "killing myself"]),
+    ("no_craving", NEGATED_SUBSTANCE),
+    ("relapse",    SUBSTANCE_WORDS),
+    ("exercise",   ["exercise", "workout", "stretch", "yoga", "move body"]),
+    ("games",      ["game", "games", "play", "bored game"]),
+    ("music",      ["music", "song", "playlist", "tune", "melody"]),
+    ("movies",     ["movie", "film", "watch", "video", "show"]),
+    ("relax",      ["relax", "relaxation", "meditate", "calm", "peaceful", "mindfulness", "breathe"]),
+    ("sad",        ["sad", "upset", "low", "not good", "angry", "tired", "lonely"]),
+    ("positive",   ["good", "happy", "better", "fine", "awesome", "ok now", "okay now"]),
+    ("motivation", ["motivate", "quote", "advice", "inspire"]),
+    ("greeting",   ["hi", "hello", "hey", "morning", "evening"]),
+]
+
+# ---------- Tamil: Tamil script + Tanglish (romanized) + the English keywords ----------
+# Tanglish keywords are written with long vowels and doubled consonants;
+# _tanglish_variants adds the shortened spellings people actually type
+# ("paattu" -> "paatu", "patu", ...), so matching stays a plain substring scan.
+# Each word of a phrase is shortened on its own: people mix spellings within
+# one message ("saga maaten" for "saaga maatten").
+TANGLISH_FOLDS = [("aa", "a"), ("ee", "i"), ("oo", "u"), ("th", "t"), ("dh", "d"), ("zh", "l"),
+                  ("kk", "k"), ("tt", "t"), ("pp", "p"), ("ll", "l"), ("nn", "n"), ("ch", "s")]
+
+def _token_variants(token: str):
+    variants = {token}
+    for long, short in TANGLISH_FOLDS:
+        if long in token:
+            variants |= {v.replace(long, short) for v in variants}
+    return sorted(variants)
+
+def _tanglish_variants(word: str):
+    variants = {" ".join(tokens) for tokens in product(*map(_token_variants, word.split(" ")))}
+    return sorted(v for v in variants if len(v) >= 4 or v == word)
+
+# "no sarakku", "ganja vendaam": an English negation before a substance, or a
+# Tamil one after it, is no craving (the English rules do the same with NEGATIONS).
+TAMIL_SUBSTANCES = ["sarakku", "ganja", "beedi", "pothai", "dham"]
+TAMIL_NEGATIONS_AFTER = ["vendaam", "venaam", "illa"]
+
+TAMIL_NEGATED_SUBSTANCE = [
+    "kudikka maatten", "kudikkala", "kudikkalai", "kudikka vendaam", "thanni adikkala", "thanni adikka maatten",
+    "sarakku vendaam", "smoke pannala", "smoke panna maatten", "dham adikkala", "dham adikka maatten",
+    "குடிக்க மாட்டேன்", "குடிக்கல", "குடிக்கவில்லை", "குடிக்க வேண்டாம்", "புகைக்க மாட்டேன்", "புகைக்கவில்லை",
+    "மது வேண்டாம்", "போதை வேண்டாம்",
+    *[f"{neg} {kw}" for neg in NEGATIONS for kw in TAMIL_SUBSTANCES],
+    *[f"{kw} {neg}" for kw in TAMIL_SUBSTANCES + SUBSTANCE_WORDS for neg in TAMIL_NEGATIONS_AFTER],
+]
+TAMIL_INTENT_RULES = [
+    ("crisis",     ["saaganum", "saaga poren", "saaga venum", "saavanum", "sethudalaam", "sethu poganum",
+                    "sethuduven", "tharkolai", "uyira vidanum", "uyirai vida", "saaga maatten",
+                    "சாகணும்", "சாகப் போறேன்", "சாக வேண்டும்", "செத்துடலாம்", "செத்துப் போகணும்",
+                    "தற்கொலை", "உயிரை விட", "உயிரை மாய்", "சாக மாட்டேன்"]),
+    ("no_craving", TAMIL_NEGATED_SUBSTANCE),
+    ("relapse",    ["kudikkanum", "kudichen", "thanni adikkanum", "sarakku", "dham adikkanum", "ganja", "beedi",
+                    "pothai", "குடிக்கணும்", "குடிச்சேன்", "சாராயம்", "மது", "சிகரெட்", "பீடி", "கஞ்சா", "போதை"]),
+    ("exercise",   ["udarpayirchi", "nadakka poren", "odanum", "உடற்பயிற்சி", "யோகா", "நடைப்பயிற்சி"]),
+    ("games",      ["vilaiyaadanum", "vilaiyaattu", "விளையாட்டு", "விளையாடணும்"]),
+    ("music",      ["paattu", "isai", "பாட்டு", "பாடல்", "இசை"]),
+    ("movies",     ["padam paakkanum", "cinema", "thiraippadam", "படம்", "சினிமா", "திரைப்படம்"]),
+    ("relax",      ["amaidhi", "oyvu", "dhiyaanam", "moochu", "அமைதி", "ஓய்வு", "தியானம்", "மூச்சு"]),
+    ("sad",        ["kavalai", "sogam", "kashtam", "thanimai", "kobam", "sorvu", "bayam", "azhugai",
+                    "manasu sariyilla", "manasu sari illa", "nalla illa", "mood sari illa",
+                    "கவலை", "சோகம்", "கஷ்டம்", "தனிமை", "கோபம்", "சோர்வு", "பயம்", "அழுகை", "மனசு சரியில்ல"]),
+    ("positive",   ["santhosham", "nalla irukken", "semma", "magizhchi", "paravaayilla",
+                    "சந்தோஷம்", "மகிழ்ச்சி", "நல்லா இருக்கேன்", "பரவாயில்ல"]),
+    ("motivation", ["ookkam", "thannambikkai", "arivurai", "ponmozhi", "ஊக்கம்", "தன்னம்பிக்கை", "அறிவுரை", "பொன்மொழி"]),
+    ("greeting",   ["vanakkam", "eppadi irukkeenga", "வணக்கம்", "எப்படி இருக்கீங்க"]),
+]
+
+def _merged_rules(native, base=INTENT_RULES):
+    """`native` keywords (plus Tanglish spellings) on top of `base`, keeping base's intent order."""
+    extra = dict(native)
+    rules = []
+    for intent, words in base:
+        words = list(words)
+        for w in extra.get(intent, ()):
+            w = unicodedata.normalize("NFC", w)
+            words += _tanglish_variants(w) if w.isascii() else [w]
+        rules.append((intent, list(dict.fromkeys(words))))
+    return rules
+
+# ---------- per-language automata, built once at import ----------
+# Each language also gets an ASCII-only automaton (English + Tanglish) for
+# messages with no Tamil script in them; str.isascii() is O(1), and those
+# messages then never pay for the script keywords.
+#
+# The automata match substrings, and the crisis *reply* keeps doing so: a
+# helpline reply to "i am on a diet" is cheap, a missed "i wish i died" is
+# not. Paging a therapist is another matter, so a live crisis reply raises an
+# alert only if `alert` also matches: English crisis words as whole words in
+# any inflection (died, dying, killing myself), Tamil and Tanglish keywords
+# at the start of a word, because Tamil adds case endings straight onto the
+# word (தற்கொலைக்கு, saaganumnu).
+_CRISIS_BIT = 1  # crisis is rule 0 in every language
+_WORD_CHAR = r"[\w\u0B80-\u0BFF]"  # Tamil vowel signs and virama aren't \w
+ALERT_FORMS = {  # English crisis keyword -> the forms that raise an alert
+    "die": r"d(?:ie[sd]?|ying)",
+    "suicide": r"suicid(?:e|al)",
+    "end my life": r"end(?:s|ed|ing)? my life",
+    "kill myself": r"kill(?:s|ed|ing)? myself",
+}
+_Lang = namedtuple("_Lang", ["matcher", "ascii_matcher", "alert", "choosing_life"])
+
+def _alert_regex(words):
+    english = set(dict(INTENT_RULES)["crisis"])
+    parts = [ALERT_FORMS.get(w, re.escape(w)) + (f"(?!{_WORD_CHAR})" if w in english else "")
+             for w in sorted(words, key=len, reverse=True)]
+    return re.compile(f"(?<!{_WORD_CHAR})(?:{'|'.join(parts)})")
+
+def _build_lang(rules, choosing_life):
+    matcher = IntentMatcher(rules)
+    alert = _alert_regex(dict(rules)["crisis"])
+    if all(w.isascii() for _, words in rules for w in words):
+        return _Lang(matcher, matcher, alert, choosing_life)
+    ascii_rules = [(intent, [w for w in words if w.isascii()]) for intent, words in rules]
+    return _Lang(matcher, IntentMatcher(ascii_rules), alert, choosing_life)
+
+_LANGS = {
+    "english": _build_lang(INTENT_RULES, re.compile(r"\bnot\b.*\b(die|suicide|kill myself)\b")),
+    "tamil": _build_lang(_merged_rules(TAMIL_INTENT_RULES),
+                         re.compile(r"\bnot\b.*\b(die|suicide|kill myself)\b|saa?ga maa?tt?en|சாக மாட்டேன்")),
+}
+DEFAULT_LANG = "english"
+
+def _lang(lang):
+    return _LANGS.get(lang) or _LANGS[DEFAULT_LANG]
+
+def normalize(user_msg: str) -> str:
+    """Lowercase/strip; non-ASCII text is also NFC-normalized so Tamil keywords match."""
+    msg = user_msg.lower().strip()
+    return msg if msg.isascii() else unicodedata.normalize("NFC", msg)
 
-def _has_any(msg, words): return any(w in msg for w in words)
-
-def _is_negated(msg, keywords):
-    for neg in NEGATIONS:
-        for kw in keywords:
-            if f"{neg} {kw}" in msg or f"{neg} to {kw}" in msg:
-                return True
-    return False
+def classify_intent(msg: str, lang: str = DEFAULT_LANG) -> str:
+    """Return the intent for a normalized message (single scan of `lang`'s automaton)."""
+    rules = _lang(lang)
+    matcher = rules.ascii_matcher if msg.isascii() else rules.matcher
+    hits = matcher.hits(msg)
+    if not hits:
+        return "default"
+    if hits & _CRISIS_BIT and rules.choosing_life.search(msg):
+        return "choosing_life"
+    return matcher.intents[(hits & -hits).bit_length() - 1]
 
 
 # --------------------------------------------------
-# MAIN CHATBOT REPLY LOGIC
+# RESPONSE CATALOGUE
 # --------------------------------------------------
+# template_id ("intent/variant") -> reply HTML with a {name} slot. Everything
+# but the name is built once here and pre-split into static fragments, so a
+# reply is a single str.join at runtime.
 
-def get_reply(user_msg, username="Friend", lang="english"):
-    msg = user_msg.lower().strip()
-    name = username.capitalize()
-
+REPLY_TEMPLATES = {
     # ✅ 1. Prevent misclassification: “not to die”
-    if re.search(r"\bnot\b.*\b(die|suicide|kill myself)\b", msg):
-        return f"💚 That’s wonderful, {name}. Choosing life shows courage 🌱 You’re growing stronger every day."
+    "choosing_life/0": "💚 That’s wonderful, {name}. Choosing life shows courage 🌱 You’re growing stronger every day.",
 
     # 🚨 2. Crisis / self-harm check
-    if _has_any(msg, ["die", "suicide", "end my life", "kill myself"]):
-        return (
-            f"⚠️ {name}, I sense you’re in deep distress.<br>"
-            "You are <b>not alone</b>. Please reach out for help:<br>"
-            "📞 <b>Snehi Helpline (India): 9152987821</b><br>"
-            "💬 Talk to someone you trust.<br>"
-            "Your life matters, {name}. Let’s take a slow breath together 💚"
-        )
+    "crisis/0": (
+        "⚠️ {name}, I sense you’re in deep distress.<br>"
+        "You are <b>not alone</b>. Please reach out for help:<br>"
+        "📞 <b>Snehi Helpline (India): 9152987821</b><br>"
+        "💬 Talk to someone you trust.<br>"
+        "Your life matters, {name}. Let’s take a slow breath together 💚"
+    ),
 
     # 🍺 3. Relapse trigger (alcohol/smoking/drug)
-    if _has_any(msg, SUBSTANCE_WORDS):
-        if _is_negated(msg, SUBSTANCE_WORDS):
-            return f"💚 Great job, {name}! Avoiding cravings takes strength 🌿 Try {LINK_SPOTIFY_HAPPY} for motivation."
-        return (
-            f"It’s okay, {name}. Relapse thoughts don’t mean failure — recovery is a journey 🌱<br>"
-            f"Let’s do something helpful together — try a grounding activity:<br>"
-            f"➡️ {LINK_BREATHING}<br>"
-            f"➡️ {LINK_EXERCISE}<br>"
-            f"➡️ or {LINK_MINDFUL_VIDEO}<br>"
-            "Would you like me to guide a short 2-minute breathing now?"
-        )
+    "no_craving/0": f"💚 Great job, {{name}}! Avoiding cravings takes strength 🌿 Try {LINK_SPOTIFY_HAPPY} for motivation.",
+    "relapse/0": (
+        f"It’s okay, {{name}}. Relapse thoughts don’t mean failure — recovery is a journey 🌱<br>"
+        f"Let’s do something helpful together — try a grounding activity:<br>"
+        f"➡️ {LINK_BREATHING}<br>"
+        f"➡️ {LINK_EXERCISE}<br>"
+        f"➡️ or {LINK_MINDFUL_VIDEO}<br>"
+        "Would you like me to guide a short 2-minute breathing now?"
+    ),
 
     # 🧘 4. Exercise request
-    if _has_any(msg, ["exercise", "workout", "stretch", "yoga", "move body"]):
-        return (
-            f"Great idea, {name}! Movement helps balance your mind 🌿<br>"
-            f"Try these quick workouts:<br>"
-            f"➡️ {LINK_EXERCISE}<br>"
-            f"➡️ {LINK_BREATHING}<br>"
-            f"➡️ {LINK_MINDFUL_VIDEO}<br>"
-            "Would you like me to suggest one daily reminder for movement?"
-        )
+    "exercise/0": (
+        f"Great idea, {{name}}! Movement helps balance your mind 🌿<br>"
+        f"Try these quick workouts:<br>"
+        f"➡️ {LINK_EXERCISE}<br>"
+        f"➡️ {LINK_BREATHING}<br>"
+        f"➡️ {LINK_MINDFUL_VIDEO}<br>"
+        "Would you like me to suggest one daily reminder for movement?"
+    ),
 
     # 🎮 5. Games request
-    if _has_any(msg, ["game", "games", "play", "bored game"]):
-        return (
-            f"Here you go, {name}! 🎮 Try one of these to relax:<br>"
-            f"➡️ {LINK_GAME_RELAX}<br>"
-            f"➡️ {_a('https://poki.com/en/g/fidget-spinner','Fidget Spinner Game 🌀')}<br>"
-            f"➡️ {_a('https://poki.com/en/g/zen','Zen Garden 🌸')}<br>"
-            "Fun is therapy too — pick one and enjoy 🌿"
-        )
+    "games/0": (
+        f"Here you go, {{name}}! 🎮 Try one of these to relax:<br>"
+        f"➡️ {LINK_GAME_RELAX}<br>"
+        f"➡️ {_a('https://poki.com/en/g/fidget-spinner','Fidget Spinner Game 🌀')}<br>"
+        f"➡️ {_a('https://poki.com/en/g/zen','Zen Garden 🌸')}<br>"
+        "Fun is therapy too — pick one and enjoy 🌿"
+    ),
 
     # 🎵 6. Music request
-    if _has_any(msg, ["music", "song", "playlist", "tune", "melody"]):
-        return (
-            f"🎵 Music heals, {name}. Try these:<br>"
-            f"➡️ {LINK_SPOTIFY_CALM}<br>"
-            f"➡️ {LINK_SPOTIFY_HAPPY}<br>"
-            f"➡️ {_a('https://open.spotify.com/playlist/37i9dQZF1DWVqfgj8NZEp1','Peaceful Piano Nights 🎹')}<br>"
-            "Would you like a playlist that matches your current mood?"
-        )
+    "music/0": (
+        f"🎵 Music heals, {{name}}. Try these:<br>"
+        f"➡️ {LINK_SPOTIFY_CALM}<br>"
+        f"➡️ {LINK_SPOTIFY_HAPPY}<br>"
+        f"➡️ {_a('https://open.spotify.com/playlist/37i9dQZF1DWVqfgj8NZEp1','Peaceful Piano Nights 🎹')}<br>"
+        "Would you like a playlist that matches your current mood?"
+    ),
 
     # 🎬 7. Movie / video requests
-    if _has_any(msg, ["movie", "film", "watch", "video", "show"]):
-        return (
-            f"Here’s something uplifting, {name} 🎬<br>"
-            f"➡️ {LINK_MOVIES_FEEL}<br>"
-            f"➡️ {LINK_COMEDY}<br>"
-            "Laughter and light stories are powerful healers 🌸"
-        )
+    "movies/0": (
+        f"Here’s something uplifting, {{name}} 🎬<br>"
+        f"➡️ {LINK_MOVIES_FEEL}<br>"
+        f"➡️ {LINK_COMEDY}<br>"
+        "Laughter and light stories are powerful healers 🌸"
+    ),
 
     # 🌙 8. Relax / meditation / calm request
-    if _has_any(msg, ["relax", "relaxation", "meditate", "calm", "peaceful", "mindfulness", "breathe"]):
-        return (
-            f"🧘 Let’s relax together, {name}. Try one of these calming choices:<br>"
-            f"➡️ {LINK_MINDFUL_VIDEO}<br>"
-            f"➡️ {LINK_BREATHING}<br>"
-            f"➡️ {_a('https://www.youtube.com/watch?v=ZToicYcHIOU','10-Minute Mindful Breathing 🌿')}<br>"
-            "Would you like me to play calming background sounds too?"
-        )
+    "relax/0": (
+        f"🧘 Let’s relax together, {{name}}. Try one of these calming choices:<br>"
+        f"➡️ {LINK_MINDFUL_VIDEO}<br>"
+        f"➡️ {LINK_BREATHING}<br>"
+        f"➡️ {_a('https://www.youtube.com/watch?v=ZToicYcHIOU','10-Minute Mindful Breathing 🌿')}<br>"
+        "Would you like me to play calming background sounds too?"
+    ),
 
     # 💬 9. General emotions (sad, anxious, bored)
-    if _has_any(msg, ["sad", "upset", "low", "not good", "angry", "tired", "lonely"]):
-        responses = [
-            f"I hear you, {name}. It’s okay to feel that way 💚 Try a reset: breathe slowly and listen to {LINK_SPOTIFY_CALM}.",
-            f"You’re not alone, {name}. Here’s a 2-min calm session: {LINK_MINDFUL_VIDEO}",
-            f"Bad days pass too, {name}. Maybe watch {LINK_COMEDY} to lift your mood 🌤️"
-        ]
-        return random.choice(responses)
+    "sad/0": f"I hear you, {{name}}. It’s okay to feel that way 💚 Try a reset: breathe slowly and listen to {LINK_SPOTIFY_CALM}.",
+    "sad/1": f"You’re not alone, {{name}}. Here’s a 2-min calm session: {LINK_MINDFUL_VIDEO}",
+    "sad/2": f"Bad days pass too, {{name}}. Maybe watch {LINK_COMEDY} to lift your mood 🌤️",
 
     # 💪 10. Positive moods
-    if _has_any(msg, ["good", "happy", "better", "fine", "awesome", "ok now", "okay now"]):
-        return f"That’s amazing, {name}! 🌸 Keep that energy alive with {LINK_SPOTIFY_HAPPY} or {LINK_MOVIES_FEEL}."
+    "positive/0": f"That’s amazing, {{name}}! 🌸 Keep that energy alive with {LINK_SPOTIFY_HAPPY} or {LINK_MOVIES_FEEL}.",
 
     # 🧠 11. Motivation / quote / advice
-    if _has_any(msg, ["motivate", "quote", "advice", "inspire"]):
-        quotes = [
-            "🌿 <i>Healing is not about speed — it’s about direction.</i>",
-            "💫 <i>Recovery doesn’t mean perfection, it means progress.</i>",
-            "🌻 <i>You’ve survived 100% of your bad days — that’s strength.</i>"
-        ]
-        return random.choice(quotes)
+    "motivation/0": "🌿 <i>Healing is not about speed — it’s about direction.</i>",
+    "motivation/1": "💫 <i>Recovery doesn’t mean perfection, it means progress.</i>",
+    "motivation/2": "🌻 <i>You’ve survived 100% of your bad days — that’s strength.</i>",
 
     # 🙋 12. Greetings
-    if _has_any(msg, ["hi", "hello", "hey", "morning", "evening"]):
-        return f"👋 Hey {name}! How are you feeling today?"
+    "greeting/0": "👋 Hey {name}! How are you feeling today?",
 
     # 🕊️ 13. Default fallback
-    return (
-        f"Thanks for sharing, {name}. I’m here to help 🌿<br>"
+    "default/0": (
+        "Thanks for sharing, {name}. I’m here to help 🌿<br>"
         "You can ask me for <b>music</b>, <b>games</b>, <b>exercise</b>, or <b>relaxation</b> ideas anytime 💚"
-    )
-
-
-
-
-
-
-
-
+    ),
+
+    # 🔁 14. Follow-ups: answers to the offers above (see OFFERS)
+    "breathing_guide/0": (
+        "🌬️ Let’s do it together, {name}:<br>"
+        "1️⃣ Breathe in through your nose for 4<br>"
+        "2️⃣ Hold for 7<br>"
+        "3️⃣ Breathe out slowly through your mouth for 8<br>"
+        f"Repeat 4 times — about 2 minutes. You can follow along with {LINK_BREATHING} 💚"
+    ),
+    "movement_reminder/0": (
+        "⏰ Here’s one, {name}: same time every day, 5 minutes of walking or stretching — right after "
+        f"your morning tea is an easy one to keep. Start today with {LINK_EXERCISE} 🌿"
+    ),
+    "mood_playlist/0": (
+        f"🎧 Pick by how you feel right now, {{name}}:<br>"
+        f"➡️ need to slow down: {LINK_SPOTIFY_CALM}<br>"
+        f"➡️ want a lift: {LINK_SPOTIFY_HAPPY}"
+    ),
+    "calm_sounds/0": (
+        f"🌧️ Here you go, {{name}}: {LINK_CALM_SOUNDS}<br>"
+        "Keep it soft in the background and let your breathing slow down with it 🌿"
+    ),
+    "offer_declined/0": "No problem, {name} 💚 I’m here whenever you want to talk.",
+}
+
+LINK_TAMIL_MELODY     = _a("https://www.youtube.com/results?search_query=peaceful+tamil+melodies", "Tamil Melodies 🎶")
+LINK_TAMIL_MEDITATION = _a("https://www.youtube.com/results?search_query=tamil+guided+meditation", "Tamil Meditation 🧘‍♀️")
+
+REPLY_TEMPLATES_TAMIL = {
+    "choosing_life/0": "💚 அருமை, {name}! வாழ்வைத் தேர்ந்தெடுப்பது பெரிய தைரியம் 🌱 நீங்கள் ஒவ்வொரு நாளும் வலிமையாகிறீர்கள்.",
+
+    "crisis/0": (
+        "⚠️ {name}, நீங்கள் மிகுந்த வேதனையில் இருப்பதை உணர்கிறேன்.<br>"
+        "நீங்கள் <b>தனியாக இல்லை</b>. உடனே உதவி பெறுங்கள்:<br>"
+        "📞 <b>Sneha (சென்னை): 044-24640050</b><br>"
+        "📞 <b>Snehi Helpline (India): 9152987821</b><br>"
+        "💬 நம்பிக்கையான ஒருவரிடம் பேசுங்கள்.<br>"
+        "உங்கள் உயிர் முக்கியம், {name}. மெதுவாக ஒரு மூச்சு எடுப்போம் 💚"
+    ),
+
+    "no_craving/0": f"💚 சூப்பர், {{name}}! ஆசையைத் தவிர்க்க மன வலிமை வேண்டும் 🌿 உற்சாகத்துக்கு {LINK_SPOTIFY_HAPPY} கேளுங்கள்.",
+    "relapse/0": (
+        f"பரவாயில்லை, {{name}}. இந்த எண்ணங்கள் தோல்வி அல்ல — மீட்பு ஒரு பயணம் 🌱<br>"
+        f"இப்போது ஒன்றாக ஏதாவது செய்வோம்:<br>"
+        f"➡️ {LINK_BREATHING}<br>"
+        f"➡️ {LINK_EXERCISE}<br>"
+        f"➡️ அல்லது {LINK_MINDFUL_VIDEO}<br>"
+        "2 நிமிட மூச்சுப் பயிற்சியை இப்போதே செய்யலாமா?"
+    ),
+
+    "exercise/0": (
+        f"நல்ல யோசனை, {{name}}! உடல் அசைவு மனதைச் சமநிலைப்படுத்தும் 🌿<br>"
+        f"இவற்றை முயற்சி செய்யுங்கள்:<br>"
+        f"➡️ {LINK_EXERCISE}<br>"
+        f"➡️ {LINK_BREATHING}<br>"
+        f"➡️ {LINK_MINDFUL_VIDEO}<br>"
+        "தினமும் உடற்பயிற்சி நினைவூட்டல் வேண்டுமா?"
+    ),
+
+    "games/0": (
+        f"இதோ, {{name}}! 🎮 ரிலாக்ஸ் செய்ய இவற்றில் ஒன்றை விளையாடுங்கள்:<br>"
+        f"➡️ {LINK_GAME_RELAX}<br>"
+        f"➡️ {_a('https://poki.com/en/g/fidget-spinner','Fidget Spinner Game 🌀')}<br>"
+        f"➡️ {_a('https://poki.com/en/g/zen','Zen Garden 🌸')}<br>"
+        "விளையாட்டும் ஒரு சிகிச்சைதான் 🌿"
+    ),
+
+    "music/0": (
+        f"🎵 இசை மனதை ஆற்றும், {{name}}. இவற்றைக் கேளுங்கள்:<br>"
+        f"➡️ {LINK_TAMIL_MELODY}<br>"
+        f"➡️ {LINK_SPOTIFY_CALM}<br>"
+        f"➡️ {LINK_SPOTIFY_HAPPY}<br>"
+        "உங்கள் மனநிலைக்கு ஏற்ற பாடல்கள் வேண்டுமா?"
+    ),
+
+    "movies/0": (
+        f"உற்சாகமூட்டும் ஒன்று, {{name}} 🎬<br>"
+        f"➡️ {LINK_MOVIES_FEEL}<br>"
+        f"➡️ {LINK_COMEDY}<br>"
+        "சிரிப்பும் நல்ல கதைகளும் மனதை ஆற்றும் 🌸"
+    ),
+
+    "relax/0": (
+        f"🧘 ஒன்றாக ரிலாக்ஸ் செய்வோம், {{name}}. அமைதிக்கு இவற்றில் ஒன்று:<br>"
+        f"➡️ {LINK_TAMIL_MEDITATION}<br>"
+        f"➡️ {LINK_BREATHING}<br>"
+        f"➡️ {LINK_MINDFUL_VIDEO}<br>"
+        "அமைதியான பின்னணி ஒலிகளும் வேண்டுமா?"
+    ),
+
+    "sad/0": f"உங்கள் மனநிலை புரிகிறது, {{name}}. இப்படி உணர்வது இயல்புதான் 💚 மெதுவாக மூச்சு விட்டு {LINK_TAMIL_MELODY} கேளுங்கள்.",
+    "sad/1": f"நீங்கள் தனியாக இல்லை, {{name}}. 2 நிமிட அமைதிப் பயிற்சி: {LINK_TAMIL_MEDITATION}",
+    "sad/2": f"கஷ்டமான நாட்களும் கடந்து போகும், {{name}}. மனதை இலகுவாக்க {LINK_COMEDY} பாருங்கள் 🌤️",
+
+    "positive/0": f"அருமை, {{name}}! 🌸 இந்த உற்சாகத்தைத் தொடர {LINK_SPOTIFY_HAPPY} அல்லது {LINK_MOVIES_FEEL}.",
+
+    "motivation/0": "🌿 <i>குணமடைவது வேகத்தைப் பற்றியது அல்ல — திசையைப் பற்றியது.</i>",
+    "motivation/1": "💫 <i>மீட்பு என்றால் முழுமை அல்ல, முன்னேற்றம்.</i>",
+    "motivation/2": "🌻 <i>உங்கள் கடினமான நாட்கள் அனைத்தையும் கடந்து வந்திருக்கிறீர்கள் — அதுவே வலிமை.</i>",
+
+    "greeting/0": "👋 வணக்கம் {name}! இன்று எப்படி உணர்கிறீர்கள்?",
+
+    "default/0": (
+        "பகிர்ந்ததற்கு நன்றி, {name}. உதவ நான் இங்கே இருக்கிறேன் 🌿<br>"
+        "<b>பாட்டு</b>, <b>விளையாட்டு</b>, <b>உடற்பயிற்சி</b>, <b>அமைதி</b> யோசனைகளை எப்போது வேண்டுமானாலும் கேளுங்கள் 💚"
+    ),
+
+    "breathing_guide/0": (
+        "🌬️ ஒன்றாகச் செய்வோம், {name}:<br>"
+        "1️⃣ மூக்கின் வழியாக 4 எண்ணிக்கை மூச்சை இழுங்கள்<br>"
+        "2️⃣ 7 எண்ணிக்கை நிறுத்துங்கள்<br>"
+        "3️⃣ வாயின் வழியாக 8 எண்ணிக்கை மெதுவாக விடுங்கள்<br>"
+        f"4 முறை செய்யுங்கள் — சுமார் 2 நிமிடம். {LINK_BREATHING} உடன் சேர்ந்தும் செய்யலாம் 💚"
+    ),
+    "movement_reminder/0": (
+        "⏰ இதோ ஒன்று, {name}: தினமும் ஒரே நேரத்தில் 5 நிமிடம் நடை அல்லது ஸ்ட்ரெச்சிங் — காலை டீக்குப் பிறகு "
+        f"என்றால் மறக்காது. இன்றே {LINK_EXERCISE} உடன் தொடங்குங்கள் 🌿"
+    ),
+    "mood_playlist/0": (
+        f"🎧 இப்போதைய மனநிலைக்கு ஏற்ப தேர்ந்தெடுங்கள், {{name}}:<br>"
+        f"➡️ மனம் அமைதியாக வேண்டும்: {LINK_TAMIL_MELODY}<br>"
+        f"➡️ உற்சாகம் வேண்டும்: {LINK_SPOTIFY_HAPPY}"
+    ),
+    "calm_sounds/0": (
+        f"🌧️ இதோ, {{name}}: {LINK_CALM_SOUNDS}<br>"
+        "மெதுவான ஒலியில் வைத்து, அதனுடன் உங்கள் மூச்சை மெதுவாக்குங்கள் 🌿"
+    ),
+    "offer_declined/0": "பரவாயில்லை, {name} 💚 பேச வேண்டும் என்றால் எப்போதும் நான் இங்கே இருக்கிறேன்.",
+}
+
+# language -> templates. English ids are bare ("sad/0"); other languages are
+# prefixed ("tamil:sad/0") so stored chat history renders in the language it
+# was written in. Intents without a localized phrasing fall back to English.
+LANG_TEMPLATES = {"english": REPLY_TEMPLATES, "tamil": REPLY_TEMPLATES_TAMIL}
+
+_FRAGMENTS = {}
+# (language, intent) -> its template ids (one per phrasing)
+_INTENT_TEMPLATES = {}
+for _lang_name, _templates in LANG_TEMPLATES.items():
+    for _tid, _text in _templates.items():
+        _key = sys.intern(_tid if _lang_name == "english" else f"{_lang_name}:{_tid}")
+        _FRAGMENTS[_key] = _text.split("{name}")
+        _INTENT_TEMPLATES.setdefault((_lang_name, _tid.rsplit("/", 1)[0]), []).append(_key)
+for _lang_name in LANG_TEMPLATES:
+    for _intent in [i for (l, i) in list(_INTENT_TEMPLATES) if l == "english"]:
+        _INTENT_TEMPLATES.setdefault((_lang_name, _intent), _INTENT_TEMPLATES[("english", _intent)])
+
+Reply = namedtuple("Reply", ["intent", "template_id", "params"])
+
+# ---------- follow-ups ----------
+# Replies that end with an offer, and the intent a "yes" to it gets. Callers
+# that pass a DialogState (modules.dialog_state) to get_reply_ref have the
+# open offer remembered for the next turn; a whole message that answers yes
+# or no then resolves with one dict lookup, and anything else is classified
+# as usual (so "yes but i want to die" still reaches the crisis rules).
+OFFERS = {"relapse/0": "breathing_guide", "exercise/0": "movement_reminder",
+          "music/0": "mood_playlist", "relax/0": "calm_sounds"}
+DECLINED = "offer_declined"
+_OFFERS = {key: OFFERS[key.split(":", 1)[-1]] for key in _FRAGMENTS if key.split(":", 1)[-1] in OFFERS}
+FOLLOW_UP_ANSWERS = {
+    **dict.fromkeys(["yes", "y", "yeah", "yea", "yep", "yup", "ya", "sure", "ok", "okay", "ok sure", "yes please",
+                     "please", "of course", "go ahead", "why not", "lets do it", "let's do it", "aama", "aamaa",
+                     "aam", "sari", "seri", "ok sari", "venum", "ஆமா", "ஆம்", "சரி", "வேணும்", "வேண்டும்"], True),
+    **dict.fromkeys(["no", "n", "nope", "nah", "no thanks", "not now", "later", "maybe later", "illa", "illai",
+                     "vendaam", "venda", "இல்லை", "இல்ல", "வேண்டாம்", "வேணாம்"], False),
+}
+FOLLOW_UP_ANSWERS = {unicodedata.normalize("NFC", k): v for k, v in FOLLOW_UP_ANSWERS.items()}
+
+def follow_up(state, msg: str):
+    """Intent answering `state`'s open offer if the normalized `msg` is a bare yes/no, else None."""
+    offer = state.pending_offer() if state is not None else None
+    if offer is None:
+        return None
+    answer = FOLLOW_UP_ANSWERS.get(msg.rstrip(" .!?,"))
+    if answer is None:
+        return None
+    return offer if answer else DECLINED
 
 
+# --------------------------------------------------
+# MAIN CHATBOT REPLY LOGIC
+# --------------------------------------------------
 
+# ---------- intent cache ----------
+# Normalized message -> intent, bounded (LRU) and time-limited (TTL). Only the
+# deterministic classification is cached; the phrasing is still drawn per
+# reply. Crisis results are never stored, so those messages always go
+# through the full classifier.
+INTENT_CACHE_SIZE = 4096
+INTENT_CACHE_TTL = 600.0  # seconds
+SAFETY_INTENTS = {"crisis", "choosing_life"}  # always decided by the rules
+_UNCACHED = SAFETY_INTENTS
+
+# Optional ML stage (see modules.intent_model): anything with predict(msg) and
+# predict_many(msgs) returning an intent or None. It runs on top of the rules:
+# RULE_FIRST answers are final (a missed crisis or relapse costs far more than
+# a misplaced suggestion), and where the model abstains (None) the rule
+# answer stands.
+RULE_FIRST = SAFETY_INTENTS | {"relapse"}
+_model = None
+
+def use_intent_model(model):
+    """Plug in (or, with None, remove) the classifier stage."""
+    global _model
+    _model = model
+    intent_cache_clear()
+
+def detect_intent(msg: str, lang: str = DEFAULT_LANG) -> str:
+    """classify_intent plus the model stage, if one is plugged in (it is trained on English only)."""
+    intent = classify_intent(msg, lang)
+    if _model is None or lang != DEFAULT_LANG or intent in RULE_FIRST:
+        return intent
+    return _model.predict(msg) or intent
+
+_intent_cache = OrderedDict()  # (lang, msg) -> (intent, expires_at)
+_intent_cache_lock = threading.Lock()
+_intent_cache_stats = {"hits": 0, "misses": 0}
+
+def cached_intent(msg: str, lang: str = DEFAULT_LANG) -> str:
+    """detect_intent through the LRU/TTL cache; `msg` must already be normalized."""
+    now = time.monotonic()
+    key = (lang, msg)
+    with _intent_cache_lock:
+        entry = _intent_cache.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                _intent_cache.move_to_end(key)
+                _intent_cache_stats["hits"] += 1
+                return entry[0]
+            del _intent_cache[key]
+        _intent_cache_stats["misses"] += 1
+    intent = detect_intent(msg, lang)
+    if intent not in _UNCACHED:
+        with _intent_cache_lock:
+            _intent_cache[key] = (intent, now + INTENT_CACHE_TTL)
+            while len(_intent_cache) > INTENT_CACHE_SIZE:
+                _intent_cache.popitem(last=False)
+    return intent
+
+def intent_cache_info() -> dict:
+    """Hit/miss counters and size, for monitoring."""
+    with _intent_cache_lock:
+        hits, misses = _intent_cache_stats["hits"], _intent_cache_stats["misses"]
+        return {"hits": hits, "misses": misses, "size": len(_intent_cache),
+                "maxsize": INTENT_CACHE_SIZE, "ttl": INTENT_CACHE_TTL,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0}
+
+def intent_cache_clear():
+    with _intent_cache_lock:
+        _intent_cache.clear()
+        _intent_cache_stats["hits"] = _intent_cache_stats["misses"] = 0
+
+def _pick(intent, name, rng=random, lang=DEFAULT_LANG):
+    """Choose a phrasing for `intent` in `lang`; only multi-variant intents draw from `rng`."""
+    options = _INTENT_TEMPLATES.get((lang, intent)) or _INTENT_TEMPLATES[(DEFAULT_LANG, intent)]
+    template_id = options[rng.randrange(len(options))] if len(options) > 1 else options[0]
+    return Reply(intent, template_id, {"name": name})
+
+def render_reply(template_id, params):
+    return params["name"].join(_FRAGMENTS[template_id])
+
+# Called as fn(username, message) whenever a live reply hits the crisis intent
+# (the app registers modules.crisis_alerts.raise_alert). Batch replays don't fire them.
+_crisis_handlers = []
+
+def add_crisis_handler(fn):
+    if fn not in _crisis_handlers:
+        _crisis_handlers.append(fn)
+
+def _on_crisis(username, user_msg):
+    for fn in _crisis_handlers:
+        try:
+            fn(username, user_msg)
+        except Exception as e:  # the helpline reply must still go out
+            print(f"crisis handler {fn!r} failed: {e!r}", file=sys.stderr)
+
+def get_reply_ref(user_msg, username="Friend", lang="english", state=None) -> Reply:
+    """
+    Reply as (intent, template_id, params), for callers that cache, log or store replies.
+    With a DialogState, a bare yes/no answers the previous reply's offer, and the state is advanced.
+    """
+    lang = lang if lang in _LANGS else DEFAULT_LANG
+    msg = normalize(user_msg)
+    intent = follow_up(state, msg) or cached_intent(msg, lang)
+    ref = _pick(intent, username.capitalize(), lang=lang)
+    if state is not None:
+        state.advance(ref.intent, _OFFERS.get(ref.template_id))
+    if ref.intent == "crisis" and _LANGS[lang].alert.search(msg):
+        _on_crisis(username, user_msg)
+    return ref
+
+def get_reply(user_msg, username="Friend", lang="english", structured=False, state=None):
+    """Reply HTML; with structured=True returns (html, Reply(intent, template_id, params))."""
+    ref = get_reply_ref(user_msg, username, lang, state)
+    html = render_reply(ref.template_id, ref.params)
+    return (html, ref) if structured else html
+
+
+def classify_intents(msgs, lang: str = DEFAULT_LANG):
+    """Batch detect_intent: messages × intents hit matrix, priority resolved by one argmax."""
+    rules = _lang(lang)
+    matcher = rules.ascii_matcher if all(map(str.isascii, msgs)) else rules.matcher
+    masks = matcher.hits_many(msgs)
+    matrix = (masks[:, None] >> np.arange(len(matcher.intents))) & 1
+    first = np.where(masks > 0, matrix.argmax(axis=1), len(matcher.intents))
+    labels = np.array(matcher.intents + ["default"], dtype=object)[first]
+    for i in np.flatnonzero(matrix[:, 0]):
+        if rules.choosing_life.search(msgs[i]):
+            labels[i] = "choosing_life"
+    if _model is not None and lang == DEFAULT_LANG:
+        rest = np.flatnonzero(~np.isin(labels, list(RULE_FIRST)))
+        for i, intent in zip(rest.tolist(), _model.predict_many([msgs[i] for i in rest])):
+            if intent is not None:
+                labels[i] = intent
+    return labels
+
+
+def get_replies(messages, usernames="Friend", lang="english", seed=None):
+    """
+    Batch version of get_reply for replaying chat logs.
+    `usernames` is one name or one per message; `seed` makes the random templates repeatable.
+    """
+    msgs = [normalize(m) for m in messages]
+    lang = lang if lang in _LANGS else DEFAULT_LANG
+    if isinstance(usernames, str):
+        usernames = [usernames] * len(msgs)
+    elif len(usernames) != len(msgs):
+        raise ValueError(f"got {len(usernames)} usernames for {len(msgs)} messages")
+    if not msgs:
+        return []
+    rng = random.Random(seed)
+    replies = []
+    for intent, name in zip(classify_intents(msgs, lang), usernames):
+        ref = _pick(intent, name.capitalize(), rng, lang)
+        replies.append(render_reply(ref.template_id, ref.params))
+    return replies
@@ -0,0 +1,160 @@
+import atexit
+import heapq
+import itertools
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from modules.database_setup import close_conn, get_conn, write_turn
+
+# ---------------------------------------------
+# CRISIS ALERTS — priority queue + durable outbox for therapists
+# ---------------------------------------------
+# A crisis message is pushed onto an in-memory heap (most severe first) and
+# its own writer thread is woken at once to commit it to crisis_alerts. This
+# path shares nothing with the write-behind logger — no buffer, no flush
+# interval, no thread — so a backlog of ordinary log writes never sits in
+# front of an alert, and the writer takes the next write_turn() ahead of the
+# logger's batches. Failed writes stay queued and are retried; nothing is
+# dropped. The dashboard polls open_alerts(), which walks the partial index
+# of unacknowledged alerts.
+
+HIGH, ELEVATED = 2, 1
+SEVERITY_LABELS = {HIGH: "🔴 High", ELEVATED: "🟠 Elevated"}
+_HIGH_PHRASES = re.compile(r"\b(suicide|suicidal|kill myself|end my life|take my life)\b")
+
+MAX_MESSAGE = 500           # characters of the message kept with the alert
+RETRY_SECONDS = 0.5         # back-off after a failed write
+OPEN_LIMIT = 50             # alerts shown on the dashboard at once
+POLL_SECONDS = 5            # dashboard refresh interval
+
+INSERT_SQL = "INSERT INTO crisis_alerts (username, message, severity, created_at) VALUES (?,?,?,?)"
+
+def severity_of(message: str) -> int:
+    """HIGH for explicit self-harm phrases, ELEVATED otherwise (e.g. just "die")."""
+    return HIGH if _HIGH_PHRASES.search(message.lower()) else ELEVATED
+
+class AlertQueue:
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._heap = []                 # (-severity, seq, raised_at, row)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._busy = False              # a batch is popped but not yet committed
+        self._stopping = False
+        self._latencies = deque(maxlen=1000)  # raise -> commit, seconds
+        self._stats = {"raised": 0, "written": 0, "retries": 0}
+        self.last_error = None
+        self._thread = threading.Thread(target=self._run, name="crisis-alerts", daemon=True)
+        self._thread.start()
+
+    def raise_alert(self, username: str, message: str, severity: int | None = None):
+        """Queue an alert and wake the writer; returns immediately."""
+        severity = severity_of(message) if severity is None else severity
+        row = (username, message[:MAX_MESSAGE], severity, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        with self._cond:
+            heapq.heappush(self._heap, (-severity, next(self._seq), time.perf_counter(), row))
+            self._stats["raised"] += 1
+            self._cond.notify()
+
+    def pending(self) -> int:
+        """Alerts raised but not yet committed."""
+        with self._cond:
+            return len(self._heap) + self._busy
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Block until every alert raised so far is committed."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._heap and not self._busy, timeout)
+
+    def close(self, timeout: float | None = 5.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def metrics(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            lat = sorted(self._latencies)
+            stats["pending"] = len(self._heap) + self._busy
+        stats["latency_ms_max"] = 1000 * lat[-1] if lat else 0.0
+        stats["latency_ms_p95"] = 1000 * lat[int(0.95 * (len(lat) - 1))] if lat else 0.0
+        return stats
+
+    # ---------- writer thread ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._heap or self._stopping)
+                if not self._heap:
+                    break
+                batch = [heapq.heappop(self._heap) for _ in range(len(self._heap))]
+                self._busy = True
+            try:
+                conn = get_conn(self.path)
+                with write_turn(urgent=True), conn:
+                    conn.executemany(INSERT_SQL, [entry[3] for entry in batch])
+            except sqlite3.Error as e:
+                self.last_error = repr(e)
+                with self._cond:
+                    for entry in batch:
+                        heapq.heappush(self._heap, entry)
+                    self._busy = False
+                    self._stats["retries"] += 1
+                    if self._stopping:
+                        break
+                    self._cond.wait(RETRY_SECONDS)
+                continue
+            now = time.perf_counter()
+            with self._cond:
+                self._busy = False
+                self._stats["written"] += len(batch)
+                self._latencies.extend(now - entry[2] for entry in batch)
+                self._cond.notify_all()
+        close_conn(self.path)
+
+# ---------- process-wide queue ----------
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue() -> AlertQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = AlertQueue()
+            atexit.register(_queue.close)
+        return _queue
+
+def raise_alert(username: str, message: str, severity: int | None = None):
+    get_queue().raise_alert(username, message, severity)
+
+def flush(timeout: float | None = 5.0) -> bool:
+    return get_queue().flush(timeout) if _queue is not None else True
+
+def metrics() -> dict:
+    return get_queue().metrics()
+
+# ---------- dashboard side ----------
+
+def open_alerts(limit: int = OPEN_LIMIT, conn=None):
+    """Unacknowledged alerts, most severe then oldest first: [(id, username, message, severity, created_at)]."""
+    return (conn or get_conn()).execute(
+        "SELECT id, username, message, severity, created_at FROM crisis_alerts "
+        "WHERE acked_at IS NULL ORDER BY severity DESC, id LIMIT ?", (limit,)).fetchall()
+
+def open_count(conn=None) -> int:
+    return (conn or get_conn()).execute("SELECT COUNT(*) FROM crisis_alerts WHERE acked_at IS NULL").fetchone()[0]
+
+def acknowledge(alert_id: int, by: str, is_therapist: bool = False) -> bool:
+    """Mark an alert handled; False if it was already acknowledged. Therapists only."""
+    if not is_therapist:
+        raise PermissionError("only therapists can acknowledge crisis alerts")
+    conn = get_conn()
+    with write_turn(), conn:
+        cur = conn.execute("UPDATE crisis_alerts SET acked_at = ?, acked_by = ? WHERE id = ? AND acked_at IS NULL",
+                           (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), by, alert_id))
+    return cur.rowcount == 1
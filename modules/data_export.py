@@ -0,0 +1,118 @@
+import csv
+import io
+import tempfile
+import zlib
+
+from modules.database_setup import get_conn
+
+# ---------------------------------------------
+# STREAMING EXPORTS (CSV / gzip CSV / Parquet)
+# ---------------------------------------------
+# Rows are pulled from a SQLite cursor in chunks and written straight to a
+# temp file, so building an export keeps memory flat whatever the table size.
+# Serving it does not: st.download_button reads the whole file into memory
+# and Streamlit keeps those bytes for the session. So one download holds at
+# most MAX_EXPORT_ROWS rows; bigger exports are split into parts (export_parts).
+# Nothing runs until a download is actually requested.
+
+# table -> date column used for range filters
+EXPORTABLE = {
+    "therapist_booking": "date",
+    "recovery_tracker": "date",
+    "progress": "date",
+    "login_activity": "login_time",
+}
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+CHUNK_ROWS = 5000
+MAX_EXPORT_ROWS = 100_000  # per download; ~10 MB of CSV for these tables
+
+def _filters(table, username=None, start=None, end=None):
+    if table not in EXPORTABLE:
+        raise ValueError(f"Table not exportable: {table}")
+    date_col = EXPORTABLE[table]
+    where, params = [], []
+    if username and username != "All":
+        where.append("username = ?")
+        params.append(username)
+    if start:
+        where.append(f"{date_col} >= ?")
+        params.append(str(start))
+    if end:
+        # dates may carry a time part, so compare against the start of the next day
+        where.append(f"{date_col} < date(?, '+1 day')")
+        params.append(str(end))
+    return (" WHERE " + " AND ".join(where) if where else ""), params
+
+def _query(table, username=None, start=None, end=None, part=0):
+    where, params = _filters(table, username, start, end)
+    sql = f"SELECT * FROM {table}{where} ORDER BY id LIMIT ? OFFSET ?"
+    return sql, params + [MAX_EXPORT_ROWS, part * MAX_EXPORT_ROWS]
+
+def export_parts(table, username=None, start=None, end=None) -> int:
+    """How many MAX_EXPORT_ROWS downloads the filtered table needs (at least 1)."""
+    where, params = _filters(table, username, start, end)
+    rows = get_conn().execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+    return max(1, -(-rows // MAX_EXPORT_ROWS))
+
+def iter_rows(table, username=None, start=None, end=None, chunk_rows=CHUNK_ROWS, part=0):
+    """Yield (column names, list of row tuples) chunks for one part of the filtered table."""
+    sql, params = _query(table, username, start, end, part)
+    cur = get_conn().execute(sql, params)
+    columns = [d[0] for d in cur.description]
+    try:
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield columns, rows
+    finally:
+        cur.close()
+
+def iter_csv(table, username=None, start=None, end=None, compress=False, part=0):
+    """Yield the CSV export as bytes chunks (gzip-compressed when `compress`)."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+
+    def flush():
+        data = buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+        return gz.compress(data) if gz else data
+
+    columns = [d[0] for d in get_conn().execute(f"SELECT * FROM {table} LIMIT 0").description]
+    writer.writerow(columns)
+    for _, rows in iter_rows(table, username, start, end, part=part):
+        writer.writerows(rows)
+        yield flush()
+    if buf.tell():  # header-only export
+        yield flush()
+    if gz:
+        yield gz.flush()
+
+def _write_parquet(out, table, username=None, start=None, end=None, part=0):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"INTEGER": pa.int64(), "REAL": pa.float64()}
+    info = get_conn().execute(f"PRAGMA table_info({table})").fetchall()
+    schema = pa.schema([(name, types.get(decl.upper(), pa.string())) for _, name, decl, *_ in info])
+    with pq.ParquetWriter(out, schema, compression="snappy") as writer:
+        for columns, rows in iter_rows(table, username, start, end, part=part):
+            arrays = [pa.array(col, type=schema.field(name).type) for name, col in zip(columns, zip(*rows))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+def export_file(table, fmt="CSV", username=None, start=None, end=None, part=0):
+    """Run one part of the export into a disk-backed temp file and return it rewound to the start."""
+    out = tempfile.TemporaryFile(buffering=0)  # raw file object, accepted by st.download_button
+    if fmt == "Parquet":
+        _write_parquet(out, table, username, start, end, part)
+    else:
+        for chunk in iter_csv(table, username, start, end, compress=(fmt == "CSV (gzip)"), part=part):
+            out.write(chunk)
+    out.seek(0)
+    return out
@@ -1,12 +1,90 @@
 import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
 DB_PATH = "database/chatbot.db"
 
+# ---------------------------------------------
+# Shared connection layer
+# ---------------------------------------------
+# One connection per (thread, db file), opened lazily and reused for the life
+# of the thread. sqlite3 keeps a per-connection prepared-statement cache, so
+# reusing the connection also reuses compiled statements.
+
+PRAGMAS = {
+    "journal_mode": "WAL",       # readers don't block the writer
+    "synchronous": "NORMAL",     # safe with WAL, avoids an fsync per commit
+    "cache_size": -16000,        # ~16 MB page cache
+    "mmap_size": 134217728,      # 128 MB memory-mapped reads
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,        # ms to wait on a locked db instead of failing
+}
+STATEMENT_CACHE = 256
+
+_local = threading.local()
+
+def get_conn(path: str | None = None) -> sqlite3.Connection:
+    """Return this thread's pooled connection (use `with conn:` for a transaction)."""
+    path = path or DB_PATH
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=PRAGMAS["busy_timeout"] / 1000,
+                               cached_statements=STATEMENT_CACHE)
+        for key, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {key}={value}")
+        conns[path] = conn
+    return conn
+
+def close_conn(path: str | None = None):
+    """Close this thread's pooled connection for `path` (all of them if None)."""
+    conns = getattr(_local, "conns", {})
+    for p in ([path] if path else list(conns)):
+        conn = conns.pop(p, None)
+        if conn is not None:
+            conn.close()
+
+# ---------------------------------------------
+# In-process write gate. SQLite has one writer at a time and a blocked
+# connection retries with growing sleeps (busy_timeout), so a writer can lose
+# the race to a busy background thread again and again. Background writers
+# take turns on this gate instead, and urgent ones (crisis alerts) go next.
+
+class _WriteGate:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._held = False
+        self._urgent = 0
+
+    @contextmanager
+    def hold(self, urgent: bool = False):
+        with self._cond:
+            self._urgent += urgent
+            self._cond.wait_for(lambda: not self._held and (urgent or not self._urgent))
+            self._urgent -= urgent
+            self._held = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._held = False
+                self._cond.notify_all()
+
+_write_gate = _WriteGate()
+
+def write_turn(urgent: bool = False):
+    """`with write_turn():` around a write transaction; urgent=True jumps the queue."""
+    return _write_gate.hold(urgent)
+
 def init_database():
-    os.makedirs("database", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_conn()
     c = conn.cursor()
 
     c.execute("""CREATE TABLE IF NOT EXISTS users(
@@ -74,27 +152,360 @@ def init_database():
     )""")
 
     conn.commit()
-    conn.close()
+    migrate(conn)
+    with conn:  # codes appended to EVENT_CODES after migration 6 shipped
+        for sql in EVENT_CODES_SYNC:
+            conn.execute(sql)
+
+# ---------------------------------------------
+# Schema migrations (tracked in PRAGMA user_version)
+# ---------------------------------------------
+# Append new steps at the end; never edit a step that has shipped.
+
+LOGIN_STATS_BACKFILL = [
+    "DELETE FROM login_stats",
+    """INSERT INTO login_stats(username, day, count, last_seen)
+       SELECT username, substr(login_time, 1, 10), COUNT(*), MAX(login_time)
+       FROM login_activity WHERE username IS NOT NULL GROUP BY 1, 2""",
+    "DELETE FROM login_totals",
+    """INSERT INTO login_totals(username, count, last_seen)
+       SELECT username, SUM(count), MAX(last_seen) FROM login_stats GROUP BY username""",
+]
+
+VERSIONED_TABLES = ["users", "login_activity", "therapist_booking", "recovery_tracker", "progress"]
+
+# Integer codes stored in entertainment_log / awareness_clicks (0 = other).
+# Append-only: a code's meaning must never change once rows use it.
+EVENT_CODES = {
+    "emotion": ["other", "stressed", "bored", "happy", "lonely", "anxious", "tired", "better"],
+    "content_type": ["other", "music", "movies", "games", "relax"],
+    "awareness_category": ["other", "Alcohol", "Cigarettes", "Drugs", "Mobile Overuse"],
+}
+EVENT_TABLES = ["entertainment_log", "awareness_clicks"]
+
+EVENT_CODES_SYNC = [
+    f"INSERT OR IGNORE INTO event_codes(kind, code, label) VALUES ('{kind}', {code}, '{label.replace(chr(39), chr(39) * 2)}')"
+    for kind, labels in EVENT_CODES.items() for code, label in enumerate(labels)
+]
+
+def _version_triggers(tables):
+    return [
+        *[f"INSERT OR IGNORE INTO table_versions(name, version) VALUES ('{t}', 0)" for t in tables],
+        *[f"""CREATE TRIGGER IF NOT EXISTS trg_{t}_{op.lower()}_version AFTER {op} ON {t}
+              BEGIN UPDATE table_versions SET version = version + 1 WHERE name = '{t}'; END"""
+          for t in tables for op in ("INSERT", "UPDATE", "DELETE")],
+    ]
+
+MIGRATIONS = [
+    # 1: one recovery row per user per day. Older databases may hold duplicates
+    #    (the old check-then-insert could race); keep a completed row over a pending one.
+    [
+        """DELETE FROM recovery_tracker WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY username, date ORDER BY completed DESC, id) AS rn
+                FROM recovery_tracker
+            ) WHERE rn > 1
+        )""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_recovery_user_date ON recovery_tracker(username, date)",
+    ],
+    # 2: unique usernames (keep the first row, with the most recent language) + lookup indexes
+    [
+        """UPDATE users SET language = (
+            SELECT u2.language FROM users u2 WHERE u2.username = users.username ORDER BY u2.id DESC LIMIT 1
+        )""",
+        "DELETE FROM users WHERE id NOT IN (SELECT MIN(id) FROM users GROUP BY username)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_users_username ON users(username)",
+        "CREATE INDEX IF NOT EXISTS ix_login_user_time ON login_activity(username, login_time)",
+        "CREATE INDEX IF NOT EXISTS ix_progress_user_date ON progress(username, date)",
+        "CREATE INDEX IF NOT EXISTS ix_progress_date ON progress(date)",
+        "CREATE INDEX IF NOT EXISTS ix_recovery_date ON recovery_tracker(date)",
+        "CREATE INDEX IF NOT EXISTS ix_booking_user ON therapist_booking(username)",
+    ],
+    # 3: per-table write counters, bumped by triggers, so readers can cache until the data changes;
+    #    plus a plain username index so per-user login pages come back in id order without a sort
+    [
+        "CREATE INDEX IF NOT EXISTS ix_login_user ON login_activity(username)",
+        "CREATE TABLE IF NOT EXISTS table_versions(name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)",
+        *_version_triggers(VERSIONED_TABLES),
+    ],
+    # 4: login rollups kept current by a trigger on login_activity, then backfilled
+    [
+        """CREATE TABLE IF NOT EXISTS login_stats(
+            username TEXT NOT NULL,
+            day TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            last_seen TEXT,
+            PRIMARY KEY (username, day)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS ix_login_stats_day ON login_stats(day, username)",
+        """CREATE TABLE IF NOT EXISTS login_totals(
+            username TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0,
+            last_seen TEXT
+        ) WITHOUT ROWID""",
+        """CREATE TRIGGER IF NOT EXISTS trg_login_activity_stats AFTER INSERT ON login_activity
+           BEGIN
+               INSERT INTO login_stats(username, day, count, last_seen)
+               VALUES (new.username, substr(new.login_time, 1, 10), 1, new.login_time)
+               ON CONFLICT(username, day) DO UPDATE
+               SET count = count + 1, last_seen = max(last_seen, excluded.last_seen);
+               INSERT INTO login_totals(username, count, last_seen)
+               VALUES (new.username, 1, new.login_time)
+               ON CONFLICT(username) DO UPDATE
+               SET count = count + 1, last_seen = max(last_seen, excluded.last_seen);
+           END""",
+        *LOGIN_STATS_BACKFILL,
+    ],
+    # 5: persisted chat history; bot replies are stored as template id + JSON params, not HTML
+    [
+        """CREATE TABLE IF NOT EXISTS chat_messages(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            role INTEGER NOT NULL,
+            text TEXT,
+            template_id TEXT,
+            params TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS ix_chat_user_id ON chat_messages(username, id)",
+    ],
+    # 6: event tables store integer codes (see EVENT_CODES / event_codes) instead of repeated
+    #    labels; rebuilt in place, with indexes for the per-day rollups and version counters
+    [
+        """CREATE TABLE IF NOT EXISTS event_codes(
+            kind TEXT NOT NULL,
+            code INTEGER NOT NULL,
+            label TEXT NOT NULL,
+            PRIMARY KEY (kind, code)
+        ) WITHOUT ROWID""",
+        *EVENT_CODES_SYNC,
+        """CREATE TABLE entertainment_log_v2(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            emotion INTEGER NOT NULL DEFAULT 0,
+            type INTEGER NOT NULL DEFAULT 0,
+            content_link TEXT,
+            date TEXT
+        )""",
+        """INSERT INTO entertainment_log_v2 (id, username, emotion, type, content_link, date)
+           SELECT id, username,
+                  COALESCE((SELECT code FROM event_codes WHERE kind = 'emotion' AND label = lower(e.emotion)), 0),
+                  COALESCE((SELECT code FROM event_codes WHERE kind = 'content_type' AND label = lower(e.type)), 0),
+                  content_link, date
+           FROM entertainment_log e""",
+        "DROP TABLE entertainment_log",
+        "ALTER TABLE entertainment_log_v2 RENAME TO entertainment_log",
+        """CREATE TABLE awareness_clicks_v2(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            category INTEGER NOT NULL DEFAULT 0,
+            click_time TEXT
+        )""",
+        """INSERT INTO awareness_clicks_v2 (id, username, category, click_time)
+           SELECT id, username,
+                  COALESCE((SELECT code FROM event_codes WHERE kind = 'awareness_category' AND label = a.category), 0),
+                  click_time
+           FROM awareness_clicks a""",
+        "DROP TABLE awareness_clicks",
+        "ALTER TABLE awareness_clicks_v2 RENAME TO awareness_clicks",
+        "CREATE INDEX IF NOT EXISTS ix_entertainment_date ON entertainment_log(date, type)",
+        "CREATE INDEX IF NOT EXISTS ix_awareness_time ON awareness_clicks(click_time, category)",
+        *_version_triggers(EVENT_TABLES),
+    ],
+    # 7: suggestion ranker state: shows / helpful votes per (mood, language, item)
+    [
+        """CREATE TABLE IF NOT EXISTS bandit_stats(
+            emotion INTEGER NOT NULL,
+            language TEXT NOT NULL,
+            link TEXT NOT NULL,
+            shows INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (emotion, language, link)
+        ) WITHOUT ROWID""",
+    ],
+    # 8: materialized per-patient risk features, refreshed by modules.risk_snapshot for the
+    #    users that triggers mark dirty in risk_dirty (seq changes on every new write)
+    [
+        """CREATE TABLE IF NOT EXISTS risk_snapshot(
+            username TEXT PRIMARY KEY,
+            as_of TEXT NOT NULL,
+            entries_7d INTEGER NOT NULL DEFAULT 0,
+            craving_mean_7d REAL,
+            craving_mean_30d REAL,
+            usage_mean_7d REAL,
+            usage_trend_30d REAL,
+            missed_days_7d INTEGER NOT NULL DEFAULT 0,
+            risk_level INTEGER NOT NULL DEFAULT 0,
+            risk TEXT NOT NULL DEFAULT 'Low',
+            updated_at TEXT
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS ix_risk_snapshot_level ON risk_snapshot(risk_level DESC, craving_mean_7d DESC)",
+        "CREATE INDEX IF NOT EXISTS ix_risk_snapshot_as_of ON risk_snapshot(as_of)",
+        "CREATE TABLE IF NOT EXISTS risk_dirty(username TEXT PRIMARY KEY, seq INTEGER NOT NULL) WITHOUT ROWID",
+        *[f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_risk_dirty AFTER {op} ON {table}
+              BEGIN
+                  INSERT INTO risk_dirty(username, seq) VALUES (new.username, 1)
+                  ON CONFLICT(username) DO UPDATE SET seq = seq + 1;
+              END"""
+          for table, op in [("progress", "INSERT"), ("recovery_tracker", "INSERT"), ("recovery_tracker", "UPDATE")]],
+        """INSERT OR IGNORE INTO risk_dirty(username, seq)
+           SELECT username, 1 FROM users WHERE username IS NOT NULL
+           UNION SELECT username, 1 FROM progress WHERE username IS NOT NULL""",
+        *_version_triggers(["risk_snapshot"]),
+    ],
+    # 9: crisis alerts outbox, written by modules.crisis_alerts on its own thread; the partial
+    #    index holds only unacknowledged alerts, so the dashboard's open-alert query stays small
+    [
+        """CREATE TABLE IF NOT EXISTS crisis_alerts(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            message TEXT,
+            severity INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL,
+            acked_at TEXT,
+            acked_by TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS ix_crisis_alerts_open ON crisis_alerts(severity DESC, id) WHERE acked_at IS NULL",
+        "CREATE INDEX IF NOT EXISTS ix_crisis_alerts_user ON crisis_alerts(username, id)",
+        *_version_triggers(["crisis_alerts"]),
+    ],
+    # 10: per-user dialog state (see modules.dialog_state), so a "yes" to the bot's last offer
+    #     is still understood after a restart
+    [
+        """CREATE TABLE IF NOT EXISTS dialog_state(
+            username TEXT PRIMARY KEY,
+            last_intent TEXT,
+            offer TEXT,
+            turns INTEGER NOT NULL DEFAULT 0,
+            updated INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID""",
+    ],
+    # 11: the therapist overview lists login_totals busiest first; read it in index order
+    [
+        "CREATE INDEX IF NOT EXISTS ix_login_totals_count ON login_totals(count DESC, username)",
+    ],
+    # 12: the dashboard counts export rows (data_export.export_parts) under the date-range filter
+    [
+        "CREATE INDEX IF NOT EXISTS ix_booking_date ON therapist_booking(date)",
+    ],
+    # 13: the login rollup and risk_dirty triggers skip rows without a username; their
+    #     targets require one, so such a row used to fail the whole insert
+    [
+        "DROP TRIGGER IF EXISTS trg_login_activity_stats",
+        """CREATE TRIGGER trg_login_activity_stats AFTER INSERT ON login_activity
+           WHEN new.username IS NOT NULL
+           BEGIN
+               INSERT INTO login_stats(username, day, count, last_seen)
+               VALUES (new.username, substr(new.login_time, 1, 10), 1, new.login_time)
+               ON CONFLICT(username, day) DO UPDATE
+               SET count = count + 1, last_seen = max(last_seen, excluded.last_seen);
+               INSERT INTO login_totals(username, count, last_seen)
+               VALUES (new.username, 1, new.login_time)
+               ON CONFLICT(username) DO UPDATE
+               SET count = count + 1, last_seen = max(last_seen, excluded.last_seen);
+           END""",
+        *[sql for table, op in [("progress", "INSERT"), ("recovery_tracker", "INSERT"), ("recovery_tracker", "UPDATE")]
+          for sql in (f"DROP TRIGGER IF EXISTS trg_{table}_{op.lower()}_risk_dirty",
+                      f"""CREATE TRIGGER trg_{table}_{op.lower()}_risk_dirty AFTER {op} ON {table}
+                          WHEN new.username IS NOT NULL
+                          BEGIN
+                              INSERT INTO risk_dirty(username, seq) VALUES (new.username, 1)
+                              ON CONFLICT(username) DO UPDATE SET seq = seq + 1;
+                          END""")],
+    ],
+    # 14: chat messages belong to one login session (see modules.chat_history), not to a
+    #     typed name; older rows have no session and are never restored
+    [
+        "ALTER TABLE chat_messages ADD COLUMN session TEXT",
+        "CREATE INDEX IF NOT EXISTS ix_chat_session_id ON chat_messages(session, id)",
+    ],
+    # 15: dialog state is per login session too; rows keyed by a typed name are dropped
+    [
+        "DROP TABLE IF EXISTS dialog_state",
+        """CREATE TABLE dialog_state(
+            session TEXT PRIMARY KEY,
+            username TEXT,
+            last_intent TEXT,
+            offer TEXT,
+            turns INTEGER NOT NULL DEFAULT 0,
+            updated INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID""",
+    ],
+]
+
+def table_versions(conn: sqlite3.Connection | None = None) -> dict:
+    """{table: write counter} for VERSIONED_TABLES + EVENT_TABLES; changes whenever a row is written."""
+    return dict((conn or get_conn()).execute("SELECT name, version FROM table_versions"))
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn: sqlite3.Connection):
+    """Apply pending MIGRATIONS, each in its own transaction."""
+    for version in range(schema_version(conn) + 1, len(MIGRATIONS) + 1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # re-check under the write lock: another worker may have migrated meanwhile
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            for sql in MIGRATIONS[version - 1]:
+                conn.execute(sql)
+            conn.execute(f"PRAGMA user_version={version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def _require_username(username):
+    if not isinstance(username, str) or not username.strip():
+        raise ValueError("username is required")
 
 def upsert_user(username: str, language: str):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT id FROM users WHERE username=?", (username,))
-    row = c.fetchone()
-    if row is None:
-        c.execute("INSERT INTO users (username,language,joined_on) VALUES (?,?,?)",
-                  (username, language, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    else:
-        c.execute("UPDATE users SET language=? WHERE username=?", (language, username))
-    conn.commit()
-    conn.close()
+    _require_username(username)
+    conn = get_conn()
+    with conn:
+        conn.execute("""INSERT INTO users (username,language,joined_on) VALUES (?,?,?)
+                        ON CONFLICT(username) DO UPDATE SET language=excluded.language""",
+                     (username, language, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
 
 def log_login(username: str):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("INSERT INTO login_activity (username, login_time) VALUES (?,?)",
-              (username, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    conn.commit()
-    conn.close()
+    """Queued through the write-behind logger; committed within FLUSH_MS."""
+    _require_username(username)  # checked here: the writer thread can only drop a bad row
+    from modules.write_behind import submit
+    submit("INSERT INTO login_activity (username, login_time) VALUES (?,?)",
+           (username, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+# ---------- login rollups (login_stats / login_totals) ----------
+
+def backfill_login_stats():
+    """Rebuild the login rollups from login_activity (for data written before migration 4)."""
+    conn = get_conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for sql in LOGIN_STATS_BACKFILL:
+            conn.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def active_users(days: int = 1) -> int:
+    """Distinct users who logged in during the last `days` days (1 = today)."""
+    return get_conn().execute(
+        "SELECT COUNT(DISTINCT username) FROM login_stats WHERE day >= date('now', 'localtime', ?)",
+        (f"-{days - 1} days",)
+    ).fetchone()[0]
+
+
+if __name__ == "__main__":
+    # python -m modules.database_setup backfill-login-stats
+    import sys
+    init_database()
+    if sys.argv[1:] == ["backfill-login-stats"]:
+        backfill_login_stats()
+        print("login_stats rebuilt from login_activity")
+    else:
+        print("usage: python -m modules.database_setup backfill-login-stats")
 
 
@@ -0,0 +1,80 @@
+import sys
+import time
+
+from modules import write_behind
+from modules.database_setup import get_conn
+
+# ---------------------------------------------
+# DIALOG STATE — where one conversation stands
+# ---------------------------------------------
+# Some replies end with an offer ("Would you like me to guide a short
+# 2-minute breathing now?"). The session keeps one small DialogState with the
+# last intent and the offer still open, so a bare "yes" on the next turn is a
+# field lookup instead of a search through the chat history. Each turn is
+# upserted into dialog_state through the write-behind logger. Like the chat
+# history, the row is keyed on the login's session token, not the typed name,
+# so someone else logging in as "Sam" can't answer Sam's open offer.
+
+OFFER_TTL = 30 * 60  # s; an offer older than this is forgotten
+
+UPSERT_SQL = """INSERT INTO dialog_state (session, username, last_intent, offer, turns, updated)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(session) DO UPDATE SET last_intent = excluded.last_intent,
+                    offer = excluded.offer, turns = excluded.turns, updated = excluded.updated"""
+
+def _intern(value):
+    return sys.intern(value) if value is not None else None
+
+class DialogState:
+    __slots__ = ("username", "session", "last_intent", "offer", "turns", "updated")
+
+    def __init__(self, username: str, session: str, last_intent=None, offer=None, turns: int = 0,
+                 updated: int = 0):
+        self.username = username
+        self.session = session  # the login's token (chat_history.new_session)
+        # intent names are interned, so 10k sessions share one copy of each
+        self.last_intent = _intern(last_intent)
+        self.offer = _intern(offer)     # intent a "yes" would answer with, or None
+        self.turns = turns
+        self.updated = updated          # unix seconds of the last turn
+
+    def __repr__(self):
+        return (f"DialogState({self.username!r}, last_intent={self.last_intent!r}, offer={self.offer!r}, "
+                f"turns={self.turns})")
+
+    def pending_offer(self, now: float | None = None):
+        """The open offer, unless it has expired."""
+        if self.offer is None or (now or time.time()) - self.updated > OFFER_TTL:
+            return None
+        return self.offer
+
+    def advance(self, intent: str, offer=None):
+        """Record a bot reply; `offer` replaces whatever was open before."""
+        self.last_intent = _intern(intent)
+        self.offer = _intern(offer)
+        self.turns += 1
+        self.updated = int(time.time())
+
+    # ---------- persistence ----------
+    def to_row(self):
+        return (self.session, self.username, self.last_intent, self.offer, self.turns, self.updated)
+
+    def save(self):
+        """Queue an upsert on the write-behind logger."""
+        write_behind.submit(UPSERT_SQL, self.to_row())
+
+    def load(self):
+        """Restore the saved state for this login, if there is one."""
+        write_behind.flush()  # a save queued just before logging out must be visible
+        row = get_conn().execute("SELECT last_intent, offer, turns, updated FROM dialog_state WHERE session=?",
+                                 (self.session,)).fetchone()
+        if row is not None:
+            self.last_intent, self.offer = _intern(row[0]), _intern(row[1])
+            self.turns, self.updated = row[2], row[3]
+        return self
+
+    def reset(self):
+        """Start over (e.g. when the chat is cleared)."""
+        self.last_intent = self.offer = None
+        self.turns = self.updated = 0
+        self.save()
@@ -1,4 +1,9 @@
-import random
+import os
+import threading
+
+from modules.bandit import ThompsonRanker
+from modules.catalogue import from_json, from_nested
+from modules.event_log import log_entertainment
 
 # ---------------------------------------------
 # ENTERTAINMENT RECOMMENDER MODULE
@@ -51,6 +56,28 @@ ENTERTAINMENT_DB = {
     }
 }
 
+# Moods each built-in category is meant for (mood tags in the catalogue)
+MOOD_TAGS = {
+    "relax": ["stressed", "anxious"],
+    "games": ["bored", "tired"],
+    "music": ["happy", "better"],
+    "movies": ["lonely"],
+}
+
+# Mood -> the category a suggestion for it comes from (anything else gets movies)
+MOOD_CATEGORY = {mood: category for category, moods in MOOD_TAGS.items() for mood in moods}
+DEFAULT_CATEGORY = "movies"
+
+# A JSON catalogue here replaces the built-in lists above
+CATALOGUE_PATH = "assets/catalogue.json"
+
+def load_catalogue():
+    if os.path.exists(CATALOGUE_PATH):
+        return from_json(CATALOGUE_PATH)
+    return from_nested(ENTERTAINMENT_DB, MOOD_TAGS)
+
+CATALOGUE = load_catalogue()
+
 # ---------------------------------------------
 # Function 1: List content by category
 # ---------------------------------------------
@@ -59,36 +86,65 @@ def list_by_category(lang: str, category: str):
     """
     Returns list of (title, link) tuples for the given language and category.
     """
-    lang = lang.lower()
-    if lang not in ENTERTAINMENT_DB:
-        lang = "english"  # default fallback
-    if category not in ENTERTAINMENT_DB[lang]:
-        return []
-    return ENTERTAINMENT_DB[lang][category]
+    return [(it.title, it.link) for it in CATALOGUE.items_for(lang, category)]
+
+def multi_picks(lang: str, username: str = "Friend", k: int = 12):
+    """
+    Returns k (title, link) picks across all categories, skipping what the user saw recently.
+    """
+    picks = CATALOGUE.top_k([username], lang, k)[0]
+    return [(it.title, it.link) for it in picks]
 
 # ---------------------------------------------
 # Function 2: Smart Suggestion based on mood
 # ---------------------------------------------
+# The mood picks the category (as it always did); within it, the item comes
+# from a Thompson-sampling ranker over (mood, language) that learns from the
+# 👍 / 👎 feedback buttons.
 
-def suggest(lang: str, mood: str, username: str = "Friend"):
+_ranker = None
+_ranker_lock = threading.Lock()
+
+def get_ranker():
+    global _ranker
+    with _ranker_lock:
+        if _ranker is None:
+            _ranker = ThompsonRanker(CATALOGUE).load()
+        return _ranker
+
+def suggest_pick(lang: str, mood: str, username: str = "Friend"):
     """
-    Returns a personalized suggestion message based on mood.
+    Returns (suggestion message, catalogue Item) for the user's mood.
     """
     name = username.capitalize()
     mood = mood.lower()
     lang = lang.lower()
-    if lang not in ENTERTAINMENT_DB:
-        lang = "english"
-
-    if mood in ["stressed", "anxious"]:
-        rec = random.choice(ENTERTAINMENT_DB[lang]["relax"])
-        return f"{name}, take a short break 🌿 Try this to calm your mind: [{rec[0]}]({rec[1]})"
-    elif mood in ["bored", "tired"]:
-        rec = random.choice(ENTERTAINMENT_DB[lang]["games"])
-        return f"{name}, looks like you need some fun 🎮 Try this: [{rec[0]}]({rec[1]})"
-    elif mood in ["happy", "better"]:
-        rec = random.choice(ENTERTAINMENT_DB[lang]["music"])
-        return f"Awesome, {name}! Keep that good energy with {rec[0]}: {rec[1]}"
+
+    # the ranker only chooses within the mood's category, and the message
+    # follows the mood either way
+    category = MOOD_CATEGORY.get(mood, DEFAULT_CATEGORY)
+    rec = get_ranker().pick(username, mood, lang, category)
+    log_entertainment(username, mood, rec.category, rec.link)
+
+    if category == "relax":
+        msg = f"{name}, take a short break 🌿 Try this to calm your mind: [{rec.title}]({rec.link})"
+    elif category == "games":
+        msg = f"{name}, looks like you need some fun 🎮 Try this: [{rec.title}]({rec.link})"
+    elif category == "music":
+        msg = f"Awesome, {name}! Keep that good energy with {rec.title}: {rec.link}"
     else:
-        rec = random.choice(ENTERTAINMENT_DB[lang]["movies"])
-        return f"{name}, here’s something inspiring to watch 🎥 {rec[0]}: {rec[1]}"
+        msg = f"{name}, here’s something inspiring to watch 🎥 {rec.title}: {rec.link}"
+    return msg, rec
+
+def suggest(lang: str, mood: str, username: str = "Friend"):
+    """
+    Returns a personalized suggestion message based on mood.
+    """
+    return suggest_pick(lang, mood, username)[0]
+
+def record_feedback(lang: str, mood: str, item_id: int, helped: bool):
+    """
+    👍 counts as a win for the item in this mood/language; 👎 leaves it as a plain show.
+    """
+    if helped:
+        get_ranker().update(mood, lang, item_id, won=1)
@@ -0,0 +1,61 @@
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from modules.database_setup import EVENT_CODES, get_conn
+from modules.write_behind import submit
+
+# ---------------------------------------------
+# EVENT LOG — entertainment picks & awareness clicks
+# ---------------------------------------------
+# Recording an event is a dict lookup plus a buffer append: rows go through the
+# write-behind logger and land with one executemany per batch. Emotion, content
+# type and awareness category are stored as the integer codes in EVENT_CODES.
+
+_CODES = {kind: {label.lower(): code for code, label in enumerate(labels)} for kind, labels in EVENT_CODES.items()}
+_EMOTION = _CODES["emotion"]
+_CONTENT_TYPE = _CODES["content_type"]
+_CATEGORY = _CODES["awareness_category"]
+
+ENTERTAINMENT_SQL = "INSERT INTO entertainment_log (username, emotion, type, content_link, date) VALUES (?,?,?,?,?)"
+AWARENESS_SQL = "INSERT INTO awareness_clicks (username, category, click_time) VALUES (?,?,?)"
+
+_stamp = [0, ""]  # (epoch second, formatted); events in the same second share the string
+
+def _now() -> str:
+    sec = int(time.time())
+    if sec != _stamp[0]:
+        _stamp[:] = [sec, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))]
+    return _stamp[1]
+
+def log_entertainment(username: str, emotion: str, content_type: str, link: str):
+    submit(ENTERTAINMENT_SQL, (username, _EMOTION.get(emotion.lower(), 0), _CONTENT_TYPE.get(content_type, 0),
+                               link, _now()))
+
+def log_awareness_click(username: str, category: str):
+    submit(AWARENESS_SQL, (username, _CATEGORY.get(category.lower(), 0), _now()))
+
+# ---------- rollups ----------
+
+def _label(codes: pd.Series, kind: str) -> pd.Series:
+    labels = EVENT_CODES[kind]
+    return codes.map(lambda c: labels[c] if 0 <= c < len(labels) else labels[0])
+
+def awareness_by_day(days: int = 14, today: date | None = None) -> pd.DataFrame:
+    """(day, category, clicks) for the last `days` days, most-clicked first within each day."""
+    since = ((today or date.today()) - timedelta(days=days - 1)).isoformat()
+    df = pd.read_sql_query(
+        "SELECT substr(click_time, 1, 10) AS day, category, COUNT(*) AS clicks FROM awareness_clicks "
+        "WHERE click_time >= ? GROUP BY day, category", get_conn(), params=(since,))
+    df["category"] = _label(df["category"], "awareness_category")
+    return df.sort_values(["day", "clicks"], ascending=[False, False], ignore_index=True)
+
+def entertainment_by_day(days: int = 14, today: date | None = None) -> pd.DataFrame:
+    """(day, type, picks) for the last `days` days, most-picked first within each day."""
+    since = ((today or date.today()) - timedelta(days=days - 1)).isoformat()
+    df = pd.read_sql_query(
+        "SELECT substr(date, 1, 10) AS day, type, COUNT(*) AS picks FROM entertainment_log "
+        "WHERE date >= ? GROUP BY day, type", get_conn(), params=(since,))
+    df["type"] = _label(df["type"], "content_type")
+    return df.sort_values(["day", "picks"], ascending=[False, False], ignore_index=True)
@@ -0,0 +1,101 @@
+import re
+
+import numpy as np
+
+# ---------------------------------------------
+# INTENT ENGINE — compiled single-pass keyword matcher
+# ---------------------------------------------
+
+def _trie_regex(words) -> str:
+    """Fold keywords into a prefix-trie regex (one branch per first char)."""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node):
+        end = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            return body + "?" if len(branches) == 1 and len(body) == 1 else "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+def _scan_regex(words) -> str:
+    """
+    _trie_regex with every non-ASCII initial behind one charset guard. sre
+    rejects a literal branch in a single step, but it is still a step per
+    branch, so a second script's initials would slow down every ASCII position.
+    """
+    initials = {}
+    for w in words:
+        initials.setdefault(w[0], []).append(w)
+    branches = [_trie_regex(ws) for ch, ws in sorted(initials.items()) if ch.isascii()]
+    other = sorted(ch for ch in initials if not ch.isascii())
+    if other:
+        guard = "[" + "".join(map(re.escape, other)) + "]"
+        branches.append("(?=" + guard + ")" + _trie_regex([w for ch in other for w in initials[ch]]))
+    return "|".join(branches)
+
+
+_SEP = "\0"
+
+
+class IntentMatcher:
+    """
+    Matches every keyword of an ordered rule list in one scan of the message.
+
+    `rules` is a list of (intent, keywords) in priority order. `hits()` returns a
+    bitmask (bit i = rule i) that is equivalent to running `kw in msg` for every
+    keyword; the lowest set bit is the if/elif chain's answer (chatbot_logic's
+    classify_intent resolves it, after its crisis special case).
+    """
+
+    def __init__(self, rules):
+        self.intents = [intent for intent, _ in rules]
+        owners = {}
+        for i, (_, words) in enumerate(rules):
+            for w in words:
+                owners[w] = owners.get(w, 0) | (1 << i)
+
+        # A keyword hit implies a hit for every keyword contained in it, so the
+        # scan only has to report the longest keyword starting at each position.
+        self._masks = {}
+        for w in owners:
+            mask = 0
+            for other, bits in owners.items():
+                if other in w:
+                    mask |= bits
+            self._masks[w] = mask
+
+        self._findall = re.compile("(?=(" + _scan_regex(owners) + "))").findall
+        # batch variant: messages joined by NUL, which is reported as its own hit
+        self._findall_joined = re.compile("(?=(" + _scan_regex([*owners, _SEP]) + "))").findall
+        self._masks_joined = {**self._masks, _SEP: -1}
+
+    def hits(self, msg: str) -> int:
+        mask = 0
+        masks = self._masks
+        for w in self._findall(msg):
+            mask |= masks[w]
+        return mask
+
+    def hits_many(self, msgs) -> np.ndarray:
+        """hits() for a list of messages using one scan over the joined batch."""
+        text = _SEP.join(msgs)
+        if text.count(_SEP) != max(len(msgs) - 1, 0):
+            return np.fromiter(map(self.hits, msgs), dtype=np.int64, count=len(msgs))
+        found = self._findall_joined(text)
+        codes = np.fromiter(map(self._masks_joined.__getitem__, found), dtype=np.int64, count=len(found))
+        is_sep = codes < 0
+        rows = np.cumsum(is_sep)
+        out = np.zeros(len(msgs), dtype=np.int64)
+        np.bitwise_or.at(out, rows[~is_sep], codes[~is_sep])
+        return out
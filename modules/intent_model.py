@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+# ---------------------------------------------
+# INTENT MODEL — hashed character n-grams + linear classifier (CPU, NumPy)
+# ---------------------------------------------
+# Each message becomes the character n-grams of " msg ", hashed into 2**BITS
+# buckets and L2-normalized. Scores are one gather-sum over the weight rows
+# those buckets point at, so cost follows message length, not vocabulary.
+# Weights live in MODEL_DIR/weights.npy and are memory-mapped, so every
+# session in the process shares one read-only copy. Trained by
+# `python -m modules.intent_training`; without the file the chatbot just
+# runs its keyword rules.
+
+MODEL_DIR = "assets/intent_model"
+BITS = 16                   # 65,536 hash buckets
+NGRAMS = (2, 3, 4, 5)
+MIN_CONFIDENCE = 0.4        # below this the model abstains and the rules decide
+MAX_BATCH = 64              # messages scored together by the micro-batcher
+PREDICT_TIMEOUT = 2.0       # seconds a caller waits on the batcher before the rules decide
+
+_PRIME = np.uint64(1099511628211)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+def featurize(msgs, bits: int = BITS, ngrams=NGRAMS):
+    """
+    Sparse features for a batch: (rows, buckets, values), rows ascending.
+    Every message yields at least one n-gram, even when empty.
+    """
+    text = "\0".join(f" {m.replace(chr(0), ' ')} " for m in msgs).encode("utf-8")
+    b = np.frombuffer(text, dtype=np.uint8).astype(np.uint64)
+    seps = np.concatenate(([0], np.cumsum(b == 0)))  # separators before each position
+    rows, buckets = [], []
+    shift = np.uint64(64 - bits)
+    for n in ngrams:
+        m = len(b) - n + 1
+        if m <= 0:
+            continue
+        h = np.full(m, n, dtype=np.uint64)
+        for j in range(n):
+            h = h * _PRIME + b[j:j + m]  # wraps mod 2**64
+        ok = seps[n:n + m] == seps[:m]   # window doesn't cross into the next message
+        rows.append(seps[:m][ok])
+        buckets.append(((h[ok] * _MIX) >> shift).astype(np.int64))
+    rows, buckets = np.concatenate(rows), np.concatenate(buckets)
+    order = np.argsort(rows, kind="stable")
+    rows, buckets = rows[order], buckets[order]
+    values = (1.0 / np.sqrt(np.bincount(rows, minlength=len(msgs))))[rows].astype(np.float32)
+    return rows, buckets, values
+
+def softmax(scores):
+    e = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+class IntentModel:
+    def __init__(self, weights, bias, labels, bits: int = BITS, ngrams=NGRAMS,
+                 min_confidence: float = MIN_CONFIDENCE, meta=None):
+        self.weights = weights              # (2**bits, len(labels)), possibly a memmap
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.labels = list(labels)
+        self.bits = bits
+        self.ngrams = tuple(ngrams)
+        self.min_confidence = min_confidence
+        self.meta = meta or {}
+
+    def scores(self, msgs) -> np.ndarray:
+        rows, buckets, values = featurize(msgs, self.bits, self.ngrams)
+        contrib = self.weights[buckets] * values[:, None]
+        starts = np.searchsorted(rows, np.arange(len(msgs)))
+        return np.add.reduceat(contrib, starts, axis=0) + self.bias
+
+    def proba_many(self, msgs) -> np.ndarray:
+        return softmax(self.scores(msgs))
+
+    def predict_many(self, msgs):
+        """Intent per message, or None where the model isn't confident enough."""
+        if not msgs:
+            return []
+        proba = self.proba_many(msgs)
+        best = proba.argmax(axis=1)
+        sure = proba[np.arange(len(msgs)), best] >= self.min_confidence
+        return [self.labels[i] if ok else None for i, ok in zip(best.tolist(), sure.tolist())]
+
+    def predict(self, msg: str):
+        return self.predict_many([msg])[0]
+
+def save_model(path, weights, bias, labels, bits: int = BITS, ngrams=NGRAMS,
+               min_confidence: float = MIN_CONFIDENCE, **meta):
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "weights.npy"), np.ascontiguousarray(weights, dtype=np.float32))
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"labels": list(labels), "bias": [float(x) for x in bias], "bits": bits,
+                   "ngrams": list(ngrams), "min_confidence": min_confidence, **meta}, f, indent=1)
+
+# ---------- loading (once per process) ----------
+_models = {}
+_models_lock = threading.Lock()
+
+def load_model(path: str = MODEL_DIR):
+    """The model in `path`, memory-mapped and cached per process; None if it hasn't been trained."""
+    with _models_lock:
+        if path not in _models:
+            weights_path = os.path.join(path, "weights.npy")
+            if not os.path.exists(weights_path):
+                return None
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            _models[path] = IntentModel(np.load(weights_path, mmap_mode="r"), meta.pop("bias"), meta.pop("labels"),
+                                        meta.pop("bits"), meta.pop("ngrams"), meta.pop("min_confidence"), meta)
+        return _models[path]
+
+# ---------- micro-batching ----------
+
+class MicroBatcher:
+    """
+    Coalesces predict() calls from concurrent sessions. A worker thread scores
+    everything queued as one batch; whatever arrives meanwhile forms the next
+    one, so a lone caller never waits for company. A caller that isn't served
+    within `timeout` seconds gets None, so the keyword rules answer instead.
+    """
+
+    def __init__(self, model: IntentModel, max_batch: int = MAX_BATCH, timeout: float = PREDICT_TIMEOUT):
+        self.model = model
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._stats = {"calls": 0, "batches": 0, "largest": 0, "timeouts": 0}
+        self._thread = threading.Thread(target=self._run, name="intent-model", daemon=True)
+        self._thread.start()
+
+    def predict(self, msg: str):
+        slot = [None, threading.Event()]
+        with self._cond:
+            self._pending.append((msg, slot))
+            self._cond.notify()
+        if slot[1].wait(self.timeout):
+            return slot[0]
+        with self._cond:  # worker stalled or died: don't leave the message queued
+            self._stats["timeouts"] += 1
+            if slot[1].is_set():
+                return slot[0]
+            try:
+                self._pending.remove((msg, slot))
+            except ValueError:  # already taken into a batch; its result is dropped
+                pass
+        return None
+
+    def predict_many(self, msgs):
+        """Already a batch: scored on the caller's thread."""
+        return self.model.predict_many(msgs)
+
+    def metrics(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+        stats["avg_batch"] = stats["calls"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch))]
+                self._stats["calls"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["largest"] = max(self._stats["largest"], len(batch))
+            try:
+                results = self.model.predict_many([msg for msg, _ in batch])
+            except Exception:  # never strand a caller: fall back to the rules
+                results = [None] * len(batch)
+            for (_, slot), result in zip(batch, results):
+                slot[0] = result
+                slot[1].set()
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_classifier():
+    """Process-wide MicroBatcher over load_model(), or None when no model has been trained."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            model = load_model()
+            if model is not None:
+                _classifier = MicroBatcher(model)
+        return _classifier
@@ -0,0 +1,151 @@
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from modules.chatbot_logic import RULE_FIRST, classify_intent
+from modules.intent_model import BITS, MIN_CONFIDENCE, MODEL_DIR, NGRAMS, IntentModel, featurize, save_model, softmax
+
+# ---------------------------------------------
+# INTENT MODEL TRAINING — python -m modules.intent_training
+# ---------------------------------------------
+# Hand-written seed messages (EXAMPLES_PATH) are expanded with filler words
+# and typos, a held-out share of the *seeds* (with all their variants) is set
+# aside, and a softmax regression is fitted on the hashed n-grams with Adam.
+# The report compares keyword rules alone against rules + model on the
+# held-out messages; the shipped model is then refitted on every seed.
+
+EXAMPLES_PATH = "assets/intent_examples.jsonl"
+HOLDOUT = 0.2
+VARIANTS = 24               # augmented copies per seed message
+EPOCHS = 400
+LEARNING_RATE = 0.1
+L2 = 1e-6
+
+PREFIXES = ["", "", "", "honestly ", "hey ", "so ", "um ", "ok ", "today ", "right now ", "i think ", "well "]
+SUFFIXES = ["", "", "", " today", " right now", " tbh", "!", "...", " please", " again", " now"]
+
+def load_examples(path: str = EXAMPLES_PATH):
+    """[(text, intent)] from a JSON-lines file of {"text", "intent"}."""
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(r["text"].lower().strip(), r["intent"]) for r in rows]
+
+def _typo(text: str, rng) -> str:
+    if len(text) < 4:
+        return text
+    i = rng.randrange(len(text) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return text[:i] + text[i + 1:]                          # dropped letter
+    if kind == 1:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]  # swapped letters
+    return text[:i] + text[i] + text[i:]                        # doubled letter
+
+def augment(examples, variants: int = VARIANTS, seed: int = 0):
+    """The seeds plus `variants` noisy copies of each: [(text, intent, seed index)]."""
+    rng = random.Random(seed)
+    out = []
+    for k, (text, intent) in enumerate(examples):
+        out.append((text, intent, k))
+        for _ in range(variants):
+            noisy = rng.choice(PREFIXES) + text + rng.choice(SUFFIXES)
+            if rng.random() < 0.3:
+                noisy = _typo(noisy, rng)
+            out.append((noisy, intent, k))
+    return out
+
+def split_seeds(examples, holdout: float = HOLDOUT, seed: int = 0):
+    """Held-out seed indices, the same share of every intent."""
+    rng = random.Random(seed)
+    by_intent = {}
+    for k, (_, intent) in enumerate(examples):
+        by_intent.setdefault(intent, []).append(k)
+    held = set()
+    for ids in by_intent.values():
+        held.update(rng.sample(ids, max(1, round(len(ids) * holdout))))
+    return held
+
+def fit(texts, intents, labels, bits: int = BITS, ngrams=NGRAMS, epochs: int = EPOCHS,
+        lr: float = LEARNING_RATE, l2: float = L2, log_every: int = 0):
+    """Softmax regression on hashed n-grams, full-batch Adam. Returns (weights, bias)."""
+    index = {label: i for i, label in enumerate(labels)}
+    y = np.array([index[i] for i in intents])
+    n, c, f = len(texts), len(labels), 1 << bits
+    rows, buckets, values = featurize(texts, bits, ngrams)
+    starts = np.searchsorted(rows, np.arange(n))
+    onehot = np.eye(c, dtype=np.float32)[y]
+
+    w, b = np.zeros((f, c), dtype=np.float32), np.zeros(c, dtype=np.float32)
+    mw, vw, mb, vb = np.zeros_like(w), np.zeros_like(w), np.zeros_like(b), np.zeros_like(b)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for t in range(1, epochs + 1):
+        proba = softmax(np.add.reduceat(w[buckets] * values[:, None], starts, axis=0) + b)
+        g = (proba - onehot) / n
+        gw = np.stack([np.bincount(buckets, weights=values * g[rows, k], minlength=f) for k in range(c)],
+                      axis=1).astype(np.float32) + l2 * w
+        gb = g.sum(axis=0)
+        for p, grad, m, v in ((w, gw, mw, vw), (b, gb, mb, vb)):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            p -= lr * (m / (1 - beta1 ** t)) / (np.sqrt(v / (1 - beta2 ** t)) + eps)
+        if log_every and t % log_every == 0:
+            loss = -np.log(proba[np.arange(n), y] + 1e-12).mean()
+            print(f"  epoch {t:>4}: loss {loss:.4f}")
+    return w, b
+
+def hybrid(texts, model):
+    """What the chatbot answers with the model plugged in (see chatbot_logic.detect_intent)."""
+    rules = [classify_intent(t) for t in texts]
+    guesses = model.predict_many(texts)
+    return [r if r in RULE_FIRST or g is None else g for r, g in zip(rules, guesses)]
+
+def report(texts, intents, model):
+    """Held-out accuracy per intent: rules alone vs rules + model. Returns (rules acc, hybrid acc)."""
+    rules = [classify_intent(t) for t in texts]
+    both = hybrid(texts, model)
+    print(f"{'intent':<12} {'n':>5} {'rules':>7} {'+model':>7}")
+    for label in sorted(set(intents)):
+        idx = [i for i, it in enumerate(intents) if it == label]
+        r = sum(rules[i] == label for i in idx) / len(idx)
+        h = sum(both[i] == label for i in idx) / len(idx)
+        print(f"{label:<12} {len(idx):>5} {r:>7.1%} {h:>7.1%}")
+    r_acc = float(np.mean([a == b for a, b in zip(rules, intents)]))
+    h_acc = float(np.mean([a == b for a, b in zip(both, intents)]))
+    abstain = sum(g is None for g in model.predict_many(texts)) / len(texts)
+    print(f"{'overall':<12} {len(texts):>5} {r_acc:>7.1%} {h_acc:>7.1%}   (model abstains on {abstain:.1%})")
+    return r_acc, h_acc
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Train the intent classifier and report held-out accuracy.")
+    ap.add_argument("--examples", default=EXAMPLES_PATH)
+    ap.add_argument("--out", default=MODEL_DIR)
+    ap.add_argument("--no-save", action="store_true", help="only print the held-out report")
+    args = ap.parse_args(argv)
+
+    examples = load_examples(args.examples)
+    labels = sorted({intent for _, intent in examples})
+    held = split_seeds(examples)
+    data = augment(examples)
+    train = [(t, i) for t, i, k in data if k not in held]
+    test = [(t, i) for t, i, k in data if k in held]
+    print(f"{len(examples)} seeds, {len(labels)} intents; train {len(train):,} / held-out {len(test):,} messages")
+
+    t0 = time.perf_counter()
+    w, b = fit([t for t, _ in train], [i for _, i in train], labels)
+    print(f"trained in {time.perf_counter() - t0:.1f}s")
+    r_acc, h_acc = report([t for t, _ in test], [i for _, i in test], IntentModel(w, b, labels))
+
+    if not args.no_save:
+        w, b = fit([t for t, _, _ in data], [i for _, i, _ in data], labels)
+        save_model(args.out, w, b, labels, BITS, NGRAMS, MIN_CONFIDENCE,
+                   seeds=len(examples), heldout_rules_acc=round(r_acc, 4), heldout_model_acc=round(h_acc, 4))
+        print(f"saved {args.out}/weights.npy")
+
+
+if __name__ == "__main__":
+    main()
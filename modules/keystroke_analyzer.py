@@ -1,13 +1,184 @@
+import math
 import time
 
+import numpy as np
+
+# ---------------------------------------------
+# KEYSTROKE DYNAMICS — streaming features + per-user stress thresholds
+# ---------------------------------------------
+# Key events (press time, release time, key code) go into fixed-size NumPy
+# ring buffers holding the last WINDOW keystrokes. Running sums are adjusted
+# as each event enters and the oldest leaves, so every rolling feature is O(1)
+# per event. Stress is a weighted z-score of the features against the user's
+# own baseline (calibrated from their first typing), not a global cut-off.
+# Import this (and NumPy with it) only where key events are actually collected;
+# the app creates no analyzer until a page feeds one.
+
+WINDOW = 64                 # keystrokes in the rolling window
+PAUSE_GAP = 0.75            # s between keys that ends a burst
+CALIBRATE_EVENTS = 300      # events that build a user's baseline
+RESYNC_EVERY = 4096         # recompute running sums from the buffer to shed float drift
+BACKSPACE_CODES = frozenset({8, 46})  # Backspace, Delete
+
+FEATURES = ["iki_mean", "iki_std", "dwell_mean", "dwell_std", "backspace_rate", "burst_len"]
+# population defaults until a user is calibrated: (mean, std) per feature
+DEFAULT_MEAN = np.array([0.25, 0.15, 0.10, 0.03, 0.05, 10.0])
+DEFAULT_STD = np.array([0.10, 0.08, 0.04, 0.02, 0.04, 6.0])
+# how each feature's z-score pushes towards "stressed" (slow, erratic, many corrections, short bursts)
+STRESS_WEIGHTS = np.array([1.0, 0.75, 0.25, 0.0, 1.0, -0.5])
+STRESS_Z = 1.0              # weighted z above this -> "stressed"
+BORED_Z = -1.25             # far faster/steadier than usual -> "bored"
+
+class Baseline:
+    """Running mean/variance of a user's feature vectors (Welford); O(F) per update."""
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count=0, mean=None, m2=None):
+        self.count = count
+        self.mean = np.zeros(len(FEATURES)) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.m2 = np.zeros(len(FEATURES)) if m2 is None else np.asarray(m2, dtype=np.float64)
+
+    def update(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def calibrated(self) -> bool:
+        return self.count >= CALIBRATE_EVENTS
+
+    def stats(self):
+        """(mean, std) to score against; population defaults until calibrated."""
+        if not self.calibrated:
+            return DEFAULT_MEAN, DEFAULT_STD
+        std = np.sqrt(self.m2 / (self.count - 1))
+        return self.mean, np.maximum(std, DEFAULT_STD * 0.25)
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "mean": self.mean.tolist(), "m2": self.m2.tolist()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Baseline":
+        return cls(d["count"], d["mean"], d["m2"])
+
+def _label(score: float) -> str:
+    if score > STRESS_Z:
+        return "stressed"
+    if score < BORED_Z:
+        return "bored"
+    return "normal"
+
+def stress_score(features, baseline: Baseline) -> float:
+    mean, std = baseline.stats()
+    return float(STRESS_WEIGHTS @ ((features - mean) / std) / np.abs(STRESS_WEIGHTS).sum())
+
 class KeystrokeAnalyzer:
-    def __init__(self):
+    def __init__(self, window: int = WINDOW, baseline: Baseline | None = None):
+        self.window = window
+        self.baseline = baseline or Baseline()
         self.start_time = None
+        # ring buffers (slot = event index % window)
+        self._iki = np.zeros(window)
+        self._dwell = np.zeros(window)
+        self._has_iki = np.zeros(window, dtype=bool)
+        self._bs = np.zeros(window, dtype=bool)
+        self._pause = np.zeros(window, dtype=bool)
+        self.reset()
+
+    def reset(self):
+        """Forget the current stream (the user's baseline is kept)."""
+        self.events = 0
+        self._last_down = None
+        self._n_iki = self._n_bs = self._n_pause = 0
+        self._s_iki = self._ss_iki = self._s_dwell = self._ss_dwell = 0.0
+
+    # ---------- streaming ----------
+    def add(self, t_down: float, t_up: float, key: int):
+        """Ingest one keystroke; O(1)."""
+        w = self.window
+        slot = self.events % w
+        if self.events >= w:  # evict the oldest keystroke
+            d = self._dwell[slot]
+            self._s_dwell -= d
+            self._ss_dwell -= d * d
+            if self._has_iki[slot]:
+                g = self._iki[slot]
+                self._n_iki -= 1
+                self._s_iki -= g
+                self._ss_iki -= g * g
+            self._n_bs -= self._bs[slot]
+            self._n_pause -= self._pause[slot]
+
+        dwell = t_up - t_down
+        self._dwell[slot] = dwell
+        self._s_dwell += dwell
+        self._ss_dwell += dwell * dwell
+        has_iki = self._last_down is not None
+        self._has_iki[slot] = has_iki
+        if has_iki:
+            gap = t_down - self._last_down
+            self._iki[slot] = gap
+            self._n_iki += 1
+            self._s_iki += gap
+            self._ss_iki += gap * gap
+            pause = gap >= PAUSE_GAP
+        else:
+            self._iki[slot] = 0.0
+            pause = False
+        self._pause[slot] = pause
+        self._n_pause += pause
+        bs = key in BACKSPACE_CODES
+        self._bs[slot] = bs
+        self._n_bs += bs
+        self._last_down = t_down
+        self.events += 1
+
+        if self.events % RESYNC_EVERY == 0:
+            self._resync()
+        if self.events >= w and not self.baseline.calibrated:
+            self.baseline.update(self.features())
+
+    def _resync(self):
+        n = min(self.events, self.window)
+        has, iki, dwell = self._has_iki[:n], self._iki[:n], self._dwell[:n]
+        self._n_iki = int(has.sum())
+        self._s_iki = float(iki[has].sum())
+        self._ss_iki = float((iki[has] ** 2).sum())
+        self._s_dwell = float(dwell.sum())
+        self._ss_dwell = float((dwell ** 2).sum())
+        self._n_bs = int(self._bs[:n].sum())
+        self._n_pause = int(self._pause[:n].sum())
 
+    def features(self) -> np.ndarray:
+        """Rolling features over the window, in FEATURES order."""
+        n = min(self.events, self.window)
+        if n == 0:
+            return np.zeros(len(FEATURES))
+        k = self._n_iki
+        iki_mean = self._s_iki / k if k else 0.0
+        iki_var = self._ss_iki / k - iki_mean * iki_mean if k else 0.0
+        dwell_mean = self._s_dwell / n
+        dwell_var = self._ss_dwell / n - dwell_mean * dwell_mean
+        return np.array([iki_mean, math.sqrt(max(iki_var, 0.0)), dwell_mean, math.sqrt(max(dwell_var, 0.0)),
+                         self._n_bs / n, n / (self._n_pause + 1)])
+
+    def score(self) -> float:
+        return stress_score(self.features(), self.baseline)
+
+    def classify(self) -> str:
+        """"stressed" / "normal" / "bored" for the current window, against this user's baseline."""
+        if self.events < self.window // 4:
+            return "normal"
+        return _label(self.score())
+
+    # ---------- whole-message fallback (no key events available) ----------
     def record_start(self):
         self.start_time = time.time()
 
     def analyze(self, message: str) -> str:
+        if self.events:
+            return self.classify()
         if not self.start_time:
             return "normal"
         elapsed = time.time() - self.start_time
@@ -20,4 +191,61 @@ class KeystrokeAnalyzer:
             return "bored"
         return "normal"
 
+# ---------------------------------------------
+# Batch mode over recorded sessions
+# ---------------------------------------------
+
+def _rolling_sum(x, window):
+    cs = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    idx = np.arange(1, len(x) + 1)
+    return cs[idx] - cs[np.maximum(idx - window, 0)]
+
+def batch_features(t_down, t_up, keys, window: int = WINDOW) -> np.ndarray:
+    """
+    Rolling features after every keystroke of one recorded session, shape (n, len(FEATURES));
+    row i equals KeystrokeAnalyzer.features() after the i-th add().
+    """
+    t_down = np.asarray(t_down, dtype=np.float64)
+    dwell = np.asarray(t_up, dtype=np.float64) - t_down
+    n = len(t_down)
+    iki = np.zeros(n)
+    iki[1:] = np.diff(t_down)
+    has = np.ones(n, dtype=bool)
+    has[:1] = False
+    counts = np.minimum(np.arange(1, n + 1), window).astype(np.float64)
+    k = _rolling_sum(has, window)
+    s_iki, ss_iki = _rolling_sum(iki, window), _rolling_sum(iki * iki, window)
+    s_d, ss_d = _rolling_sum(dwell, window), _rolling_sum(dwell * dwell, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        iki_mean = np.where(k > 0, s_iki / k, 0.0)
+        iki_var = np.where(k > 0, ss_iki / k - iki_mean ** 2, 0.0)
+    dwell_mean = s_d / counts
+    dwell_var = ss_d / counts - dwell_mean ** 2
+    bs = _rolling_sum(np.isin(np.asarray(keys), list(BACKSPACE_CODES)), window)
+    pauses = _rolling_sum(has & (iki >= PAUSE_GAP), window)
+    return np.column_stack([iki_mean, np.sqrt(np.maximum(iki_var, 0)), dwell_mean,
+                            np.sqrt(np.maximum(dwell_var, 0)), bs / counts, counts / (pauses + 1)])
 
+def analyze_sessions(sessions, baseline: Baseline | None = None, window: int = WINDOW):
+    """
+    Score many recorded sessions [(t_down, t_up, keys), ...] at once.
+    Returns [(label, mean stress score over the session's full windows)].
+    Without a baseline, the first CALIBRATE_EVENTS full windows of the first
+    sessions calibrate one (sessions are assumed to be from the same user).
+    """
+    feats = [batch_features(d, u, k, window) for d, u, k in sessions]
+    if baseline is None:
+        baseline = Baseline()
+        for f in feats:
+            for row in f[window - 1:]:
+                if baseline.calibrated:
+                    break
+                baseline.update(row)
+    mean, std = baseline.stats()
+    weights = STRESS_WEIGHTS / np.abs(STRESS_WEIGHTS).sum()
+    out = []
+    for f in feats:
+        full = f[window - 1:] if len(f) >= window else f[-1:]
+        score = float(((full - mean) / std @ weights).mean()) if len(full) else 0.0
+        out.append((_label(score), score))
+    return out
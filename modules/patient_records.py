@@ -0,0 +1,61 @@
+import streamlit as st
+import pandas as pd
+from datetime import date
+
+from modules.database_setup import get_conn
+
+PAGE_SIZE = 50
+DAYS = 7
+
+# One query for a whole page of patients: page the users, then read each
+# patient's last DAYS check-ins straight off ux_recovery_user_date (from the
+# DAYS-th newest date on). Both sides come back in index order, so there is
+# no window function and no sort (benchmarks/check_query_plans.py checks it).
+RECENT_SQL = """
+SELECT u.username, u.language, r.date, r.completed
+FROM users u LEFT JOIN recovery_tracker r
+  ON r.username = u.username AND r.date <= ?4
+ AND r.date >= COALESCE((SELECT date FROM recovery_tracker WHERE username = u.username AND date <= ?4
+                         ORDER BY date DESC LIMIT 1 OFFSET ?5 - 1), '')
+WHERE u.username IN (SELECT username FROM users WHERE username LIKE ?1 ESCAPE '\\'
+                     ORDER BY username LIMIT ?2 OFFSET ?3)
+ORDER BY u.username, r.date DESC
+"""
+
+def _like(search: str) -> str:
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def load_page(search: str = "", page: int = 0, page_size: int = PAGE_SIZE, days: int = DAYS) -> pd.DataFrame:
+    """Long-format (username, language, date, completed) rows for one page of patients."""
+    return pd.read_sql_query(RECENT_SQL, get_conn(),
+                             params=(_like(search), page_size, page * page_size, date.today().isoformat(), days))
+
+def to_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    """Pivot to one row per patient and one column per date (✅ done / ❌ missed)."""
+    if df.empty:
+        return df
+    patients = df[["username", "language"]].drop_duplicates()
+    index = pd.MultiIndex.from_frame(patients, names=["Patient", "Language"])
+    checked = df.dropna(subset=["date"])
+    if checked.empty:
+        return pd.DataFrame(index=index)
+    matrix = (checked.assign(status=checked["completed"].map({1: "✅", 0: "❌"}))
+              .pivot(index=["username", "language"], columns="date", values="status"))
+    matrix.index.names = ["Patient", "Language"]
+    matrix = matrix.reindex(index).fillna("·")
+    return matrix[sorted(matrix.columns, reverse=True)]
+
+def show_records():
+    search = st.text_input("🔍 Search patient", key="records_search").strip()
+    if st.session_state.get("records_last_search") != search:
+        st.session_state["records_last_search"] = search
+        st.session_state["records_page"] = 1
+    page = st.number_input("Page", min_value=1, step=1, key="records_page")
+
+    df = load_page(search, int(page) - 1)
+    if df.empty:
+        st.info("No user data found." if page == 1 else "No more patients.")
+        return
+    st.caption(f"Last {DAYS} recovery check-ins per patient (· = no entry).")
+    st.dataframe(to_matrix(df), use_container_width=True)
@@ -1,25 +1,57 @@
-import sqlite3
 from datetime import datetime
 
-DB_PATH = "database/chatbot.db"
+import numpy as np
+import pandas as pd
+
+from modules.database_setup import get_conn
+from modules.write_behind import submit
+
+# Risk thresholds (an entry at or above either value gets the level)
+HIGH_USAGE, HIGH_CRAVING = 6, 8
+MEDIUM_USAGE, MEDIUM_CRAVING = 3, 5
+RISK_LABELS = np.array(["Low", "Medium", "High"], dtype=object)
 
 def risk_label(mood:str|None, craving:int|None, usage:int|None) -> str:
     craving = craving or 0
     usage = usage or 0
-    if usage >= 6 or craving >= 8:
+    if usage >= HIGH_USAGE or craving >= HIGH_CRAVING:
         return "High"
-    if usage >= 3 or craving >= 5:
+    if usage >= MEDIUM_USAGE or craving >= MEDIUM_CRAVING:
         return "Medium"
     return "Low"
 
+def risk_levels(craving, usage) -> np.ndarray:
+    """Vectorized risk_label as levels (0 Low, 1 Medium, 2 High); missing values count as 0."""
+    craving = np.nan_to_num(np.asarray(craving, dtype=np.float64))
+    usage = np.nan_to_num(np.asarray(usage, dtype=np.float64))
+    high = (usage >= HIGH_USAGE) | (craving >= HIGH_CRAVING)
+    medium = (usage >= MEDIUM_USAGE) | (craving >= MEDIUM_CRAVING)
+    return np.where(high, 2, np.where(medium, 1, 0)).astype(np.int8)
+
+def risk_labels(craving, usage) -> np.ndarray:
+    """Vectorized risk_label over arrays: "Low" / "Medium" / "High" per entry."""
+    return RISK_LABELS[risk_levels(craving, usage)]
+
+def rescore_progress(chunk: int = 100_000) -> int:
+    """Re-label every progress row with the current thresholds; returns rows changed."""
+    conn = get_conn()
+    last_id, changed = 0, 0
+    while True:
+        df = pd.read_sql_query("SELECT id, craving, usage, risk FROM progress WHERE id > ? ORDER BY id LIMIT ?",
+                               conn, params=(last_id, chunk))
+        if df.empty:
+            return changed
+        labels = risk_labels(df["craving"], df["usage"])
+        stale = labels != df["risk"].to_numpy()
+        if stale.any():
+            with conn:
+                conn.executemany("UPDATE progress SET risk=? WHERE id=?",
+                                 zip(labels[stale].tolist(), df["id"].to_numpy()[stale].tolist()))
+            changed += int(stale.sum())
+        last_id = int(df["id"].iloc[-1])
+
 def log_progress(username, mood, craving, usage):
     risk = risk_label(mood, craving, usage)
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("INSERT INTO progress (username,mood,craving,usage,risk,date) VALUES (?,?,?,?,?,?)",
-              (username, mood or "", craving or 0, usage or 0, risk, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    conn.commit()
-    conn.close()
+    submit("INSERT INTO progress (username,mood,craving,usage,risk,date) VALUES (?,?,?,?,?,?)",
+           (username, mood or "", craving or 0, usage or 0, risk, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
     return risk
-
-
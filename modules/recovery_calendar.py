@@ -1,12 +1,12 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import date
 import random
 import calendar
 
-DB_PATH = "database/chatbot.db"
+from modules.charts import bar_chart
+from modules.database_setup import get_conn, table_versions
+from modules.recovery_stats import user_stats
 
 # --- Motivation + Examples ---
 QUOTES = [
@@ -49,60 +49,57 @@ EXAMPLES = {
 }
 
 # ---------- DB helpers ----------
+# (username, year, month) already provisioned by this process — reruns skip the DB
+_PROVISIONED = set()
+
 def _conn():
-    return sqlite3.connect(DB_PATH)
+    return get_conn()
 
 def _ensure_month(username:str):
     """Ensure one row per day for the current month exists for the user."""
     y, m = date.today().year, date.today().month
+    if (username, y, m) in _PROVISIONED:
+        return
     days_in_month = calendar.monthrange(y, m)[1]
     conn = _conn()
-    c = conn.cursor()
-    for day in range(1, days_in_month + 1):
-        d = date(y, m, day).strftime("%Y-%m-%d")
-        c.execute("SELECT 1 FROM recovery_tracker WHERE username=? AND date=?", (username, d))
-        if not c.fetchone():
-            c.execute(
-                "INSERT INTO recovery_tracker (username,date,completed,motivation) VALUES (?,?,0,'')",
-                (username, d)
-            )
-    conn.commit(); conn.close()
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO recovery_tracker (username,date,completed,motivation) VALUES (?,?,0,'')",
+            [(username, date(y, m, day).strftime("%Y-%m-%d")) for day in range(1, days_in_month + 1)]
+        )
+    _PROVISIONED.add((username, y, m))
 
 def _mark_done(username:str, d:str):
     conn = _conn()
-    c = conn.cursor()
     quote = random.choice(QUOTES)
-    c.execute("UPDATE recovery_tracker SET completed=1, motivation=? WHERE username=? AND date=?",
-              (quote, username, d))
-    conn.commit(); conn.close()
+    with conn:
+        conn.execute("UPDATE recovery_tracker SET completed=1, motivation=? WHERE username=? AND date=?",
+                     (quote, username, d))
     return quote
 
 def _load_df(username:str) -> pd.DataFrame:
-    conn = _conn()
     df = pd.read_sql_query(
         "SELECT date, completed, motivation FROM recovery_tracker WHERE username=? ORDER BY date ASC",
-        conn, params=(username,)
+        _conn(), params=(username,)
     )
-    conn.close()
     if df.empty: return df
     df["date"] = pd.to_datetime(df["date"])
     return df
 
-def _streak_current_month(df: pd.DataFrame) -> int:
-    if df.empty: return 0
-    df = df.sort_values("date")
-    today = pd.Timestamp(date.today())
-    # only this month
-    df = df[df["date"].dt.month == today.month]
-    if df.empty: return 0
-    streak = 0
-    for _, row in df.iloc[::-1].iterrows():
-        day = row["date"].date()
-        if day == (today - pd.Timedelta(days=streak)).date() and int(row["completed"]) == 1:
-            streak += 1
-        else:
-            break
-    return streak
+# (username, recovery_tracker version, day) -> (history, this month, stats); reruns reuse it until a write
+_VIEW_CACHE_SIZE = 256
+_view_cache = {}
+
+def _month_view(username:str):
+    today = date.today()
+    key = (username, table_versions()["recovery_tracker"], today)
+    if key not in _view_cache:
+        df = _load_df(username)
+        df_month = df[(df["date"].dt.year == today.year) & (df["date"].dt.month == today.month)] if not df.empty else df
+        if len(_view_cache) >= _VIEW_CACHE_SIZE:
+            _view_cache.clear()
+        _view_cache[key] = (df, df_month, user_stats(df, today))
+    return _view_cache[key]
 
 # ---------- UI ----------
 def _examples_ui():
@@ -181,35 +178,26 @@ def show_calendar(username: str):
     _examples_ui()
 
     # ---- Load and show progress ----
-    df = _load_df(username)
+    df, df_month, stats = _month_view(username)
     if df.empty:
         st.info("No recovery data yet.")
         return
 
-    today = date.today()
-    df_month = df[df["date"].dt.month == today.month]
-    done = int(df_month["completed"].sum())
-    total = int(len(df_month))
-    percent = (done/total*100) if total else 0.0
-    streak = _streak_current_month(df)
-
-    st.markdown(f"**This month:** {done}/{total} days completed (**{percent:.1f}%**). | 🔥 **Streak: {streak}** days")
+    st.markdown(f"**This month:** {stats['month_done']}/{stats['month_total']} days completed "
+                f"(**{stats['month_pct']:.1f}%**). | 🔥 **Streak: {stats['current_streak']}** days "
+                f"| 🏆 Best: {stats['longest_streak']} days")
 
     # ---- Calendar grid with buttons ----
     _calendar_grid(df_month, username)
 
     # ---- Bar chart (0/1 timeline) ----
     if not df_month.empty:
-        fig, ax = plt.subplots()
-        ax.bar(df_month["date"], df_month["completed"], width=0.8)
-        ax.set_title("Daily Completion Tracker")
-        ax.set_ylabel("1 = Completed, 0 = Missed")
-        ax.tick_params(axis="x", rotation=45)
-        st.pyplot(fig, clear_figure=True)
+        st.image(bar_chart(df_month["date"].dt.strftime("%d"), df_month["completed"],
+                           title="Daily Completion Tracker", ylabel="1 = Completed, 0 = Missed",
+                           rotate_x=45))
 
     # Gentle nudge if falling behind
-    tail = df_month.tail(3)
-    if len(tail) == 3 and tail["completed"].sum() == 0:
+    if stats["missed_recent"]:
         st.warning("⚠️ You missed the last 3 days. It’s okay — restart today. I’m with you 💚")
 
 
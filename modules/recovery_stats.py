@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+
+# ---------------------------------------------
+# RECOVERY STATS — vectorized streaks & completion
+# ---------------------------------------------
+# Check-ins are laid out as a users × days boolean matrix (one column per
+# calendar day up to today) and streaks come from run-length encoding, so
+# they carry across month boundaries and all users are done in one pass.
+
+STAT_COLUMNS = ["username", "current_streak", "longest_streak", "month_done", "month_total",
+                "month_pct", "missed_recent"]
+
+def _longest_runs(done):
+    """Longest run of True per row (RLE over the rows laid end to end)."""
+    n_users, n_days = done.shape
+    padded = np.zeros((n_users, n_days + 1), dtype=np.int8)
+    padded[:, :n_days] = done
+    edges = np.diff(padded.ravel(), prepend=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    longest = np.zeros(n_users, dtype=np.int64)
+    np.maximum.at(longest, starts // (n_days + 1), ends - starts)
+    return longest
+
+def _trailing_runs(done):
+    """Run of True ending on the last column (today) per row."""
+    rev = ~done[:, ::-1]
+    return np.where(rev.any(axis=1), rev.argmax(axis=1), done.shape[1])
+
+def bulk_stats(df: pd.DataFrame, today: date | None = None, missed_days: int = 3) -> pd.DataFrame:
+    """
+    Streak/completion metrics for every user in `df` (username, date, completed).
+    The month total counts every provisioned day of the current month, as the
+    calendar does; streaks and "missed recently" only look at days up to today.
+    """
+    today = today or date.today()
+    if df.empty:
+        return pd.DataFrame(columns=STAT_COLUMNS)
+
+    users, rows = np.unique(df["username"].to_numpy(dtype=object), return_inverse=True)
+    days = pd.to_datetime(df["date"]).to_numpy().astype("datetime64[D]")
+    flags = df["completed"].to_numpy().astype(bool)
+    end = np.datetime64(today, "D")
+    month_start = np.datetime64(today.replace(day=1), "D")
+
+    in_month = days.astype("datetime64[M]") == month_start.astype("datetime64[M]")
+    month_total = np.bincount(rows[in_month], minlength=len(users))
+    month_done = np.bincount(rows[in_month & flags & (days <= end)], minlength=len(users))
+
+    # users × days matrix up to today
+    past = days <= end
+    first = min(days[past].min(), end) if past.any() else end
+    n_days = int((end - first).astype(np.int64)) + 1
+    cols = (days[past] - first).astype(np.int64)
+    present = np.zeros((len(users), n_days), dtype=bool)
+    done = np.zeros((len(users), n_days), dtype=bool)
+    present[rows[past], cols] = True
+    done[rows[past], cols] = flags[past]
+
+    if n_days >= missed_days:
+        missed = present[:, -missed_days:].all(axis=1) & ~done[:, -missed_days:].any(axis=1)
+    else:
+        missed = np.zeros(len(users), dtype=bool)
+
+    pct = np.divide(month_done * 100.0, month_total, out=np.zeros(len(users)), where=month_total > 0)
+    return pd.DataFrame({
+        "username": users,
+        "current_streak": _trailing_runs(done),
+        "longest_streak": _longest_runs(done),
+        "month_done": month_done,
+        "month_total": month_total,
+        "month_pct": pct,
+        "missed_recent": missed,
+    }, columns=STAT_COLUMNS)
+
+def user_stats(df: pd.DataFrame, today: date | None = None, missed_days: int = 3) -> dict:
+    """bulk_stats for one user's rows (date, completed) as a plain dict."""
+    if df.empty:
+        return {"current_streak": 0, "longest_streak": 0, "month_done": 0, "month_total": 0,
+                "month_pct": 0.0, "missed_recent": False}
+    row = bulk_stats(df.assign(username=""), today, missed_days).iloc[0]
+    return {k: row[k].item() for k in STAT_COLUMNS[1:]}
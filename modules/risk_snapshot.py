@@ -0,0 +1,153 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from modules.database_setup import get_conn
+from modules.progress_tracker import RISK_LABELS, risk_levels
+
+# ---------------------------------------------
+# RISK SNAPSHOT — materialized per-patient risk features
+# ---------------------------------------------
+# Triggers on progress / recovery_tracker mark a patient dirty (risk_dirty).
+# refresh() recomputes only those patients, plus everyone whose snapshot is
+# from an earlier day (the 7/30-day windows have moved), and upserts
+# risk_snapshot. The heavy lifting is one indexed read per source table and
+# bincount aggregations; the dashboard only ever reads the finished table.
+
+MISSED_DAYS_ALERT = 3       # missed check-ins in the 7 days before today -> at least Medium
+TREND_ALERT = 0.15          # usage rising by this much per day over 30 days -> at least Medium
+REFRESH_SECONDS = 60
+
+SNAPSHOT_COLUMNS = ["username", "as_of", "entries_7d", "craving_mean_7d", "craving_mean_30d", "usage_mean_7d",
+                    "usage_trend_30d", "missed_days_7d", "risk_level", "risk", "updated_at"]
+
+UPSERT_SQL = f"""INSERT INTO risk_snapshot ({", ".join(SNAPSHOT_COLUMNS)}) VALUES ({", ".join("?" * len(SNAPSHOT_COLUMNS))})
+ON CONFLICT(username) DO UPDATE SET {", ".join(f"{c}=excluded.{c}" for c in SNAPSHOT_COLUMNS[1:])}"""
+
+def _mean(total, count):
+    return np.divide(total, count, out=np.full(len(count), np.nan), where=count > 0)
+
+def compute_features(users, progress: pd.DataFrame, missed: pd.DataFrame, today: date) -> pd.DataFrame:
+    """
+    Snapshot rows for `users` from their last 30 days of progress (username, date, craving, usage)
+    and missed check-in counts (username, missed).
+    """
+    index = {u: i for i, u in enumerate(users)}
+    n = len(users)
+    idx = progress["username"].map(index).to_numpy(dtype=np.int64)
+    day = pd.to_datetime(progress["date"].str.slice(0, 10)).to_numpy().astype("datetime64[D]")
+    ago = (np.datetime64(today, "D") - day).astype(np.int64)
+    craving = progress["craving"].fillna(0).to_numpy(dtype=np.float64)
+    usage = progress["usage"].fillna(0).to_numpy(dtype=np.float64)
+
+    w7 = ago < 7
+    n7 = np.bincount(idx[w7], minlength=n)
+    n30 = np.bincount(idx, minlength=n)
+    craving_7 = _mean(np.bincount(idx[w7], weights=craving[w7], minlength=n), n7)
+    craving_30 = _mean(np.bincount(idx, weights=craving, minlength=n), n30)
+    usage_7 = _mean(np.bincount(idx[w7], weights=usage[w7], minlength=n), n7)
+
+    # least-squares slope of usage against day, per user
+    x = -ago.astype(np.float64)
+    sx, sy = np.bincount(idx, weights=x, minlength=n), np.bincount(idx, weights=usage, minlength=n)
+    sxx, sxy = np.bincount(idx, weights=x * x, minlength=n), np.bincount(idx, weights=x * usage, minlength=n)
+    denom = n30 * sxx - sx * sx
+    trend = np.divide(n30 * sxy - sx * sy, denom, out=np.zeros(n), where=denom > 0)
+
+    missed_days = np.zeros(n, dtype=np.int64)
+    if not missed.empty:
+        missed_days[missed["username"].map(index).to_numpy(dtype=np.int64)] = missed["missed"].to_numpy()
+
+    level = risk_levels(craving_7, usage_7)
+    level = np.where((missed_days >= MISSED_DAYS_ALERT) | (trend >= TREND_ALERT), np.maximum(level, 1), level)
+    return pd.DataFrame({
+        "username": users,
+        "as_of": today.isoformat(),
+        "entries_7d": n7,
+        "craving_mean_7d": craving_7,
+        "craving_mean_30d": craving_30,
+        "usage_mean_7d": usage_7,
+        "usage_trend_30d": trend,
+        "missed_days_7d": missed_days,
+        "risk_level": level.astype(np.int64),
+        "risk": RISK_LABELS[level],
+        "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }, columns=SNAPSHOT_COLUMNS)
+
+def refresh(today: date | None = None, full: bool = False) -> int:
+    """Recompute dirty / out-of-date patients (everyone with full=True); returns patients written."""
+    today = today or date.today()
+    conn = get_conn()
+    dirty = dict(conn.execute("SELECT username, seq FROM risk_dirty"))
+    if full:
+        users = {r[0] for r in conn.execute("SELECT username FROM users WHERE username IS NOT NULL")}
+    else:
+        users = {r[0] for r in conn.execute("SELECT username FROM risk_snapshot WHERE as_of < ?",
+                                            (today.isoformat(),))}
+    users = sorted(users | set(dirty))
+    if not users:
+        return 0
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS risk_batch(username TEXT PRIMARY KEY) WITHOUT ROWID")
+    with conn:
+        conn.execute("DELETE FROM risk_batch")
+        conn.executemany("INSERT INTO risk_batch(username) VALUES (?)", ((u,) for u in users))
+    # CROSS JOIN pins risk_batch as the outer loop, so each patient is one
+    # (username, date) range probe instead of a scan of everyone's last 30 days
+    start30 = (today - timedelta(days=29)).isoformat()
+    end = (today + timedelta(days=1)).isoformat()
+    progress = pd.read_sql_query(
+        "SELECT p.username, p.date, p.craving, p.usage FROM risk_batch b "
+        "CROSS JOIN progress p ON p.username = b.username WHERE p.date >= ? AND p.date < ?",
+        conn, params=(start30, end))
+    missed = pd.read_sql_query(
+        "SELECT r.username, COUNT(*) AS missed FROM risk_batch b "
+        "CROSS JOIN recovery_tracker r ON r.username = b.username "
+        "WHERE r.date >= ? AND r.date < ? AND r.completed = 0 GROUP BY r.username",
+        conn, params=((today - timedelta(days=7)).isoformat(), today.isoformat()))
+    snapshot = compute_features(users, progress, missed, today)
+
+    rows = list(snapshot.astype(object).where(snapshot.notna(), None).itertuples(index=False, name=None))
+    with conn:
+        conn.executemany(UPSERT_SQL, rows)
+        # a patient written to again while we computed keeps a newer seq and stays dirty
+        conn.executemany("DELETE FROM risk_dirty WHERE username = ? AND seq = ?", dirty.items())
+    return len(rows)
+
+def load_snapshot(conn=None) -> pd.DataFrame:
+    """risk_snapshot, highest risk first."""
+    return pd.read_sql_query(f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM risk_snapshot "
+                             "ORDER BY risk_level DESC, craving_mean_7d DESC", conn or get_conn())
+
+# ---------- background job ----------
+_job = None
+_job_lock = threading.Lock()
+
+def start_background(interval: float = REFRESH_SECONDS) -> threading.Thread:
+    """Run refresh() every `interval` seconds in a daemon thread (once per process)."""
+    global _job
+
+    def loop():
+        while True:
+            try:
+                refresh()
+            except Exception as e:  # keep the job alive; the next pass retries
+                print(f"risk snapshot refresh failed: {e!r}")
+            time.sleep(interval)
+
+    with _job_lock:
+        if _job is None:
+            _job = threading.Thread(target=loop, name="risk-snapshot", daemon=True)
+            _job.start()
+        return _job
+
+
+if __name__ == "__main__":
+    # python -m modules.risk_snapshot [--full]
+    import sys
+    from modules.database_setup import init_database
+    init_database()
+    print(f"{refresh(full='--full' in sys.argv[1:])} patients refreshed")
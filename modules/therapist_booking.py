@@ -1,7 +1,11 @@
 import streamlit as st
-import sqlite3
 
-DB_PATH = "database/chatbot.db"
+from modules.write_behind import write_sync
+
+def create_booking(username: str, date, time, mode: str, note: str = ""):
+    """Committed before returning — the user is told the booking was submitted."""
+    write_sync("INSERT INTO therapist_booking (username,date,time,mode,note) VALUES (?,?,?,?,?)",
+               (username, str(date), str(time), mode, note))
 
 def booking_form(username: str):
     st.markdown("#### Book a Session")
@@ -13,10 +17,5 @@ def booking_form(username: str):
         note = st.text_area("Short note (optional)")
         submitted = st.form_submit_button("Submit Booking")
     if submitted:
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("INSERT INTO therapist_booking (username,date,time,mode,note) VALUES (?,?,?,?,?)",
-                  (username, str(date), str(time), mode, note))
-        conn.commit()
-        conn.close()
+        create_booking(username, date, time, mode, note)
         st.success("Your session request has been submitted. A therapist will contact you. 💚")
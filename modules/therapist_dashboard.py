@@ -1,60 +1,241 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
+import threading
+from collections import OrderedDict
+from datetime import date
 
-DB_PATH = "database/chatbot.db"
+from modules import crisis_alerts
+from modules.data_export import FORMATS, MAX_EXPORT_ROWS, export_file, export_parts
+from modules.database_setup import get_conn, table_versions
+from modules.event_log import awareness_by_day, entertainment_by_day
+from modules.recovery_stats import bulk_stats
+from modules.risk_snapshot import load_snapshot
 
-def _load(name):
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query(f"SELECT * FROM {name}", conn)
-    conn.close()
-    return df
+# table -> (sort column, descending?, rows per page); mirrors what the dashboard shows
+PAGES = {
+    "users":             ("id",   False, 100),
+    "login_activity":    ("id",   True,  100),
+    "therapist_booking": ("id",   True,  100),
+    "recovery_tracker":  ("date", True,  120),
+    "progress":          ("date", True,  120),
+}
+
+# (table, user, cursor, table version) -> (DataFrame, next cursor); a write bumps the version
+_CACHE_SIZE = 128
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cached(key, compute):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = compute()
+    with _cache_lock:
+        _cache[key] = value
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+def _fetch_page(table, user, cursor):
+    """One page of `table`, newest first, using keyset pagination on (sort column, id)."""
+    col, desc, limit = PAGES[table]
+    op, direction = ("<", "DESC") if desc else (">", "ASC")
+    where, params = [], []
+    if user != "All":
+        where.append("username = ?")
+        params.append(user)
+    if cursor is not None:
+        if col == "id":
+            where.append(f"id {op} ?")
+            params.append(cursor[1])
+        else:
+            where.append(f"({col}, id) {op} (?, ?)")
+            params += list(cursor)
+    order = f"id {direction}" if col == "id" else f"{col} {direction}, id {direction}"
+    sql = (f"SELECT * FROM {table}" + (" WHERE " + " AND ".join(where) if where else "")
+           + f" ORDER BY {order} LIMIT ?")
+    df = pd.read_sql_query(sql, get_conn(), params=params + [limit + 1])
+    next_cursor = None
+    if len(df) > limit:
+        df = df.head(limit)
+        last = df.iloc[-1]
+        next_cursor = (last[col], int(last["id"]))
+    return df, next_cursor
+
+def _has_rows(table):
+    return get_conn().execute(f"SELECT EXISTS(SELECT 1 FROM {table})").fetchone()[0] == 1
+
+def _usernames(version):
+    return _cached(("usernames", version),
+                   lambda: [r[0] for r in get_conn().execute("SELECT username FROM users ORDER BY username")])
+
+def _streaks(version, today):
+    """Streak/completion stats for every patient in one vectorized pass."""
+    def compute():
+        df = pd.read_sql_query("SELECT username, date, completed FROM recovery_tracker WHERE date <= ?",
+                               get_conn(), params=(today.isoformat(),))
+        return bulk_stats(df, today)
+    return _cached(("streaks", version, today), compute)
+
+def _rollups(versions, today):
+    """Per-day click/pick counts as day × category tables, recomputed only after new events."""
+    def pivot(df, column, value):
+        if df.empty:
+            return df
+        return df.pivot(index="day", columns=column, values=value).fillna(0).astype(int).sort_index(ascending=False)
+    aware = _cached(("awareness_by_day", versions.get("awareness_clicks"), today),
+                    lambda: awareness_by_day(today=today))
+    picks = _cached(("entertainment_by_day", versions.get("entertainment_log"), today),
+                    lambda: entertainment_by_day(today=today))
+    top = aware.drop_duplicates("day")[["day", "category", "clicks"]]
+    return pivot(aware, "category", "clicks"), top, pivot(picks, "type", "picks")
+
+def _paged_table(table, user, versions):
+    """Render one table page with Prev/Next buttons; the cursor stack lives in session_state."""
+    key = f"dash_cursors_{table}_{user}"
+    stack = st.session_state.setdefault(key, [None])
+    cursor = stack[-1]
+    df, next_cursor = _cached((table, user, cursor, versions[table]),
+                              lambda: _fetch_page(table, user, cursor))
+    st.dataframe(df)
+
+    if len(stack) > 1 or next_cursor is not None:
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        if prev_col.button("◀ Prev", key=f"{key}_prev", disabled=len(stack) == 1):
+            stack.pop()
+            st.rerun()
+        page_col.caption(f"Page {len(stack)}")
+        if next_col.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None):
+            stack.append(next_cursor)
+            st.rerun()
+
+def _export_button(table, label, name, fmt, selected, start, end, versions):
+    """Download button for `table`; past MAX_EXPORT_ROWS rows it asks which part to download."""
+    ext, mime = FORMATS[fmt]
+    parts = _cached(("export_parts", table, selected, start, end, versions[table]),
+                    lambda: export_parts(table, selected, start, end))
+    part = 0
+    if parts > 1:
+        part = st.selectbox(f"{label} part ({MAX_EXPORT_ROWS:,} rows each)", range(parts),
+                            format_func=lambda p: f"{p + 1} of {parts}", key=f"export_part_{table}")
+        name = f"{name}-part{part + 1}"
+    st.download_button(f"⬇️ Download {label} {fmt}",
+                       lambda: export_file(table, fmt, selected, start, end, part),
+                       file_name=f"{name}.{ext}", mime=mime)
+
+def _acknowledge(alert_id):
+    crisis_alerts.acknowledge(alert_id, st.session_state.get("username") or "Therapist",
+                              is_therapist=st.session_state.get("is_therapist", False))
+
+@st.fragment(run_every=crisis_alerts.POLL_SECONDS)
+def alert_panel():
+    """Open crisis alerts (therapists only); re-polled on its own every POLL_SECONDS without rerunning the page."""
+    if not st.session_state.get("is_therapist", False):
+        return
+    alerts = crisis_alerts.open_alerts()
+    total = crisis_alerts.open_count() if len(alerts) == crisis_alerts.OPEN_LIMIT else len(alerts)
+    st.subheader(f"🚨 Crisis Alerts ({total} open)")
+    if not alerts:
+        st.success("No open alerts 💚")
+        return
+    for alert_id, user, message, severity, created_at in alerts:
+        info_col, ack_col = st.columns([5, 1])
+        info_col.markdown(f"**{crisis_alerts.SEVERITY_LABELS.get(severity, severity)}** · "
+                          f"**{user}** · {created_at}  \n> {message}")
+        ack_col.button("✅ Acknowledge", key=f"ack_alert_{alert_id}", on_click=_acknowledge,
+                       args=(alert_id,))
+    if total > len(alerts):
+        st.caption(f"Showing the {len(alerts)} most urgent of {total}.")
 
 def show_dashboard():
     st.markdown("### 👩‍⚕️ Therapist Dashboard")
 
-    users = _load("users")
-    logins = _load("login_activity")
-    bookings = _load("therapist_booking")
-    recovery = _load("recovery_tracker")
-    progress = _load("progress")
+    versions = table_versions()
 
     # Filters
-    usernames = sorted(list(set(users["username"])) if not users.empty else [])
+    usernames = _usernames(versions["users"])
     selected = st.selectbox("Filter by user", ["All"] + usernames)
 
-    def _maybe_filter(df):
-        if df.empty: return df
-        if selected == "All": return df
-        if "username" in df.columns:
-            return df[df["username"] == selected]
-        return df
-
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Users")
-        st.dataframe(users if selected == "All" else users[users["username"] == selected])
+        _paged_table("users", selected, versions)
     with col2:
         st.subheader("Recent Logins")
-        st.dataframe(_maybe_filter(logins).sort_values("id", ascending=False).head(100))
+        _paged_table("login_activity", selected, versions)
 
     st.subheader("Bookings")
-    st.dataframe(_maybe_filter(bookings).sort_values("id", ascending=False).head(100))
+    _paged_table("therapist_booking", selected, versions)
 
     st.subheader("Recovery Tracker (recent)")
-    st.dataframe(_maybe_filter(recovery).sort_values("date", ascending=False).head(120))
+    _paged_table("recovery_tracker", selected, versions)
+
+    st.subheader("Recovery Streaks")
+    streaks = _streaks(versions["recovery_tracker"], date.today())
+    st.dataframe(streaks if selected == "All" else streaks[streaks["username"] == selected])
+
+    st.subheader("🚦 Risk Snapshot")
+    risk = _cached(("risk_snapshot", versions.get("risk_snapshot")), load_snapshot)
+    if risk.empty:
+        st.info("No risk scores yet — they refresh in the background every minute.")
+    else:
+        if selected != "All":
+            risk = risk[risk["username"] == selected]
+        c1, c2, c3 = st.columns(3)
+        c1.metric("High risk", int((risk["risk"] == "High").sum()))
+        c2.metric("Medium risk", int((risk["risk"] == "Medium").sum()))
+        c3.metric("Scored patients", len(risk))
+        st.dataframe(risk.drop(columns=["risk_level"]), hide_index=True)
 
     st.subheader("Progress Logs (mood/craving/usage)")
-    st.dataframe(_maybe_filter(progress).sort_values("date", ascending=False).head(120))
+    _paged_table("progress", selected, versions)
+
+    st.subheader("Engagement (last 14 days)")
+    aware, top, picks = _rollups(versions, date.today())
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("⚠️ Awareness clicks per day")
+        if aware.empty:
+            st.info("No awareness clicks yet.")
+        else:
+            st.dataframe(aware)
+            st.caption("Most-clicked category per day")
+            st.dataframe(top, hide_index=True)
+    with col2:
+        st.caption("🎧 Entertainment picks per day")
+        if picks.empty:
+            st.info("No entertainment picks yet.")
+        else:
+            st.dataframe(picks)
+
+    with st.expander("🤖 Chatbot intent cache"):
+        from modules.chatbot_logic import intent_cache_info
+        info = intent_cache_info()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Hit rate", f"{info['hit_rate']:.0%}")
+        c2.metric("Hits / misses", f"{info['hits']} / {info['misses']}")
+        c3.metric("Entries", f"{info['size']} / {info['maxsize']}")
+
+    with st.expander("🗄️ Write-behind queue"):
+        from modules.write_behind import metrics
+        m = metrics()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Queue depth", m["depth"])
+        c2.metric("Rows written", m["written"], f"{m['batches']} batches", delta_color="off")
+        c3.metric("Latency p95", f"{m['latency_ms_p95']:.0f} ms")
+        c4.metric("Errors", m["errors"])
+
+    # Exports (generated only when a download button is clicked; follows the user filter)
+    fmt_col, range_col = st.columns(2)
+    fmt = fmt_col.selectbox("Export format", list(FORMATS), key="export_fmt")
+    date_range = range_col.date_input("Export date range (optional)", value=(), key="export_range")
+    start, end = (tuple(date_range) + (None, None))[:2]
 
-    # Exports
     exp_col1, exp_col2 = st.columns(2)
     with exp_col1:
-        if not bookings.empty:
-            st.download_button("⬇️ Download Bookings CSV", bookings.to_csv(index=False).encode("utf-8"),
-                               file_name="bookings.csv", mime="text/csv")
+        if _has_rows("therapist_booking"):
+            _export_button("therapist_booking", "Bookings", "bookings", fmt, selected, start, end, versions)
     with exp_col2:
-        if not recovery.empty:
-            st.download_button("⬇️ Download Recovery CSV", recovery.to_csv(index=False).encode("utf-8"),
-                               file_name="recovery.csv", mime="text/csv")
-
+        if _has_rows("recovery_tracker"):
+            _export_button("recovery_tracker", "Recovery", "recovery", fmt, selected, start, end, versions)
@@ -1,7 +1,8 @@
 import streamlit as st
-import sqlite3
 from datetime import datetime
 
+from modules.database_setup import get_conn
+
 def therapist_portal():
     st.header("🔐 Therapist Login")
     st.caption("For authorized mental health professionals only.")
@@ -23,8 +24,7 @@ def therapist_portal():
         st.caption("Patient insights and activity overview")
 
         # Connect to your DB
-        conn = sqlite3.connect("recovery_data.db")
-        c = conn.cursor()
+        c = get_conn().cursor()
 
         # Show patient data
         try:
@@ -0,0 +1,173 @@
+import atexit
+import itertools
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from modules.database_setup import close_conn, get_conn, write_turn
+
+# ---------------------------------------------
+# WRITE-BEHIND LOGGER — queued, group-committed inserts
+# ---------------------------------------------
+# Log-style writes (logins, progress, content/awareness events) are handed to
+# a background thread instead of committing inside the Streamlit run. The
+# thread drains its buffer every FLUSH_MS (or once MAX_ROWS are waiting),
+# writes each batch with one executemany per statement and commits once.
+# Anything the user is waiting on (bookings) goes through write_sync instead.
+# Once close() has started, submit() writes synchronously too, so nothing
+# lands in the buffer after the final drain. A row that still fails on its
+# own after a failed batch is printed and kept in `failed`.
+
+FLUSH_MS = 200
+MAX_ROWS = 500
+MAX_QUEUE = 10_000   # past this, submit() writes synchronously rather than grow without bound
+MAX_FAILED = 100     # failed rows kept for inspection
+
+class WriteBehind:
+    def __init__(self, path: str | None = None, flush_ms: int = FLUSH_MS, max_rows: int = MAX_ROWS,
+                 max_queue: int = MAX_QUEUE):
+        self.path = path
+        self.flush_ms = flush_ms
+        self.max_rows = max_rows
+        self.max_queue = max_queue
+        # a plain deque: appends are atomic and don't wake the writer, which
+        # drains it every flush_ms (or as soon as max_rows are waiting)
+        self._buf = deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)  # enqueue -> commit, seconds
+        self.failed = deque(maxlen=MAX_FAILED)  # (sql, params, error) of rows that couldn't be written
+        self._stats = {"enqueued": 0, "written": 0, "batches": 0, "errors": 0, "sync": 0, "last_batch": 0}
+        self.last_error = None
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    # ---------- producer side ----------
+    def submit(self, sql: str, params=()):
+        """Queue one INSERT/UPDATE; returns immediately."""
+        # checked and appended under the lock close() takes, so a row is either
+        # queued before the final drain starts or written here
+        with self._lock:
+            queued = not self._stopping and len(self._buf) < self.max_queue
+            if queued:
+                self._buf.append((sql, params, time.perf_counter()))
+                self._stats["enqueued"] += 1
+        if not queued:
+            self.write_sync(sql, params)
+        elif len(self._buf) >= self.max_rows:
+            self._wake.set()
+
+    def write_sync(self, sql: str, params=()):
+        """Commit now on the caller's connection (for writes the user must not lose)."""
+        conn = get_conn(self.path)
+        with write_turn(), conn:
+            conn.execute(sql, params)
+        with self._lock:
+            self._stats["sync"] += 1
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Block until everything queued so far is committed."""
+        done = threading.Event()
+        with self._lock:
+            closing = self._stopping or not self._thread.is_alive()
+            if not closing:
+                self._buf.append(done)
+        if closing:  # the final drain takes whatever is queued
+            self._thread.join(timeout)
+            return not self._buf
+        self._wake.set()
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = 5.0):
+        """Flush and stop the writer thread; later submits are written synchronously."""
+        with self._lock:
+            self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            lat = sorted(self._latencies)
+        stats["depth"] = len(self._buf)
+        stats["latency_ms_avg"] = 1000 * sum(lat) / len(lat) if lat else 0.0
+        stats["latency_ms_p95"] = 1000 * lat[int(0.95 * (len(lat) - 1))] if lat else 0.0
+        stats["latency_ms_max"] = 1000 * lat[-1] if lat else 0.0
+        return stats
+
+    # ---------- writer thread ----------
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_ms / 1000)
+            self._wake.clear()
+            stopping = self._stopping
+            self._drain()
+            if stopping:
+                break
+        close_conn(self.path)
+
+    def _drain(self):
+        while self._buf:
+            rows, markers = [], []
+            while self._buf and len(rows) < self.max_rows:
+                item = self._buf.popleft()
+                (markers if isinstance(item, threading.Event) else rows).append(item)
+            self._write(rows)
+            for done in markers:
+                done.set()
+
+    def _write(self, rows):
+        if not rows:
+            return
+        conn = get_conn(self.path)
+        try:
+            with write_turn(), conn:
+                for sql, group in itertools.groupby(rows, key=lambda r: r[0]):
+                    conn.executemany(sql, [r[1] for r in group])
+            failed = 0
+        except sqlite3.Error as e:
+            # one bad row shouldn't sink the batch: retry individually
+            self.last_error = repr(e)
+            failed = 0
+            for sql, params, _ in rows:
+                try:
+                    with write_turn(), conn:
+                        conn.execute(sql, params)
+                except sqlite3.Error as e:
+                    self.last_error = repr(e)
+                    self.failed.append((sql, params, repr(e)))
+                    print(f"write-behind: row not written ({e!r}): {' '.join(sql.split())} {params!r}")
+                    failed += 1
+        now = time.perf_counter()
+        with self._lock:
+            self._stats["written"] += len(rows) - failed
+            self._stats["errors"] += failed
+            self._stats["batches"] += 1
+            self._stats["last_batch"] = len(rows)
+            self._latencies.extend(now - r[2] for r in rows)
+
+# ---------- process-wide writer ----------
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> WriteBehind:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = WriteBehind()
+            atexit.register(_writer.close)
+        return _writer
+
+def submit(sql: str, params=()):
+    get_writer().submit(sql, params)
+
+def write_sync(sql: str, params=()):
+    get_writer().write_sync(sql, params)
+
+def flush(timeout: float | None = 5.0) -> bool:
+    return get_writer().flush(timeout) if _writer is not None else True
+
+def metrics() -> dict:
+    return get_writer().metrics()
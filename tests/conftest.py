@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import database_setup, write_behind  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path, monkeypatch):
+    """Every test gets its own database file; queued writes land before it goes away."""
+    monkeypatch.setattr(database_setup, "DB_PATH", str(tmp_path / "test.db"))
+    database_setup.init_database()
+    yield database_setup.DB_PATH
+    write_behind.flush()
+    database_setup.close_conn()
@@ -0,0 +1,47 @@
+from modules import write_behind
+from modules.chat_history import MISSING_REPLY, ChatHistory
+from modules.database_setup import get_conn
+
+
+def _stored(session):
+    write_behind.flush()
+    return get_conn().execute("SELECT COUNT(*) FROM chat_messages WHERE session=?", (session,)).fetchone()[0]
+
+
+def test_every_turn_is_persisted_without_a_flush():
+    history = ChatHistory("sam", "login-1")
+    history.add_user("hi")
+    history.add_bot_text("hello")
+    history.add_user("i feel sad")
+    # no history.flush(): a session that just goes away must not lose these
+    assert _stored("login-1") == 3
+
+
+def test_load_restores_the_same_login():
+    ChatHistory("sam", "login-1").add_user("are you there?")
+    restored = ChatHistory("sam", "login-1").load()
+    assert len(restored) == 1
+    assert restored.last(1)[0][1] == "are you there?"
+
+
+def test_clear_wins_over_queued_inserts():
+    history = ChatHistory("sam", "login-1")
+    for i in range(5):
+        history.add_user(f"message {i}")
+    history.clear()
+    assert _stored("login-1") == 0
+
+
+def test_unknown_template_renders_a_fallback():
+    history = ChatHistory("sam", "login-1")
+    history.add_bot("no_such_template", {"name": "sam"})
+    assert history.last(1)[0][1] == MISSING_REPLY
+    assert ChatHistory("sam", "login-1").load().last(1)[0][1] == MISSING_REPLY
+
+
+def test_same_name_on_a_new_login_starts_empty():
+    ChatHistory("sam", "login-1").add_user("i want to die")
+    stranger = ChatHistory("sam", "login-2").load()
+    assert len(stranger) == 0 and not stranger.has_older(0)
+    stranger.clear()
+    assert _stored("login-1") == 1
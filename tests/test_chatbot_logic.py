@@ -0,0 +1,74 @@
+import pytest
+
+from modules import chatbot_logic as cl
+
+
+@pytest.fixture
+def raised():
+    calls = []
+    handler = lambda username, msg: calls.append((username, msg))
+    cl.add_crisis_handler(handler)
+    yield calls
+    cl._crisis_handlers.remove(handler)
+
+
+@pytest.mark.parametrize("msg", ["i am on a diet", "I studied all night", "my dad was a soldier", "indie music"])
+def test_die_inside_a_word_gets_the_helpline_but_no_alert(msg, raised):
+    assert cl.classify_intent(cl.normalize(msg)) == "crisis"
+    assert cl.classify_intents([cl.normalize(msg)])[0] == "crisis"
+    assert cl.get_reply_ref(msg, "sam").intent == "crisis"
+    assert raised == []
+
+
+@pytest.mark.parametrize("msg", ["i want to die", "I want to die.", "thinking about suicide", "i will kill myself",
+                                 "I wish I died", "my dog dies tonight", "i feel like dying", "i keep killing myself",
+                                 "suicidal thoughts again", "ending my life"])
+def test_crisis_words_raise_an_alert(msg, raised):
+    assert cl.classify_intent(cl.normalize(msg)) == "crisis"
+    assert cl.get_reply_ref(msg, "sam").intent == "crisis"
+    assert raised == [("sam", msg)]
+
+
+def test_batch_replies_never_raise_alerts(raised):
+    assert list(cl.classify_intents(["i want to die", "i am on a diet"])) == ["crisis", "crisis"]
+    cl.get_replies(["i want to die"], "sam")
+    assert raised == []
+
+
+def test_tamil_crisis_keeps_case_endings(raised):
+    cl.get_reply_ref("தற்கொலைக்கு போறேன்", "sam", "tamil")
+    assert raised == [("sam", "தற்கொலைக்கு போறேன்")]
+    assert cl.classify_intent(cl.normalize("diet pannuren"), "tamil") == "crisis"
+    cl.get_reply_ref("diet pannuren", "sam", "tamil")
+    assert len(raised) == 1
+
+
+@pytest.mark.parametrize("msg, intent", [
+    ("saga maaten", "choosing_life"),       # "aa" shortened in one word, kept in the other
+    ("saaga maten", "choosing_life"),
+    ("enakku saga venum", "crisis"),
+    ("thani adikala", "no_craving"),
+    ("padam pakkanum", "movies"),
+])
+def test_tanglish_spellings_can_mix_within_a_message(msg, intent):
+    assert cl.classify_intent(cl.normalize(msg), "tamil") == intent
+    assert cl.classify_intents([cl.normalize(msg)], "tamil")[0] == intent
+
+
+@pytest.mark.parametrize("msg, intent", [
+    ("no sarakku", "no_craving"),
+    ("no more ganja", "relapse"),           # only a negation right before the word counts
+    ("sarakku vendaam", "no_craving"),
+    ("ganja illa", "no_craving"),
+    ("drink venaam", "no_craving"),
+    ("sarakku venum", "relapse"),
+    ("இன்னைக்கு மது வேண்டாம்", "no_craving"),
+])
+def test_tamil_negated_substances(msg, intent):
+    assert cl.classify_intent(cl.normalize(msg), "tamil") == intent
+
+
+def test_get_replies_wants_one_username_per_message():
+    assert len(cl.get_replies(["hi", "music please"], ["sam", "ravi"])) == 2
+    with pytest.raises(ValueError):
+        cl.get_replies(["hi", "music please", "i feel sad"], ["sam", "ravi"])
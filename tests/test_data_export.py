@@ -0,0 +1,41 @@
+import csv
+import io
+
+from modules import data_export
+from modules.data_export import export_file, export_parts
+from modules.database_setup import get_conn
+
+
+def _bookings(n):
+    conn = get_conn()
+    with conn:
+        conn.executemany("INSERT INTO therapist_booking (username, date, time, mode, note) VALUES (?,?,?,?,?)",
+                         ((f"user{i % 3}", f"2025-01-{i % 28 + 1:02d}", "10:00:00", "Online", "")
+                          for i in range(n)))
+
+
+def _ids(part, **filters):
+    rows = list(csv.reader(io.StringIO(export_file("therapist_booking", "CSV", part=part, **filters)
+                                       .read().decode("utf-8"))))
+    return [int(r[0]) for r in rows[1:]]
+
+
+def test_big_exports_are_split_into_capped_parts(monkeypatch):
+    monkeypatch.setattr(data_export, "MAX_EXPORT_ROWS", 10)
+    _bookings(25)
+    assert export_parts("therapist_booking") == 3
+    parts = [_ids(p) for p in range(3)]
+    assert [len(p) for p in parts] == [10, 10, 5]
+    assert sum(parts, []) == list(range(1, 26))
+
+
+def test_parts_follow_the_filters(monkeypatch):
+    monkeypatch.setattr(data_export, "MAX_EXPORT_ROWS", 5)
+    _bookings(30)
+    assert export_parts("therapist_booking", username="user0") == 2
+    assert all((i - 1) % 3 == 0 for i in _ids(1, username="user0"))
+
+
+def test_empty_export_is_one_header_only_part():
+    assert export_parts("therapist_booking") == 1
+    assert export_file("therapist_booking").read().decode("utf-8").startswith("id,username")
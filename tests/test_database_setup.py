@@ -0,0 +1,33 @@
+import pytest
+
+from modules import write_behind
+from modules.database_setup import get_conn, log_login, upsert_user
+
+
+@pytest.mark.parametrize("table, sql", [
+    ("login_activity", "INSERT INTO login_activity (username, login_time) VALUES (NULL, '2025-01-01 10:00:00')"),
+    ("progress", "INSERT INTO progress (username, craving, date) VALUES (NULL, 3, '2025-01-01')"),
+    ("recovery_tracker", "INSERT INTO recovery_tracker (username, date) VALUES (NULL, '2025-01-01')"),
+])
+def test_rows_without_a_username_still_insert(table, sql):
+    conn = get_conn()
+    with conn:
+        conn.execute(sql)
+    assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM login_stats").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM risk_dirty").fetchone()[0] == 0
+
+
+def test_logins_still_roll_up():
+    upsert_user("Sam", "English")
+    log_login("Sam")
+    write_behind.flush()
+    assert get_conn().execute("SELECT username, count FROM login_totals").fetchall() == [("Sam", 1)]
+
+
+@pytest.mark.parametrize("username", [None, "", "   "])
+def test_login_needs_a_username(username):
+    with pytest.raises(ValueError):
+        upsert_user(username, "English")
+    with pytest.raises(ValueError):
+        log_login(username)
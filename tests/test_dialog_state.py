@@ -0,0 +1,20 @@
+from modules.chatbot_logic import get_reply_ref
+from modules.dialog_state import DialogState
+
+
+def test_offer_survives_for_the_same_login():
+    state = DialogState("sam", "login-1")
+    get_reply_ref("music please", "sam", state=state)
+    state.save()
+    restored = DialogState("sam", "login-1").load()
+    assert restored.pending_offer() == "mood_playlist"
+    assert get_reply_ref("yes", "sam", state=restored).intent == "mood_playlist"
+
+
+def test_same_name_on_a_new_login_cannot_answer_the_offer():
+    state = DialogState("sam", "login-1")
+    get_reply_ref("music please", "sam", state=state)
+    state.save()
+    stranger = DialogState("sam", "login-2").load()
+    assert stranger.pending_offer() is None
+    assert get_reply_ref("yes", "sam", state=stranger).intent != "mood_playlist"
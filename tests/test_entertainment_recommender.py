@@ -0,0 +1,27 @@
+import pytest
+
+from modules import entertainment_recommender as er
+
+UPBEAT = ("Awesome", "good energy")
+
+
+@pytest.fixture(autouse=True)
+def fresh_ranker(monkeypatch):
+    monkeypatch.setattr(er, "_ranker", None)
+
+
+@pytest.mark.parametrize("lang", ["english", "tamil"])
+@pytest.mark.parametrize("mood", ["stressed", "anxious", "sad", "lonely", "tired"])
+def test_low_moods_never_get_an_upbeat_message(mood, lang):
+    for _ in range(100):
+        msg, item = er.suggest_pick(lang, mood, "sam")
+        assert not any(word in msg for word in UPBEAT), msg
+        assert item.category == er.MOOD_CATEGORY.get(mood, er.DEFAULT_CATEGORY)
+
+
+def test_stressed_gets_relax_content_even_after_other_items_win():
+    ranker = er.get_ranker()
+    for it in er.CATALOGUE.items_for("english", "music"):
+        ranker.update("stressed", "english", it.id, shown=50, won=50)
+    msg, item = er.suggest_pick("english", "stressed", "sam")
+    assert item.category == "relax" and "calm your mind" in msg
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from modules import chatbot_logic as cl
+from modules.intent_engine import IntentMatcher
+
+RULE_SETS = {
+    "english": cl.INTENT_RULES,
+    "tamil": cl._merged_rules(cl.TAMIL_INTENT_RULES),
+}
+FILLER = ["i", "feel", "today", "want", "to", "the", "so", "studied", "enakku", "romba", "inniki", "naan",
+          "எனக்கு", "ரொம்ப", "இன்னைக்கு", "நான்", "", "\0", "a\0b"]
+
+
+def _expected(rules, msg):
+    return sum(1 << i for i, (_, words) in enumerate(rules) if any(w in msg for w in words))
+
+
+def _corpus(rules, n=3000, seed=7):
+    rng = random.Random(seed)
+    keywords = [w for _, words in rules for w in words]
+    corpus = ["", "\0", "\0\0", "die\0", "\0music"]
+    for _ in range(n):
+        parts = [rng.choice(FILLER) for _ in range(rng.randint(0, 8))]
+        for _ in range(rng.randint(0, 3)):
+            parts.insert(rng.randint(0, len(parts)), rng.choice(keywords))
+        corpus.append(rng.choice([" ", " ", "", "\0"]).join(parts))  # glued words overlap keywords
+    return corpus
+
+
+@pytest.mark.parametrize("lang", list(RULE_SETS))
+def test_hits_match_a_substring_check_per_keyword(lang):
+    rules = RULE_SETS[lang]
+    matcher = IntentMatcher(rules)
+    corpus = _corpus(rules)
+    expected = [_expected(rules, m) for m in corpus]
+    assert [matcher.hits(m) for m in corpus] == expected
+    assert matcher.hits_many(corpus).tolist() == expected
+
+
+@pytest.mark.parametrize("lang", list(RULE_SETS))
+def test_hits_many_without_nul_uses_the_joined_scan(lang):
+    rules = RULE_SETS[lang]
+    matcher = IntentMatcher(rules)
+    corpus = [m for m in _corpus(rules, seed=11) if "\0" not in m]
+    assert matcher.hits_many(corpus).tolist() == [_expected(rules, m) for m in corpus]
+    assert matcher.hits_many([]).tolist() == []
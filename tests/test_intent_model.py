@@ -0,0 +1,41 @@
+import threading
+import time
+
+from modules import chatbot_logic as cl
+from modules.intent_model import MicroBatcher
+
+
+class _Model:
+    def __init__(self, gate=None):
+        self.gate = gate
+
+    def predict_many(self, msgs):
+        if self.gate is not None:
+            self.gate.wait()
+        return ["music"] * len(msgs)
+
+
+def test_predict_is_served_by_the_worker():
+    assert MicroBatcher(_Model(), timeout=5).predict("hello") == "music"
+
+
+def test_stalled_worker_times_out_to_none():
+    gate = threading.Event()
+    batcher = MicroBatcher(_Model(gate), timeout=0.05)
+    start = time.monotonic()
+    assert batcher.predict("first") is None    # taken into the stuck batch
+    assert batcher.predict("second") is None   # still queued behind it
+    assert time.monotonic() - start < 2
+    assert batcher.metrics()["timeouts"] == 2
+    gate.set()
+
+
+def test_timeout_falls_back_to_the_keyword_rules():
+    gate = threading.Event()
+    cl.use_intent_model(MicroBatcher(_Model(gate), timeout=0.05))
+    try:
+        msg = "i feel so sad today"
+        assert cl.detect_intent(msg) == cl.classify_intent(msg) != "music"
+    finally:
+        cl.use_intent_model(None)
+        gate.set()
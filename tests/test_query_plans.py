@@ -0,0 +1,12 @@
+from benchmarks.check_query_plans import APP_QUERIES, capture_app_sql, full_scans
+from modules.database_setup import get_conn
+
+
+def test_listed_queries_use_indexes():
+    assert full_scans(get_conn(), APP_QUERIES) == []
+
+
+def test_every_query_the_pages_run_uses_indexes():
+    traced = capture_app_sql()
+    assert len(traced) > 20  # the walk really reached the pages
+    assert full_scans(get_conn(), traced) == []
@@ -0,0 +1,50 @@
+import threading
+
+from modules.database_setup import get_conn
+from modules.write_behind import WriteBehind
+
+INSERT = "INSERT INTO login_activity (username, login_time) VALUES (?,?)"
+
+
+def _count():
+    return get_conn().execute("SELECT COUNT(*) FROM login_activity").fetchone()[0]
+
+
+def test_submit_after_close_is_written_synchronously(db):
+    writer = WriteBehind(db, flush_ms=10_000)
+    writer.submit(INSERT, ("sam", "2025-01-01 10:00:00"))
+    writer.close()
+    writer.submit(INSERT, ("sam", "2025-01-01 10:05:00"))
+    assert _count() == 2
+    assert writer.metrics()["sync"] == 1
+    assert writer.flush()
+
+
+def test_no_row_is_lost_when_close_races_submits(db):
+    writer = WriteBehind(db, flush_ms=1)
+    start = threading.Barrier(5)
+
+    def produce(n):
+        start.wait()
+        for i in range(500):
+            writer.submit(INSERT, (f"user{n}", f"2025-01-01 10:00:{i % 60:02d}"))
+
+    threads = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    start.wait()
+    writer.close()
+    for t in threads:
+        t.join()
+    assert _count() == 2000
+
+
+def test_failed_rows_are_reported_and_kept(db, capsys):
+    writer = WriteBehind(db, flush_ms=10_000)
+    writer.submit(INSERT, ("sam", "2025-01-01 10:00:00"))
+    writer.submit("INSERT INTO chat_messages (username, ts, role) VALUES (?,?,?)", (None, "2025-01-01", 0))
+    writer.close()
+    assert _count() == 1
+    assert writer.metrics()["errors"] == 1
+    assert [row[1] for row in writer.failed] == [(None, "2025-01-01", 0)]
+    assert "row not written" in capsys.readouterr().out